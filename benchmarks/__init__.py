@@ -0,0 +1 @@
+"""Benchmarks ejecutables (fuera de la suite de pytest)."""
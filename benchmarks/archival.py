@@ -0,0 +1,144 @@
+"""
+Latencia de las consultas calientes antes y después de archivar el histórico.
+
+Crea una base SQLite temporal con bloqueos y reservas antiguos más un volumen
+actual, mide, archiva con los mismos lotes que el job y vuelve a medir.
+
+Uso:
+    python -m benchmarks.archival --historicos 200000 --actuales 5000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_archival_")
+os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_DB_DIR}/bench.db"
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.customer_search import percentile  # noqa: E402
+from shared.database import Base, SessionLocal, engine  # noqa: E402
+from services.availability.models import BloqueoHabitacionDB  # noqa: E402
+from services.availability.repository import archive_old_blocks, overlapping_blocks  # noqa: E402
+from services.reservations.models import ReservaDB  # noqa: E402
+from services.reservations.repository import archive_old_reservations, list_reservations_by_hotel  # noqa: E402
+
+HOY = date.today()
+HABITACIONES = 500
+HOTELES = 20
+
+
+def populate(historicos: int, actuales: int, rng: random.Random) -> None:
+    def rows(n, past):
+        for i in range(n):
+            inicio = HOY - timedelta(days=rng.randint(400, 1500)) if past else HOY + timedelta(days=rng.randint(0, 60))
+            yield i, inicio, inicio + timedelta(days=rng.randint(1, 5))
+
+    with engine.begin() as conn:
+        for past, n in ((True, historicos), (False, actuales)):
+            tag = "h" if past else "a"
+            conn.execute(insert(BloqueoHabitacionDB), [
+                {
+                    "bloqueo_id": f"{tag}{i}",
+                    "habitacion_id": f"HAB{i % HABITACIONES}",
+                    "fecha_inicio": inicio,
+                    "fecha_fin": fin,
+                    "tipo": "temporal",
+                    "estado": rng.choice(("expirado", "confirmado")) if past else "activo",
+                }
+                for i, inicio, fin in rows(n, past)
+            ])
+            conn.execute(insert(ReservaDB), [
+                {
+                    "reserva_id": f"{tag}{i}",
+                    "cliente_id": f"C{i % 5000}",
+                    "hotel_id": f"HOTEL{i % HOTELES}",
+                    "habitacion_id": f"HAB{i % HABITACIONES}",
+                    "fecha_inicio": inicio,
+                    "fecha_fin": fin,
+                    "estado": "CHECKOUT" if past else "CONFIRMADA",
+                    "monto_total": 100,
+                }
+                for i, inicio, fin in rows(n, past)
+            ])
+
+
+def measure(queries: int, rng: random.Random) -> dict:
+    db = SessionLocal()
+    try:
+        results = {}
+        cases = {
+            "overlapping_blocks": lambda: overlapping_blocks(
+                db, f"HAB{rng.randrange(HABITACIONES)}", HOY + timedelta(days=10), HOY + timedelta(days=12)
+            ),
+            "list_reservations_by_hotel": lambda: list_reservations_by_hotel(
+                db, f"HOTEL{rng.randrange(HOTELES)}", "fecha_inicio", None, None, "CONFIRMADA", None, 50
+            ),
+        }
+        for name, run in cases.items():
+            latencies = []
+            for _ in range(queries):
+                t0 = time.perf_counter()
+                run()
+                latencies.append((time.perf_counter() - t0) * 1000)
+            results[name] = {
+                "p50_ms": round(statistics.median(latencies), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+            }
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--historicos", type=int, default=200_000)
+    parser.add_argument("--actuales", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    try:
+        Base.metadata.create_all(bind=engine)
+        populate(args.historicos, args.actuales, rng)
+        antes = measure(args.queries, rng)
+
+        cutoff = HOY - timedelta(days=365)
+        db = SessionLocal()
+        try:
+            t0 = time.perf_counter()
+            archivados = {
+                "bloqueos": archive_old_blocks(db, cutoff, args.batch_size),
+                "reservas": archive_old_reservations(db, cutoff, args.batch_size),
+            }
+            archive_s = time.perf_counter() - t0
+        finally:
+            db.close()
+        despues = measure(args.queries, rng)
+    finally:
+        engine.dispose()
+        shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+    print(json.dumps({
+        "historicos": args.historicos,
+        "actuales": args.actuales,
+        "archivados": archivados,
+        "archive_s": round(archive_s, 2),
+        "antes": antes,
+        "despues": despues,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Tiempo de arranque por servicio: importación de `services.<servicio>.main` y ejecución
+de los handlers de startup, cada arranque en un proceso nuevo.
+
+Como referencia se cuentan las sentencias que lanza el arranque y las que lanzaba el
+antiguo `Base.metadata.create_all` sobre el mismo esquema ya creado (una comprobación
+por tabla; en MySQL cada una es un viaje de red).
+
+Uso:
+    python -m benchmarks.boot_time --runs 10 --services availability reservations
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.customer_search import percentile
+from shared.migrations import SERVICES
+
+_BOOT = """
+import asyncio, importlib, json, sys, time
+t0 = time.perf_counter()
+main = importlib.import_module(f"services.{sys.argv[1]}.main")
+t1 = time.perf_counter()
+
+async def boot():
+    start = time.perf_counter()
+    await main.app.router.startup()
+    return time.perf_counter() - start
+
+from sqlalchemy import event
+from shared.database import Base, engine
+statements = []
+event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+startup = asyncio.run(boot())
+startup_queries = len(statements)
+statements.clear()
+Base.metadata.create_all(bind=engine)
+print(json.dumps({
+    "import": t1 - t0, "startup": startup, "startup_queries": startup_queries, "create_all_queries": len(statements),
+}))
+"""
+
+
+def boot_once(servicio: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _BOOT, servicio], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def summary(values) -> dict:
+    ms = [v * 1000 for v in values]
+    return {f"p{p}_ms": round(percentile(ms, p), 1) for p in (50, 95, 99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--services", nargs="*", default=list(SERVICES))
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_boot_")
+    env = {**os.environ, "DATABASE_URL": f"sqlite+pysqlite:///{db_dir}/bench.db"}
+    try:
+        # El paso dedicado de migraciones se ejecuta una vez, fuera de la medición
+        subprocess.run([sys.executable, "-m", "shared.migrations", *args.services], env=env, check=True, capture_output=True)
+        results = {}
+        for servicio in args.services:
+            runs = [boot_once(servicio, env) for _ in range(args.runs)]
+            results[servicio] = {
+                "import": summary([r["import"] for r in runs]),
+                "startup": summary([r["startup"] for r in runs]),
+                "startup_queries": runs[-1]["startup_queries"],
+                "create_all_queries_legacy": runs[-1]["create_all_queries"],
+            }
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+    print(json.dumps({"runs": args.runs, "services": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
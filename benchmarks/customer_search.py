@@ -0,0 +1,91 @@
+"""
+Benchmark del índice de búsqueda de clientes en memoria.
+
+Uso:
+    python -m benchmarks.customer_search --rows 1000000 --queries 2000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from services.customers.search import CustomerSearchIndex
+
+SILABAS = ["ma", "ri", "an", "jo", "se", "lu", "car", "los", "so", "fi", "ta", "mo", "va", "len", "san", "ti", "go", "ca", "die", "ra", "mi", "rez", "per", "lo", "gar", "to", "flo", "ri", "diaz", "ver"]
+
+
+def vocabulary(size: int, rng: random.Random):
+    # Vocabulario sintético de nombres/apellidos (con pocos nombres, todas las
+    # búsquedas por nombre coincidirían con una fracción enorme de la tabla)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic_rows(n: int, rng: random.Random, nombres, apellidos):
+    for i in range(1, n + 1):
+        nombre = f"{rng.choice(nombres).title()} {rng.choice(apellidos).title()} {rng.choice(apellidos).title()}"
+        yield (
+            i,
+            f"CC{10000000 + i}",
+            f"user{i}@example.com",
+            f"+57{3000000000 + i}",
+            nombre,
+        )
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    nombres = vocabulary(2000, rng)
+    apellidos = vocabulary(5000, rng)
+    index = CustomerSearchIndex()
+    start = time.perf_counter()
+    index.build(synthetic_rows(args.rows, rng, nombres, apellidos))
+    build_s = time.perf_counter() - start
+
+    queries = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(f"{rng.choice(nombres)} {rng.choice(apellidos)[:4]}")
+        elif kind < 0.6:
+            queries.append(f"user{rng.randint(1, args.rows)}")
+        elif kind < 0.8:
+            queries.append(f"+57 {3000000000 + rng.randint(1, args.rows)}"[:12])
+        else:
+            queries.append(f"CC{10000000 + rng.randint(1, args.rows)}")
+
+    latencies = []
+    for q in queries:
+        t0 = time.perf_counter()
+        index.search(q, limit=20)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "build_s": round(build_s, 2),
+        "terms": len(index._terms),
+        "queries": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Coste de importación de cada punto de entrada (`services.<servicio>.main`) medido con
+`python -X importtime` en procesos nuevos, frente a un objetivo de arranque en frío.
+
+Además del total se listan los paquetes de primer nivel que más tiempo propio suman,
+para localizar dependencias que convenga importar de forma diferida.
+
+Uso:
+    python -m benchmarks.import_time --runs 5
+    python -m benchmarks.import_time --check   # sale con código 1 si algún p50 supera su objetivo
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from benchmarks.customer_search import percentile
+
+# Objetivo de importación en frío por servicio (ms, p50). FastAPI + pydantic ya suponen
+# ~230 ms; los servicios con BD añaden SQLAlchemy y sus modelos.
+COLD_START_TARGET_MS = {
+    "auth": 400,
+    "customers": 400,
+    "availability": 400,
+    "pricing": 300,
+    "payments": 400,
+    "reservations": 400,
+    "notifications": 300,
+}
+
+
+def import_profile(servicio: str) -> Tuple[float, Dict[str, float]]:
+    """Devuelve (total en ms, tiempo propio en ms por paquete de primer nivel)."""
+    module = f"services.{servicio}.main"
+    env = {**os.environ, "USE_SQLITE_FOR_TESTS": "1"}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    total = 0.0
+    by_package: Dict[str, float] = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # cabecera
+        name = name.strip()
+        by_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            total = int(cumulative_us) / 1000
+    return total, by_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--services", nargs="*", default=list(COLD_START_TARGET_MS))
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    over_target = []
+    for servicio in args.services:
+        totals = []
+        packages: Dict[str, float] = defaultdict(float)
+        for _ in range(args.runs):
+            total, by_package = import_profile(servicio)
+            totals.append(total)
+            for name, ms in by_package.items():
+                packages[name] += ms / args.runs
+        target = COLD_START_TARGET_MS[servicio]
+        p50 = percentile(totals, 50)
+        if p50 > target:
+            over_target.append(servicio)
+        results[servicio] = {
+            "p50_ms": round(p50, 1),
+            "p95_ms": round(percentile(totals, 95), 1),
+            "p99_ms": round(percentile(totals, 99), 1),
+            "target_ms": target,
+            "within_target": p50 <= target,
+            "top_packages_ms": {
+                name: round(ms, 1) for name, ms in sorted(packages.items(), key=lambda kv: -kv[1])[: args.top]
+            },
+        }
+    print(json.dumps({"runs": args.runs, "services": results}, indent=2))
+    if args.check and over_target:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
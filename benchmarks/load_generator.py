@@ -0,0 +1,390 @@
+"""
+Generador de carga con una mezcla realista de tráfico de reservas sobre los siete
+servicios levantados con uvicorn.
+
+Con --start-services se arrancan los siete servicios en local (un SQLite por servicio en
+un directorio temporal, como bases separadas) y se crea un hotel de prueba; sin esa
+opción se ataca a las URLs de la configuración (`*_SERVICE_URL`), por ejemplo el
+docker-compose con MySQL, usando un hotel existente (--hotel).
+
+Mezcla configurable (--mix) de:
+  search  POST /api/v1/availability/search
+  quote   POST /api/v1/pricing/calculate
+  book    POST /api/v1/reservations (saga completa: customers, pricing, availability, payments)
+  cancel  DELETE /api/v1/reservations/{id} de una reserva creada antes por `book`
+  login   POST /api/v1/auth/login
+
+Modos (se pueden combinar; cada escalón dura --duration segundos):
+  --rates 20 50 100      lazo abierto: llegadas de Poisson a ese ritmo, sin esperar a las
+                         respuestas; la latencia cuenta desde la llegada programada, así que
+                         incluye la cola si el sistema no da abasto
+  --concurrency 1 4 16   lazo cerrado: N clientes encadenando peticiones; da la curva de
+                         saturación (rendimiento y p95 frente a concurrencia)
+
+Informa por escalón y endpoint: peticiones, rendimiento, tasa de error, códigos de estado
+y p50/p95/p99; y el escalón a partir del cual el rendimiento deja de crecer.
+
+Uso:
+    python -m benchmarks.load_generator --start-services --rates 20 50 --concurrency 1 2 4 8 16 32
+    python -m benchmarks.load_generator --hotel HOTEL1 --tipo standard --mix search=80,quote=20 --rates 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.customer_search import percentile
+
+SERVICE_PORTS = {
+    "auth": 0,
+    "customers": 1,
+    "availability": 2,
+    "pricing": 3,
+    "payments": 4,
+    "reservations": 5,
+    "notifications": 6,
+}
+DEFAULT_MIX = "search=60,quote=20,book=10,cancel=5,login=5"
+START = date(2050, 1, 1)
+PASSWORD = "LoadTest1234"
+# Si el rendimiento de un escalón no supera al anterior en este margen, está saturado
+SATURATION_GAIN = 0.05
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"operación desconocida en --mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+@contextmanager
+def local_services(base_port: int, rooms: int, tipo: str, workers: int) -> Iterator[Tuple[Dict[str, str], str]]:
+    """Arranca los siete servicios con uvicorn; devuelve sus URLs y el hotel sembrado."""
+    db_dir = tempfile.mkdtemp(prefix="loadgen_")
+    urls = {name: f"http://127.0.0.1:{base_port + offset}" for name, offset in SERVICE_PORTS.items()}
+    base_env = {**os.environ, **{f"{name.upper()}_SERVICE_URL": url for name, url in urls.items()}}
+    base_env.pop("USE_SQLITE_FOR_TESTS", None)
+    # Toda la carga sale de un único usuario; RATE_LIMIT_ENABLED=true prueba el limitador
+    base_env.setdefault("RATE_LIMIT_ENABLED", "false")
+    processes = []
+    try:
+        hotel_id = "LOADTEST"
+        for name in SERVICE_PORTS:
+            env = {**base_env, "DATABASE_URL": f"sqlite+pysqlite:///{db_dir}/{name}.db"}
+            if name == "availability":
+                subprocess.run([sys.executable, "-m", "shared.migrations", name], env=env, check=True, capture_output=True)
+                subprocess.run([sys.executable, "-c", _SEED_ROOMS, hotel_id, tipo, str(rooms)], env=env, check=True)
+            log = open(os.path.join(db_dir, f"{name}.log"), "w")
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", f"services.{name}.main:app", "--host", "127.0.0.1",
+                 "--port", str(base_port + SERVICE_PORTS[name]), "--workers", str(workers), "--log-level", "warning"],
+                env=env, stdout=log, stderr=subprocess.STDOUT,
+            ))
+        _wait_healthy(urls, processes)
+        yield urls, hotel_id
+    finally:
+        for p in processes:
+            p.terminate()
+        for p in processes:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+_SEED_ROOMS = """
+import sys
+from shared.database import SessionLocal
+from services.availability.models import HabitacionDB
+hotel_id, tipo, rooms = sys.argv[1], sys.argv[2], int(sys.argv[3])
+db = SessionLocal()
+db.add_all(
+    HabitacionDB(habitacion_id=f"{hotel_id}_{i:04d}", hotel_id=hotel_id, numero=str(100 + i), tipo=tipo, piso=1 + i // 20,
+                 capacidad_maxima=2, precio_base=100, caracteristicas=["wifi"], activa=True)
+    for i in range(rooms)
+)
+db.commit()
+"""
+
+
+def _wait_healthy(urls: Dict[str, str], processes: List[subprocess.Popen], timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    pending = dict(urls)
+    while pending:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"No arrancaron a tiempo: {sorted(pending)}")
+        if any(p.poll() is not None for p in processes):
+            raise RuntimeError("Un servicio terminó al arrancar (ver los .log del directorio temporal)")
+        for name, url in list(pending.items()):
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    del pending[name]
+            except httpx.HTTPError:
+                pass
+        time.sleep(0.2)
+
+
+class Target:
+    """Estado compartido por las operaciones: URLs, credenciales y reservas cancelables."""
+
+    def __init__(self, urls: Dict[str, str], hotel_id: str, tipo: str, payment_token: str, horizon_days: int):
+        self.urls = urls
+        self.hotel_id = hotel_id
+        self.tipo = tipo
+        self.payment_token = payment_token
+        self.horizon_days = horizon_days
+        self.username = f"load_{uuid.uuid4().hex[:8]}"
+        self.headers: Dict[str, str] = {}
+        self.cliente_id = ""
+        self.reservas: Deque[str] = deque()
+
+    async def setup(self, client: httpx.AsyncClient) -> None:
+        r = await client.post(f"{self.urls['auth']}/api/v1/auth/register", json={
+            "email": f"{self.username}@example.com", "username": self.username, "password": PASSWORD, "nombre_completo": "Load Test",
+        })
+        r.raise_for_status()
+        r = await client.post(f"{self.urls['auth']}/api/v1/auth/login", json={"username": self.username, "password": PASSWORD})
+        r.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        r = await client.post(f"{self.urls['customers']}/api/v1/customers", headers=self.headers, json={
+            "nombre_completo": "Cliente Carga", "email": f"{self.username}@example.com", "telefono": "+573001234567",
+        })
+        r.raise_for_status()
+        self.cliente_id = r.json()["cliente_id"]
+
+    def stay(self, rng: random.Random) -> Tuple[str, str]:
+        inicio = START + timedelta(days=rng.randrange(self.horizon_days))
+        return str(inicio), str(inicio + timedelta(days=rng.randint(1, 4)))
+
+
+Operation = Callable[[Target, httpx.AsyncClient, random.Random], Awaitable[Tuple[str, Optional[httpx.Response]]]]
+
+
+async def op_search(t: Target, client: httpx.AsyncClient, rng: random.Random):
+    inicio, fin = t.stay(rng)
+    payload = {"hotel_id": t.hotel_id, "fecha_inicio": inicio, "fecha_fin": fin, "numero_huespedes": 2}
+    return "search", await client.post(f"{t.urls['availability']}/api/v1/availability/search", json=payload, headers=t.headers)
+
+
+async def op_quote(t: Target, client: httpx.AsyncClient, rng: random.Random):
+    inicio, fin = t.stay(rng)
+    payload = {"hotel_id": t.hotel_id, "tipo_habitacion": t.tipo, "fecha_inicio": inicio, "fecha_fin": fin}
+    return "quote", await client.post(f"{t.urls['pricing']}/api/v1/pricing/calculate", json=payload, headers=t.headers)
+
+
+async def op_book(t: Target, client: httpx.AsyncClient, rng: random.Random):
+    inicio, fin = t.stay(rng)
+    payload = {
+        "cliente_id": t.cliente_id, "hotel_id": t.hotel_id, "tipo_habitacion": t.tipo, "fecha_inicio": inicio, "fecha_fin": fin,
+        "metodo_pago": {"tipo": "tarjeta_credito", "token": t.payment_token},
+    }
+    r = await client.post(f"{t.urls['reservations']}/api/v1/reservations", json=payload, headers=t.headers)
+    if r.status_code == 200:
+        reserva_id = r.json().get("detalles", {}).get("reserva_id")
+        if reserva_id:
+            t.reservas.append(reserva_id)
+    return "book", r
+
+
+async def op_cancel(t: Target, client: httpx.AsyncClient, rng: random.Random):
+    if not t.reservas:
+        return "cancel", None  # aún no hay reservas: se cuenta como omitida
+    reserva_id = t.reservas.popleft()
+    return "cancel", await client.delete(f"{t.urls['reservations']}/api/v1/reservations/{reserva_id}", headers=t.headers)
+
+
+async def op_login(t: Target, client: httpx.AsyncClient, rng: random.Random):
+    payload = {"username": t.username, "password": PASSWORD}
+    return "login", await client.post(f"{t.urls['auth']}/api/v1/auth/login", json=payload)
+
+
+OPERATIONS: Dict[str, Operation] = {
+    "search": op_search,
+    "quote": op_quote,
+    "book": op_book,
+    "cancel": op_cancel,
+    "login": op_login,
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.skipped: Dict[str, int] = defaultdict(int)
+
+    async def run(self, op: Operation, t: Target, client: httpx.AsyncClient, rng: random.Random, started: float) -> None:
+        name = op.__name__[3:]
+        try:
+            name, response = await op(t, client, rng)
+            if response is None:
+                self.skipped[name] += 1
+                return
+            status = str(response.status_code)
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+        self.statuses[name][status] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for name, latencies in sorted(self.latencies.items()):
+            statuses = dict(self.statuses[name])
+            errors = sum(n for s, n in statuses.items() if not s.startswith("2"))
+            endpoints[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "error_rate": round(errors / len(latencies), 4),
+                "statuses": statuses,
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p95_ms": round(percentile(latencies, 95), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+            }
+            if self.skipped.get(name):
+                endpoints[name]["skipped"] = self.skipped[name]
+        every = [x for latencies in self.latencies.values() for x in latencies]
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(n for st in self.statuses.values() for s, n in st.items() if not s.startswith("2"))
+        return {
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 1),
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "p50_ms": round(percentile(every, 50), 1) if every else None,
+            "p95_ms": round(percentile(every, 95), 1) if every else None,
+            "p99_ms": round(percentile(every, 99), 1) if every else None,
+            "endpoints": endpoints,
+        }
+
+
+def _picker(mix: Dict[str, float], rng: random.Random) -> Callable[[], Operation]:
+    names, weights = zip(*mix.items())
+    return lambda: OPERATIONS[rng.choices(names, weights)[0]]
+
+
+async def open_loop(t: Target, client: httpx.AsyncClient, mix: Dict[str, float], rate: float, duration: float, max_inflight: int, rng: random.Random) -> Dict:
+    recorder, pick = Recorder(), _picker(mix, rng)
+    tasks = set()
+    dropped = 0
+    begin = time.perf_counter()
+    scheduled = begin
+    while True:
+        scheduled += rng.expovariate(rate)
+        if scheduled - begin >= duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(tasks) >= max_inflight:
+            dropped += 1  # el cliente no lanza más: se cuenta, no se espera (seguiría siendo lazo cerrado)
+            continue
+        task = asyncio.create_task(recorder.run(pick(), t, client, rng, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.wait(tasks)
+    report = recorder.report(time.perf_counter() - begin)
+    report.update({"target_rps": rate, "dropped": dropped})
+    return report
+
+
+async def closed_loop(t: Target, client: httpx.AsyncClient, mix: Dict[str, float], concurrency: int, duration: float, rng: random.Random) -> Dict:
+    recorder, pick = Recorder(), _picker(mix, rng)
+    begin = time.perf_counter()
+    deadline = begin + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            await recorder.run(pick(), t, client, rng, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    report = recorder.report(time.perf_counter() - begin)
+    report["concurrency"] = concurrency
+    return report
+
+
+def saturation_point(steps: List[Dict]) -> Optional[int]:
+    """Primera concurrencia cuyo rendimiento no mejora el del escalón anterior en SATURATION_GAIN."""
+    for prev, step in zip(steps, steps[1:]):
+        if step["throughput_rps"] < prev["throughput_rps"] * (1 + SATURATION_GAIN):
+            return step["concurrency"]
+    return None
+
+
+async def run(args: argparse.Namespace, urls: Dict[str, str], hotel_id: str) -> Dict:
+    rng = random.Random(args.seed)
+    token = "tok_carga" if args.gateway_delay else "tok_visa_4242"
+    target = Target(urls, hotel_id, args.tipo, token, args.horizon_days)
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        await target.setup(client)
+        report: Dict = {"mix": args.mix, "duration_s": args.duration, "open_loop": [], "closed_loop": []}
+        for rate in args.rates:
+            report["open_loop"].append(await open_loop(target, client, args.mix, rate, args.duration, args.max_inflight, rng))
+        for concurrency in args.concurrency:
+            report["closed_loop"].append(await closed_loop(target, client, args.mix, concurrency, args.duration, rng))
+        if report["closed_loop"]:
+            report["saturation_concurrency"] = saturation_point(report["closed_loop"])
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-services", action="store_true")
+    parser.add_argument("--base-port", type=int, default=18000, help="con --start-services: auth en este puerto, el resto consecutivos")
+    parser.add_argument("--workers", type=int, default=1, help="workers de uvicorn por servicio (--start-services)")
+    parser.add_argument("--rooms", type=int, default=200, help="habitaciones del hotel de prueba (--start-services)")
+    parser.add_argument("--hotel", default="HOTEL1", help="hotel a usar sin --start-services")
+    parser.add_argument("--tipo", default="standard")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--rates", type=float, nargs="*", default=[])
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[])
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos por escalón")
+    parser.add_argument("--max-inflight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--horizon-days", type=int, default=365, help="las estancias se reparten en este número de días")
+    parser.add_argument("--gateway-delay", action="store_true", help="pagos con la espera y los rechazos simulados de la pasarela")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="fichero donde guardar el JSON")
+    args = parser.parse_args()
+    if not args.rates and not args.concurrency:
+        args.rates, args.concurrency = [20.0], [1, 2, 4, 8, 16, 32]
+
+    if args.start_services:
+        with local_services(args.base_port, args.rooms, args.tipo, args.workers) as (urls, hotel_id):
+            report = asyncio.run(run(args, urls, hotel_id))
+    else:
+        from shared.config import settings
+
+        urls = {name: getattr(settings, f"{name.upper()}_SERVICE_URL") for name in SERVICE_PORTS}
+        report = asyncio.run(run(args, urls, args.hotel))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
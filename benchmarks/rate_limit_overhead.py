@@ -0,0 +1,94 @@
+"""
+Coste por petición del limitador (shared/rate_limit.py), medido sobre una app ASGI vacía.
+
+Escenarios: ruta sin regla, ruta limitada con backend en memoria y con backend SQLite
+compartido. El cubo es lo bastante grande para que ninguna petición reciba 429.
+
+Uso:
+    python -m benchmarks.rate_limit_overhead --requests 50000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("USE_SQLITE_FOR_TESTS", "1")
+
+from benchmarks.customer_search import percentile  # noqa: E402
+from shared.rate_limit import MemoryBuckets, RateLimitMiddleware, SQLiteBuckets, parse_rules  # noqa: E402
+from shared.security import create_access_token  # noqa: E402
+
+SEARCH = "/api/v1/availability/search"
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+async def _measure(app, path: str, headers, requests: int):
+    scope = {"type": "http", "method": "POST", "path": path, "headers": headers, "client": ("127.0.0.1", 5000)}
+    samples = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        await app(scope, _receive, _send)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--output", help="fichero JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    token = create_access_token({"usuario_id": "BENCH", "username": "bench", "rol": "cliente"})
+    headers = [(b"content-type", b"application/json"), (b"authorization", f"Bearer {token}".encode())]
+    rules = parse_rules({f"POST {SEARCH}": "1000000000:1000000000"})
+    tmpdir = tempfile.mkdtemp(prefix="ratelimit-bench-")
+
+    scenarios = {
+        "sin_regla": (RateLimitMiddleware(_empty_app, rules, buckets=MemoryBuckets()), "/api/v1/pricing/calculate"),
+        "memoria": (RateLimitMiddleware(_empty_app, rules, buckets=MemoryBuckets()), SEARCH),
+        "sqlite": (RateLimitMiddleware(_empty_app, rules, buckets=SQLiteBuckets(os.path.join(tmpdir, "rl.db"))), SEARCH),
+    }
+
+    async def run():
+        base = await _measure(_empty_app, SEARCH, headers, args.requests)
+        base_p50 = statistics.median(base)
+        results = {"app_vacia": {"p50_us": round(base_p50, 2)}}
+        for name, (app, path) in scenarios.items():
+            n = args.requests if name != "sqlite" else max(1000, args.requests // 10)
+            samples = await _measure(app, path, headers, n)
+            overhead = [s - base_p50 for s in samples]
+            results[name] = {
+                "requests": n,
+                "overhead_p50_us": round(statistics.median(overhead), 2),
+                "overhead_p95_us": round(percentile(overhead, 95), 2),
+                "overhead_p99_us": round(percentile(overhead, 99), 2),
+            }
+        return results
+
+    results = asyncio.run(run())
+    out = json.dumps(results, indent=2)
+    print(out)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+
+
+if __name__ == "__main__":
+    main()
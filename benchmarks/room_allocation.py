@@ -0,0 +1,190 @@
+"""
+Simulación de asignación de habitaciones: ocupación lograda y latencia por estrategia.
+
+Genera solicitudes de estancia (llegadas en orden aleatorio, como ocurre con distintas
+antelaciones) sobre un hotel de un único tipo y las asigna con:
+  - first_fit: la primera habitación libre por id (equivale al antiguo habitaciones[0])
+  - random:    cualquier habitación libre
+  - best_fit:  rank_rooms de services/availability/allocation.py
+Cuenta como "rechazo por fragmentación" la solicitud que no cabe en ninguna habitación
+aunque todas sus noches tenían alguna habitación libre.
+
+Con --db-requests se mide además allocate_room de extremo a extremo sobre SQLite
+(contadores, vecinos en noches_habitacion y bloqueo; sin fsync por commit).
+
+Uso:
+    python -m benchmarks.room_allocation --rooms 300 --days 90 --load 1.1 --db-requests 500
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_allocation_")
+os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_DB_DIR}/bench.db"
+
+from benchmarks.customer_search import percentile  # noqa: E402
+from services.availability.allocation import ALLOCATION_HORIZON_DAYS, rank_rooms  # noqa: E402
+
+START = date(2040, 1, 1)
+# Distribución de noches por estancia (noches: peso)
+STAY_WEIGHTS = {1: 30, 2: 25, 3: 20, 4: 10, 5: 7, 6: 4, 7: 4}
+
+
+def make_requests(rooms: int, days: int, load: float, rng: random.Random) -> List[Tuple[int, int]]:
+    """(primer día, último día) inclusive, hasta `load` veces la capacidad en noches."""
+    lengths, weights = zip(*STAY_WEIGHTS.items())
+    requests, nights = [], 0
+    while nights < load * rooms * days:
+        n = rng.choices(lengths, weights)[0]
+        first = rng.randrange(0, days - n + 1)
+        requests.append((first, first + n - 1))
+        nights += n
+    return requests
+
+
+class Calendar:
+    """Intervalos ocupados por habitación, ordenados (búsqueda binaria de vecinos)."""
+
+    def __init__(self, rooms: int):
+        self.ids = [f"HAB{i:04d}" for i in range(rooms)]
+        self.busy: Dict[str, List[Tuple[int, int]]] = {h: [] for h in self.ids}
+
+    def neighbours(self, room: str, first: int, last: int) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """(fin del intervalo anterior, inicio del siguiente) o None si la estancia no cabe."""
+        intervals = self.busy[room]
+        i = bisect.bisect_left(intervals, (first, first))
+        prev_end = intervals[i - 1][1] if i else None
+        next_start = intervals[i][0] if i < len(intervals) else None
+        if (prev_end is not None and prev_end >= first) or (next_start is not None and next_start <= last):
+            return None
+        return prev_end, next_start
+
+    def book(self, room: str, first: int, last: int) -> None:
+        bisect.insort(self.busy[room], (first, last))
+
+
+def _day(offset: Optional[int]) -> Optional[date]:
+    return None if offset is None else START + timedelta(days=offset)
+
+
+def choose(strategy: str, calendar: Calendar, first: int, last: int, rng: random.Random) -> Optional[str]:
+    candidates = {}
+    for room in calendar.ids:
+        found = calendar.neighbours(room, first, last)
+        if found is not None:
+            candidates[room] = found
+    if not candidates:
+        return None
+    if strategy == "first_fit":
+        return min(candidates)
+    if strategy == "random":
+        return rng.choice(sorted(candidates))
+    as_dates = {h: (_day(p), _day(n)) for h, (p, n) in candidates.items()}
+    return rank_rooms(as_dates, _day(first), _day(last))[0]
+
+
+def simulate(strategy: str, rooms: int, days: int, requests: List[Tuple[int, int]], seed: int) -> Dict:
+    rng = random.Random(seed)
+    calendar = Calendar(rooms)
+    free_per_day = [rooms] * days
+    sold = rejected = fragmentation = 0
+    latencies = []
+    for first, last in requests:
+        t0 = time.perf_counter()
+        room = choose(strategy, calendar, first, last, rng)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if room is None:
+            rejected += 1
+            if all(free_per_day[d] > 0 for d in range(first, last + 1)):
+                fragmentation += 1
+            continue
+        calendar.book(room, first, last)
+        for d in range(first, last + 1):
+            free_per_day[d] -= 1
+        sold += last - first + 1
+    return {
+        "occupancy": round(sold / (rooms * days), 4),
+        "rejected": rejected,
+        "rejected_by_fragmentation": fragmentation,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def db_allocation(rooms: int, days: int, requests: List[Tuple[int, int]]) -> Dict:
+    """allocate_room real (contadores + vecinos en noches_habitacion + bloqueo) sobre SQLite."""
+    from sqlalchemy import event
+
+    from shared.database import Base, SessionLocal, engine
+    from shared.exceptions import BadRequestError
+    from services.availability.models import HabitacionDB
+    from services.availability.service import allocate_room
+
+    # Sin fsync en cada commit: se mide la asignación (consultas + elección), no el disco
+    event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA synchronous=OFF"))
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all(
+            HabitacionDB(habitacion_id=f"HAB{i:04d}", hotel_id="BENCH", numero=str(i), tipo="standard", piso=1,
+                         capacidad_maxima=2, precio_base=100, caracteristicas=[], activa=True)
+            for i in range(rooms)
+        )
+        db.commit()
+        latencies, sold = [], 0
+        for first, last in requests:
+            t0 = time.perf_counter()
+            try:
+                allocate_room(db, "BENCH", "standard", _day(first), _day(last), 60 * 24)
+                sold += last - first + 1
+            except BadRequestError:
+                pass
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        db.close()
+    return {
+        "requests": len(requests),
+        "occupancy": round(sold / (rooms * days), 4),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=300)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--load", type=float, default=1.1, help="demanda en noches / capacidad")
+    parser.add_argument("--db-requests", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    requests = make_requests(args.rooms, args.days, args.load, random.Random(args.seed))
+    report = {
+        "rooms": args.rooms,
+        "days": args.days,
+        "requests": len(requests),
+        "horizon_days": ALLOCATION_HORIZON_DAYS,
+        "strategies": {s: simulate(s, args.rooms, args.days, requests, args.seed) for s in ("first_fit", "random", "best_fit")},
+    }
+    try:
+        if args.db_requests:
+            report["db_allocate_room"] = db_allocation(args.rooms, args.days, requests[: args.db_requests])
+    finally:
+        shutil.rmtree(_DB_DIR, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Coste de serializar respuestas y bytes en la red (shared/responses.py).
+
+Compara, para la respuesta de búsqueda de disponibilidad con N habitaciones:
+- "modelo": el camino anterior (dict -> HabitacionDisponible/DisponibilidadResponse ->
+  validación del response_model -> jsonable_encoder -> json.dumps), como lo hacía FastAPI.
+- "orjson": el camino actual, dumps() del dict tal cual.
+
+Para el cuerpo de cada tamaño mide además los bytes sin comprimir, con gzip (nivel
+COMPRESSION_GZIP_LEVEL) y con brotli si está instalado, y el tiempo de compresión.
+
+Uso:
+    python -m benchmarks.serialization --rooms 50 500 2000 --iterations 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+import zlib
+from datetime import date
+from decimal import Decimal
+
+os.environ.setdefault("USE_SQLITE_FOR_TESTS", "1")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from benchmarks.customer_search import percentile  # noqa: E402
+from services.availability.schemas import DisponibilidadResponse, HabitacionDisponible  # noqa: E402
+from shared.config import settings  # noqa: E402
+from shared.responses import brotli, dumps  # noqa: E402
+
+FEATURES = ["wifi", "vista_mar", "balcon", "minibar", "cafetera", "jacuzzi", "terraza"]
+
+
+def _rooms(n: int, noches: int):
+    rnd = random.Random(n)
+    rooms = []
+    for i in range(n):
+        precio = Decimal(rnd.randrange(6000, 40000)) / 100
+        rooms.append({
+            "habitacion_id": f"HAB_{i:05d}",
+            "numero": str(100 + i),
+            "tipo": rnd.choice(["standard", "deluxe", "suite"]),
+            "piso": 1 + i // 20,
+            "precio_por_noche": str(precio),
+            "precio_total": str((precio * noches).quantize(Decimal("0.01"))),
+            "caracteristicas": rnd.sample(FEATURES, 3),
+        })
+    return rooms
+
+
+def _payload(n: int):
+    inicio, fin = date(2036, 5, 1), date(2036, 5, 4)
+    rooms = _rooms(n, (fin - inicio).days)
+    return {
+        "hotel_id": "HOTEL_BENCH",
+        "fecha_inicio": inicio,
+        "fecha_fin": fin,
+        "noches": (fin - inicio).days,
+        "habitaciones": rooms,
+        "total_disponibles": len(rooms),
+    }
+
+
+_adapter = TypeAdapter(DisponibilidadResponse)
+
+
+def _via_model(payload) -> bytes:
+    habitaciones = [HabitacionDisponible(**h) for h in payload["habitaciones"]]
+    response = DisponibilidadResponse(**{**payload, "habitaciones": habitaciones})
+    # FastAPI revalida contra response_model y pasa por jsonable_encoder antes de json.dumps
+    validated = _adapter.validate_python(response.model_dump())
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def _via_orjson(payload) -> bytes:
+    return dumps(payload)
+
+
+def _time_us(fn, payload, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return {
+        "p50_us": round(percentile(samples, 50), 1),
+        "p95_us": round(percentile(samples, 95), 1),
+        "p99_us": round(percentile(samples, 99), 1),
+    }
+
+
+def _gzip(body: bytes) -> bytes:
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def _wire(body: bytes, iterations: int):
+    encoders = {"gzip": _gzip}
+    if brotli is not None:
+        encoders["br"] = lambda b: brotli.compress(b, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    result = {"identity_bytes": len(body)}
+    for name, encode in encoders.items():
+        result[f"{name}_bytes"] = len(encode(body))
+        result[f"{name}_compress"] = _time_us(encode, body, iterations)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--output", help="fichero JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    results = {"brotli_disponible": brotli is not None}
+    for n in args.rooms:
+        payload = _payload(n)
+        old, new = _via_model(payload), _via_orjson(payload)
+        # Mismo documento por los dos caminos (solo cambian los espacios)
+        assert json.loads(old) == json.loads(new)
+        iterations = max(20, args.iterations * 50 // max(n, 50))
+        modelo = _time_us(_via_model, payload, iterations)
+        rapido = _time_us(_via_orjson, payload, iterations)
+        results[f"{n}_habitaciones"] = {
+            "iterations": iterations,
+            "modelo": modelo,
+            "orjson": rapido,
+            "speedup_p50": round(modelo["p50_us"] / max(rapido["p50_us"], 0.1), 1),
+            "red": _wire(new, iterations),
+        }
+
+    out = json.dumps(results, indent=2)
+    print(out)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Suite de benchmarks de extremo a extremo: un escenario por operación caliente de cada
+servicio, ejecutado en proceso sobre una BD SQLite temporal con las migraciones aplicadas.
+
+Escenarios:
+  - availability.search[rooms=N,blocked=P]: búsqueda sin cache y con cache, con N
+    habitaciones y una fracción P de ellas bloqueadas en el rango
+  - availability.block_confirm: bloqueo temporal + confirmación
+  - pricing.quote, auth.login, payments.process
+  - reservations.saga: POST /api/v1/reservations completo; las llamadas de ServiceClient
+    a Customers, Pricing, Availability, Payments y Notifications van a las apps reales
+    montadas en proceso (httpx.ASGITransport), sin red
+
+Salida JSON con p50/p95/p99 por escenario. Con --baseline se compara el p95 con una
+ejecución anterior guardada con --output y se sale con código 1 si alguno empeora más
+de --tolerance.
+
+Uso:
+    python -m benchmarks.suite --iterations 200 --output bench.json
+    python -m benchmarks.suite --only saga search --baseline bench.json --tolerance 0.25
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_suite_")
+os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_DB_DIR}/bench.db"
+# Todas las peticiones van con el mismo usuario: sin esto se mediría el limitador
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from benchmarks.customer_search import percentile  # noqa: E402
+
+START = date(2045, 1, 1)
+SEARCH_SIZES = [(50, 0.0), (50, 0.5), (500, 0.0), (500, 0.5)]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict:
+    ms = [t * 1000 for t in latencies]
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "throughput_rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def measure(fn: Callable[[int], None], iterations: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        fn(-1 - i)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _ok(response, status: int = 200):
+    assert response.status_code == status, f"{response.request.method} {response.request.url}: {response.status_code} {response.text}"
+    return response.json()
+
+
+class Environment:
+    """Apps de los siete servicios en proceso sobre el mismo esquema temporal."""
+
+    def __init__(self, durable: bool = False):
+        from fastapi.testclient import TestClient
+        from sqlalchemy import event
+
+        from shared.database import engine
+        from shared.migrations import SERVICES, ensure_schema, load_migrations
+        from shared.security import create_access_token
+        from services.auth.main import app as auth_app
+        from services.availability.main import app as availability_app
+        from services.customers.main import app as customers_app
+        from services.notifications.main import app as notifications_app
+        from services.payments.main import app as payments_app
+        from services.pricing.main import app as pricing_app
+        from services.reservations.main import app as reservations_app
+
+        if not durable:
+            # Sin fsync por commit: en disco local domina la latencia de escritura y
+            # enmascara los cambios del código entre versiones
+            event.listen(engine, "connect", lambda conn, _: conn.execute("PRAGMA synchronous=OFF"))
+        for servicio in SERVICES:
+            ensure_schema(engine, servicio, load_migrations(servicio), auto=True)
+        self.apps = {
+            "auth": auth_app,
+            "customers": customers_app,
+            "availability": availability_app,
+            "pricing": pricing_app,
+            "payments": payments_app,
+            "reservations": reservations_app,
+            "notifications": notifications_app,
+        }
+        # Sin `with`: no se lanzan las tareas de fondo de startup, que solo añadirían ruido
+        self.clients = {name: TestClient(app) for name, app in self.apps.items()}
+        token = create_access_token({"usuario_id": "BENCH", "username": "bench", "rol": "staff"})
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self._route_service_client()
+
+    def _route_service_client(self) -> None:
+        import httpx
+
+        from shared.config import settings
+        from shared.http_client import ServiceClient
+
+        mounts = {
+            getattr(settings, f"{name.upper()}_SERVICE_URL"): httpx.ASGITransport(app=app)
+            for name, app in self.apps.items()
+        }
+
+        def init(client: ServiceClient) -> None:
+            client._client = httpx.AsyncClient(mounts=mounts, timeout=10.0)
+
+        ServiceClient.__init__ = init
+
+    def add_hotel(self, rooms: int, tipo: str = "standard") -> str:
+        from shared.database import SessionLocal
+        from services.availability.models import HabitacionDB
+
+        hotel_id = f"BENCH_{uuid.uuid4().hex[:6]}"
+        db = SessionLocal()
+        try:
+            db.add_all(
+                HabitacionDB(habitacion_id=f"{hotel_id}_{i:04d}", hotel_id=hotel_id, numero=str(i), tipo=tipo, piso=1 + i // 50,
+                             capacidad_maxima=2, precio_base=100, caracteristicas=["wifi"], activa=True)
+                for i in range(rooms)
+            )
+            db.commit()
+        finally:
+            db.close()
+        return hotel_id
+
+    def post(self, service: str, path: str, payload: Dict, status: int = 200, headers: Optional[Dict] = None) -> Dict:
+        return _ok(self.clients[service].post(path, json=payload, headers=headers or self.headers), status)
+
+
+def bench_search(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    from services.availability.search_cache import search_cache
+
+    results = {}
+    inicio, fin = START, START + timedelta(days=3)
+    for rooms, blocked in SEARCH_SIZES:
+        hotel_id = env.add_hotel(rooms)
+        for i in range(int(rooms * blocked)):
+            env.post("availability", "/api/v1/availability/block", {
+                "habitacion_id": f"{hotel_id}_{i:04d}", "fecha_inicio": str(inicio), "fecha_fin": str(fin), "duracion_minutos": 600,
+            })
+        payload = {"hotel_id": hotel_id, "fecha_inicio": str(inicio), "fecha_fin": str(fin), "numero_huespedes": 2}
+        expected = rooms - int(rooms * blocked)
+
+        def search(_: int, clear: bool) -> None:
+            if clear:
+                search_cache.clear()
+            assert len(env.post("availability", "/api/v1/availability/search", payload)["habitaciones"]) == expected
+
+        label = f"rooms={rooms},blocked={blocked:g}"
+        results[f"availability.search[{label}]"] = measure(lambda i: search(i, True), iterations, warmup)
+        results[f"availability.search_cached[{label}]"] = measure(lambda i: search(i, False), iterations, warmup)
+    return results
+
+
+def bench_block_confirm(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    hotel_id = env.add_hotel(10)
+
+    def block_confirm(i: int) -> None:
+        # Cada iteración en noches distintas: nunca choca con un bloqueo anterior
+        day = START + timedelta(days=1000 + i * 2)
+        bloqueo = env.post("availability", "/api/v1/availability/block", {
+            "habitacion_id": f"{hotel_id}_0000", "fecha_inicio": str(day), "fecha_fin": str(day + timedelta(days=1)),
+        })
+        env.post("availability", "/api/v1/availability/confirm", {"bloqueo_id": bloqueo["bloqueo_id"], "reserva_id": f"R{i}"})
+
+    return {"availability.block_confirm": measure(block_confirm, iterations, warmup)}
+
+
+def bench_pricing(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    payload = {
+        "hotel_id": "HOTEL1", "tipo_habitacion": "suite", "fecha_inicio": str(START), "fecha_fin": str(START + timedelta(days=4)),
+        "servicios_adicionales": ["desayuno"],
+    }
+    return {"pricing.quote": measure(lambda i: env.post("pricing", "/api/v1/pricing/calculate", payload), iterations, warmup)}
+
+
+def bench_login(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    username = f"bench_{uuid.uuid4().hex[:6]}"
+    env.post("auth", "/api/v1/auth/register", {
+        "email": f"{username}@example.com", "username": username, "password": "BenchPassword1", "nombre_completo": "Bench User",
+    }, status=201, headers={})
+    credentials = {"username": username, "password": "BenchPassword1"}
+    return {"auth.login": measure(lambda i: env.post("auth", "/api/v1/auth/login", credentials, headers={}), iterations, warmup)}
+
+
+def bench_payments(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    # tok_visa_4242 se aprueba sin la espera simulada de la pasarela: se mide el servicio
+    payload = {"cliente_id": "C_BENCH", "monto": "250.00", "moneda": "USD", "metodo_pago": {"tipo": "tarjeta_credito", "token": "tok_visa_4242"}}
+    return {"payments.process": measure(lambda i: env.post("payments", "/api/v1/payments/process", payload), iterations, warmup)}
+
+
+def bench_saga(env: Environment, iterations: int, warmup: int) -> Dict[str, Dict]:
+    hotel_id = env.add_hotel(20)
+    cliente = env.post("customers", "/api/v1/customers", {
+        "nombre_completo": "Cliente Bench", "email": f"bench_{uuid.uuid4().hex[:6]}@example.com", "telefono": "+573001234567",
+    }, status=201)
+
+    def saga(i: int) -> None:
+        day = START + timedelta(days=2000 + (i % 500) * 3)
+        detalles = env.post("reservations", "/api/v1/reservations", {
+            "cliente_id": cliente["cliente_id"], "hotel_id": hotel_id, "tipo_habitacion": "standard",
+            "fecha_inicio": str(day), "fecha_fin": str(day + timedelta(days=2)),
+            "metodo_pago": {"tipo": "tarjeta_credito", "token": "tok_visa_4242"},
+        })["detalles"]
+        assert detalles.get("reserva_id"), detalles
+
+    return {"reservations.saga": measure(saga, iterations, warmup)}
+
+
+SCENARIOS = {
+    "search": bench_search,
+    "block_confirm": bench_block_confirm,
+    "pricing": bench_pricing,
+    "login": bench_login,
+    "payments": bench_payments,
+    "saga": bench_saga,
+}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[Dict]:
+    """Escenarios cuyo p95 supera el de la referencia en más de `tolerance` (fracción)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append({"scenario": name, "baseline_p95_ms": previous["p95_ms"], "p95_ms": current["p95_ms"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="*", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="fichero donde guardar el JSON (referencia para --baseline)")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--durable", action="store_true", help="mantiene el fsync de SQLite en cada commit")
+    args = parser.parse_args()
+
+    try:
+        env = Environment(durable=args.durable)
+        results: Dict[str, Dict] = {}
+        for name in args.only:
+            # El login está dominado por bcrypt a propósito: con menos iteraciones basta
+            iterations = max(1, args.iterations // 10) if name == "login" else args.iterations
+            results.update(SCENARIOS[name](env, iterations, args.warmup))
+    finally:
+        shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "iterations": args.iterations,
+            "durable": args.durable,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f)["results"], args.tolerance)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    if report.get("regressions"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,29 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Dict
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from shared.database import Base, engine, get_db
+from shared.database import engine, get_db, setup_sql_profiler
+from shared.migrations import ensure_schema
 from shared.security import verify_token
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, setup_compression
+from shared.tracing import setup_tracing
+from services.auth.migrations import MIGRATIONS
 from services.auth.models import UsuarioDB
 from services.auth.schemas import LoginRequest, RegistroRequest, TokenResponse, UsuarioResponse
 from services.auth.service import login_user, register_user
 
 
 logger = logging.getLogger("auth-service")
-app = FastAPI(title="Auth Service", version="1.0.0")
+app = FastAPI(title="Auth Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,12 +32,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "auth", engine)
+setup_metrics(app, "auth", engine)
+setup_readiness(app, "auth", engine)
+setup_sql_profiler(app, engine)
 
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
-    logger.info("Auth service iniciado")
+    started = time.perf_counter()
+    version = ensure_schema(engine, "auth", MIGRATIONS)
+    logger.info(f"Auth service iniciado en {(time.perf_counter() - started) * 1000:.1f} ms (esquema v{version})")
 
 
 @app.get("/health")
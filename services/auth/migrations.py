@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from services.auth.models import UsuarioDB
+from shared.migrations import Migration, create_tables
+
+
+MIGRATIONS = [
+    Migration(1, "esquema base", create_tables(UsuarioDB.__table__)),
+]
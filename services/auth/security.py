@@ -2,23 +2,26 @@ from __future__ import annotations
 
 import re
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Dict
 
-from jose import jwt
-from passlib.context import CryptContext
+from shared.config import settings
 
-from services.auth.config import settings
 
+@lru_cache(maxsize=None)
+def pwd_context():
+    # passlib/bcrypt solo se cargan en el primer registro o login
+    from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def validate_password_rules(password: str) -> bool:
@@ -33,6 +36,8 @@ def validate_password_rules(password: str) -> bool:
 
 
 def create_access_token(payload: Dict[str, Any]) -> str:
+    from jose import jwt
+
     to_encode = payload.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "iat": datetime.utcnow()})
@@ -40,6 +45,8 @@ def create_access_token(payload: Dict[str, Any]) -> str:
 
 
 def create_refresh_token(payload: Dict[str, Any]) -> str:
+    from jose import jwt
+
     to_encode = payload.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "refresh"})
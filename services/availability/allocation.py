@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+
+# Hasta dónde se mira alrededor de la estancia; un hueco más largo cuenta como abierto
+ALLOCATION_HORIZON_DAYS = 60
+
+# (última noche ocupada antes de la estancia, primera noche ocupada después), None si no hay
+Neighbours = Tuple[Optional[date], Optional[date]]
+
+
+def free_gaps(inicio: date, fin: date, anterior: Optional[date], siguiente: Optional[date], horizon: int = ALLOCATION_HORIZON_DAYS) -> Tuple[int, int]:
+    """Noches libres que quedarían antes y después de [inicio, fin] en la habitación."""
+    before = horizon if anterior is None else min(horizon, (inicio - anterior).days - 1)
+    after = horizon if siguiente is None else min(horizon, (siguiente - fin).days - 1)
+    return before, after
+
+
+def fit_key(inicio: date, fin: date, neighbours: Neighbours, horizon: int = ALLOCATION_HORIZON_DAYS) -> Tuple[int, int]:
+    """
+    Best-fit sobre los huecos libres contiguos: primero la habitación donde la estancia
+    queda más pegada a una ocupación existente (menor hueco en el lado más cercano) y,
+    a igualdad, la de intervalo libre más ajustado. En la simulación de
+    benchmarks/room_allocation.py esto deja menos noches sueltas que minimizar solo la
+    suma de huecos.
+    """
+    before, after = free_gaps(inicio, fin, *neighbours, horizon=horizon)
+    return min(before, after), before + after
+
+
+def rank_rooms(candidates: Dict[str, Neighbours], inicio: date, fin: date, horizon: int = ALLOCATION_HORIZON_DAYS) -> List[str]:
+    """Habitaciones libres ordenadas de mejor a peor encaje (desempate por id, determinista)."""
+    return sorted(candidates, key=lambda h: (fit_key(inicio, fin, candidates[h], horizon), h))
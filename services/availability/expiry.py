@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+
+# Resolución con la que se liberan los bloqueos tras caducar
+EXPIRY_TICK_SECONDS = 1.0
+# Barrido completo de respaldo (bloqueos creados por otros procesos o perdidos al reiniciar)
+FULL_SWEEP_SECONDS = 300.0
+
+
+class ExpiryScheduler:
+    """
+    Min-heap de caducidades (expira_en, bloqueo_id) de los bloqueos creados en este proceso.
+
+    El heap solo indica cuándo hay algo vencido: la expiración en sí es un único UPDATE
+    por conjunto, así que las entradas de bloqueos ya confirmados o liberados no hacen
+    daño (el UPDATE solo toca los que siguen activos).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, bloqueo_id: str, expira_en: Optional[datetime]) -> None:
+        if expira_en is None:
+            return
+        with self._lock:
+            heapq.heappush(self._heap, (expira_en, bloqueo_id))
+
+    def load(self, pending: List[Tuple[datetime, str]]) -> None:
+        with self._lock:
+            self._heap = [p for p in pending if p[0] is not None]
+            heapq.heapify(self._heap)
+
+    def next_expiry(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> int:
+        """Retira las entradas vencidas; devuelve cuántas había."""
+        due = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] < now:
+                heapq.heappop(self._heap)
+                due += 1
+        return due
+
+    def run_due(self, now: datetime, expire: Callable[[datetime], int]) -> int:
+        """Si hay caducidades vencidas, ejecuta el UPDATE por conjunto y devuelve las filas expiradas."""
+        if not self.pop_due(now):
+            return 0
+        return expire(now)
+
+
+expiry_scheduler = ExpiryScheduler()
@@ -1,33 +1,59 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 import asyncio
+import logging
+import time
 from typing import Dict
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from shared.database import Base, engine, get_db
+from shared.cache import cache_stats
+from shared.database import SessionLocal, engine, get_db, setup_sql_profiler, settings
+from shared.migrations import ensure_schema
 from shared.security import verify_token
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, json_response, setup_compression
+from shared.tracing import setup_tracing
+from services.availability.expiry import EXPIRY_TICK_SECONDS, FULL_SWEEP_SECONDS, expiry_scheduler
+from services.availability.migrations import MIGRATIONS
 from services.availability.models import HabitacionDB, BloqueoHabitacionDB
+from services.availability.repository import list_pending_expirations
 from services.availability.schemas import (
+    AsignarHabitacionRequest,
+    BloquearGrupoRequest,
     BloquearHabitacionRequest,
+    BloqueoGrupoResponse,
     BloqueoResponse,
     ConsultaDisponibilidadRequest,
     DisponibilidadResponse,
-    HabitacionDisponible,
+    InventarioResponse,
 )
 from services.availability.service import (
+    allocate_room,
+    archive_history,
+    block_group,
     block_room,
     cleanup_expired_blocks,
     confirm_block_reservation,
+    confirm_group_reservation,
+    expire_due_blocks,
+    inventory_summary,
+    reconcile_inventory,
     search_availability,
     release_block,
+    release_group_blocks,
 )
 
+logger = logging.getLogger("availability-service")
 
-app = FastAPI(title="Availability Service", version="1.0.0")
+app = FastAPI(title="Availability Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +62,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "availability", engine)
+setup_metrics(app, "availability", engine)
+setup_readiness(app, "availability", engine)
+setup_sql_profiler(app, engine)
 
 
 @app.get("/health")
@@ -43,26 +75,32 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/api/v1/availability/search")
-def search(payload: ConsultaDisponibilidadRequest, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> DisponibilidadResponse:
-    habitaciones = [
-        HabitacionDisponible(**h) for h in search_availability(
-            db,
-            payload.hotel_id,
-            payload.fecha_inicio,
-            payload.fecha_fin,
-            payload.tipo_habitacion,
-            payload.precio_maximo,
-        )
-    ]
-    return DisponibilidadResponse(
-        hotel_id=payload.hotel_id,
-        fecha_inicio=payload.fecha_inicio,
-        fecha_fin=payload.fecha_fin,
-        noches=(payload.fecha_fin - payload.fecha_inicio).days,
-        habitaciones=habitaciones,
-        total_disponibles=len(habitaciones),
+@app.get("/cache/stats")
+def cache_stats_api() -> Dict:
+    return cache_stats()
+
+
+@app.post("/api/v1/availability/search", response_model=DisponibilidadResponse)
+def search(payload: ConsultaDisponibilidadRequest, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> ORJSONResponse:
+    # search_availability ya devuelve dicts con la forma de HabitacionDisponible (precios
+    # como texto): se serializan directamente, sin construir y revalidar un modelo por
+    # habitación. response_model solo documenta la respuesta.
+    habitaciones = search_availability(
+        db,
+        payload.hotel_id,
+        payload.fecha_inicio,
+        payload.fecha_fin,
+        payload.tipo_habitacion,
+        payload.precio_maximo,
     )
+    return json_response({
+        "hotel_id": payload.hotel_id,
+        "fecha_inicio": payload.fecha_inicio,
+        "fecha_fin": payload.fecha_fin,
+        "noches": (payload.fecha_fin - payload.fecha_inicio).days,
+        "habitaciones": habitaciones,
+        "total_disponibles": len(habitaciones),
+    })
 
 
 @app.post("/api/v1/availability/block")
@@ -71,6 +109,47 @@ def block(payload: BloquearHabitacionRequest, current_user: dict = Depends(verif
     return BloqueoResponse(**data)
 
 
+@app.get("/api/v1/availability/inventory")
+def inventory(hotel_id: str, tipo: str, fecha_inicio: date, fecha_fin: date, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> InventarioResponse:
+    # Solo contadores: no se listan habitaciones
+    return InventarioResponse(**inventory_summary(db, hotel_id, tipo, fecha_inicio, fecha_fin))
+
+
+@app.post("/api/v1/availability/block/allocate")
+def allocate(payload: AsignarHabitacionRequest, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> BloqueoResponse:
+    data = allocate_room(db, payload.hotel_id, payload.tipo_habitacion, payload.fecha_inicio, payload.fecha_fin, payload.duracion_minutos)
+    return BloqueoResponse(**data)
+
+
+@app.post("/api/v1/availability/block/group")
+def block_group_api(payload: BloquearGrupoRequest, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> BloqueoGrupoResponse:
+    # Todas las habitaciones o ninguna, en una sola transacción
+    data = block_group(
+        db,
+        payload.hotel_id,
+        payload.fecha_inicio,
+        payload.fecha_fin,
+        payload.duracion_minutos,
+        habitacion_ids=payload.habitacion_ids,
+        cantidad=payload.cantidad,
+        tipo_habitacion=payload.tipo_habitacion,
+        piso=payload.piso,
+        contiguas=payload.contiguas,
+    )
+    return BloqueoGrupoResponse(**data)
+
+
+@app.post("/api/v1/availability/block/group/{grupo_id}/confirm")
+def confirm_group_api(grupo_id: str, payload: Dict[str, str], current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> Dict:
+    return confirm_group_reservation(db, grupo_id, payload.get("reserva_id", ""))
+
+
+@app.delete("/api/v1/availability/block/group/{grupo_id}")
+def release_group_api(grupo_id: str, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> Dict[str, str]:
+    release_group_blocks(db, grupo_id)
+    return {"message": "grupo de bloqueos liberado"}
+
+
 @app.delete("/api/v1/availability/block/{bloqueo_id}")
 def release(bloqueo_id: str, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> Dict[str, str]:
     release_block(db, bloqueo_id)
@@ -104,31 +183,67 @@ def rooms(hotel_id: str, tipo: str | None = None, current_user: dict = Depends(v
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    version = ensure_schema(engine, "availability", MIGRATIONS)
+
+    # Background task: liberar bloqueos caducados. Cada segundo se mira el heap de
+    # caducidades y, si hay alguna vencida, se expira con un único UPDATE fuera del
+    # event loop; cada 5 minutos se hace además un barrido completo de respaldo.
+    def with_session(fn):
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+
+    with_session(lambda db: expiry_scheduler.load(list_pending_expirations(db)))
 
-    # Background task: cleanup expired blocks every 5 minutes
     async def cleaner():
+        last_sweep = 0.0
+        loop = asyncio.get_running_loop()
         while True:
-            # Use a new DB session for each cleanup
-            from shared.database import SessionLocal
-
-            db = SessionLocal()
             try:
-                cleanup_expired_blocks(db)
-            finally:
-                db.close()
-            await asyncio.sleep(300)
+                if loop.time() - last_sweep >= FULL_SWEEP_SECONDS:
+                    await run_in_threadpool(with_session, cleanup_expired_blocks)
+                    last_sweep = loop.time()
+                else:
+                    await run_in_threadpool(with_session, expire_due_blocks)
+            except Exception as e:
+                logger.error(f"Error expirando bloqueos: {e}")
+            await asyncio.sleep(EXPIRY_TICK_SECONDS)
 
     asyncio.create_task(cleaner())
 
-    # Seed example rooms if empty (insert 10 demo rooms)
-    from shared.database import SessionLocal
-    from sqlalchemy import select
+    # Background task: archivar bloqueos de estancias antiguas (lotes cortos)
+    async def archiver():
+        while True:
+            try:
+                archived = await run_in_threadpool(with_session, archive_history)
+                if archived:
+                    logger.info(f"Bloqueos archivados: {archived}")
+            except Exception as e:
+                logger.error(f"Error archivando bloqueos: {e}")
+            await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+
+    asyncio.create_task(archiver())
+
+    # Background task: corregir la deriva de los contadores de inventario
+    async def inventory_reconciler():
+        while True:
+            try:
+                drift = await run_in_threadpool(with_session, reconcile_inventory)
+                if drift:
+                    logger.warning(f"Contadores de inventario corregidos: {drift} noches")
+            except Exception as e:
+                logger.error(f"Error reconciliando el inventario: {e}")
+            await asyncio.sleep(settings.INVENTORY_RECONCILE_SECONDS)
+
+    asyncio.create_task(inventory_reconciler())
+
+    # Seed example rooms if empty (insert 10 demo rooms); basta con saber si hay alguna fila
     db = SessionLocal()
     try:
-        from services.availability.models import HabitacionDB
-        existing = list(db.scalars(select(HabitacionDB)))
-        if len(existing) == 0:
+        if db.scalar(select(HabitacionDB.id).limit(1)) is None:
             demo_rooms = []
             # Generate HAB001..HAB010 with a mix of types
             for i in range(1, 11):
@@ -159,3 +274,4 @@ def on_startup():
             db.commit()
     finally:
         db.close()
+    logger.info(f"Availability service iniciado en {(time.perf_counter() - started) * 1000:.1f} ms (esquema v{version})")
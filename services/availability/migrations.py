@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from services.availability.models import (
+    BloqueoHabitacionDB,
+    GrupoBloqueoDB,
+    HabitacionDB,
+    InventarioTipoDB,
+    NocheHabitacionDB,
+    bloqueos_habitacion_archivo,
+)
+from services.availability.repository import rebuild_inventory
+from shared.migrations import Migration, create_tables, sync_indexes
+
+
+def _composite_indexes(conn) -> None:
+    sync_indexes(HabitacionDB.__table__, drop=["ix_habitaciones_hotel_id"])(conn)
+    sync_indexes(BloqueoHabitacionDB.__table__, drop=["ix_bloqueos_habitacion_habitacion_id"])(conn)
+
+
+def _inventory_counters(conn) -> None:
+    create_tables(InventarioTipoDB.__table__)(conn)
+    # Contadores iniciales a partir de las noches ya reclamadas
+    with Session(bind=conn) as db:
+        rebuild_inventory(db, date.today())
+
+
+MIGRATIONS = [
+    Migration(1, "esquema base", create_tables(HabitacionDB.__table__, BloqueoHabitacionDB.__table__)),
+    Migration(2, "inventario de noches por habitación", create_tables(NocheHabitacionDB.__table__)),
+    Migration(3, "grupos de bloqueo", create_tables(GrupoBloqueoDB.__table__)),
+    Migration(4, "índices compuestos de habitaciones y bloqueos", _composite_indexes),
+    Migration(5, "tabla de archivo de bloqueos", create_tables(bloqueos_habitacion_archivo)),
+    Migration(6, "contadores de inventario por tipo y noche", _inventory_counters),
+]
@@ -6,22 +6,27 @@ from sqlalchemy import (
     Date,
     DateTime,
     Enum,
+    Index,
     Integer,
     JSON,
     Numeric,
     String,
+    UniqueConstraint,
     func,
 )
 
+from shared.archival import archive_table
 from shared.database import Base
 
 
 class HabitacionDB(Base):
     __tablename__ = "habitaciones"
+    # list_rooms_by_hotel: hotel + activa (+ tipo)
+    __table_args__ = (Index("ix_habitaciones_hotel_activa_tipo", "hotel_id", "activa", "tipo"),)
 
     id = Column(Integer, primary_key=True)
     habitacion_id = Column(String(50), unique=True, index=True)
-    hotel_id = Column(String(50), index=True)
+    hotel_id = Column(String(50))
     numero = Column(String(20))
     tipo = Column(Enum("standard", "deluxe", "suite"))
     piso = Column(Integer)
@@ -33,10 +38,16 @@ class HabitacionDB(Base):
 
 class BloqueoHabitacionDB(Base):
     __tablename__ = "bloqueos_habitacion"
+    __table_args__ = (
+        # Solapes por habitación (overlapping_blocks, occupied_rooms, rango por hotel)
+        Index("ix_bloqueos_habitacion_estado_fechas", "habitacion_id", "estado", "fecha_inicio", "fecha_fin"),
+        # Barrido de caducados: WHERE estado = 'activo' AND expira_en < now
+        Index("ix_bloqueos_estado_expira", "estado", "expira_en"),
+    )
 
     id = Column(Integer, primary_key=True)
     bloqueo_id = Column(String(50), unique=True, index=True)
-    habitacion_id = Column(String(50), index=True)
+    habitacion_id = Column(String(50))
     fecha_inicio = Column(Date)
     fecha_fin = Column(Date)
     tipo = Column(Enum("temporal", "reserva", "mantenimiento"))
@@ -44,3 +55,58 @@ class BloqueoHabitacionDB(Base):
     creado_en = Column(DateTime, server_default=func.now())
     expira_en = Column(DateTime, nullable=True)
     estado = Column(Enum("activo", "expirado", "confirmado"), default="activo")
+
+
+# Bloqueos expirados / confirmados de estancias ya pasadas (ver archive_old_blocks)
+bloqueos_habitacion_archivo = archive_table(BloqueoHabitacionDB.__table__, "bloqueos_habitacion_archivo", "fecha_fin")
+
+
+class NocheHabitacionDB(Base):
+    """
+    Inventario por habitación y día. La clave única (habitacion_id, fecha) hace que
+    reclamar los días de un bloqueo sea atómico: de dos bloqueos concurrentes que se
+    solapan, solo uno puede insertar sus filas.
+    """
+
+    __tablename__ = "noches_habitacion"
+    __table_args__ = (UniqueConstraint("habitacion_id", "fecha", name="uq_noches_habitacion_fecha"),)
+
+    id = Column(Integer, primary_key=True)
+    habitacion_id = Column(String(50), nullable=False)
+    fecha = Column(Date, nullable=False)
+    bloqueo_id = Column(String(50), nullable=False, index=True)
+
+
+class GrupoBloqueoDB(Base):
+    """Bloqueo de grupo: sus bloqueos individuales se confirman o liberan juntos."""
+
+    __tablename__ = "grupos_bloqueo"
+
+    id = Column(Integer, primary_key=True)
+    grupo_id = Column(String(50), unique=True, index=True)
+    hotel_id = Column(String(50))
+    bloqueo_ids = Column(JSON)
+    reserva_id = Column(String(50), nullable=True)
+    creado_en = Column(DateTime, server_default=func.now())
+    expira_en = Column(DateTime, nullable=True)
+    estado = Column(Enum("activo", "confirmado", "liberado"), default="activo")
+
+
+class InventarioTipoDB(Base):
+    """
+    Contadores por hotel, tipo de habitación y noche: habitaciones activas del tipo
+    (total), noches vendidas (bloqueos confirmados) y retenidas (bloqueos activos).
+    Se mantienen en la misma transacción que los bloqueos (ver inventory.py); una
+    noche sin fila equivale a vendidas = retenidas = 0.
+    """
+
+    __tablename__ = "inventario_tipo"
+    __table_args__ = (UniqueConstraint("hotel_id", "tipo", "fecha", name="uq_inventario_tipo_fecha"),)
+
+    id = Column(Integer, primary_key=True)
+    hotel_id = Column(String(50), nullable=False)
+    tipo = Column(String(20), nullable=False)
+    fecha = Column(Date, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    vendidas = Column(Integer, nullable=False, default=0)
+    retenidas = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 import uuid
-from datetime import date, datetime
-from typing import List, Optional
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from sqlalchemy import and_, or_, select
+from sqlalchemy import and_, bindparam, case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from services.availability.models import BloqueoHabitacionDB, HabitacionDB
+from services.availability.allocation import Neighbours
+from services.availability.models import (
+    BloqueoHabitacionDB,
+    GrupoBloqueoDB,
+    HabitacionDB,
+    InventarioTipoDB,
+    NocheHabitacionDB,
+    bloqueos_habitacion_archivo,
+)
+from services.availability.search_cache import record_change
+from shared.archival import archive_in_batches
 
 
 def list_rooms_by_hotel(db: Session, hotel_id: str, tipo: str | None = None) -> List[HabitacionDB]:
@@ -17,6 +29,30 @@ def list_rooms_by_hotel(db: Session, hotel_id: str, tipo: str | None = None) ->
     return list(db.scalars(stmt))
 
 
+def list_rooms_by_ids(db: Session, hotel_id: str, habitacion_ids: Sequence[str]) -> List[HabitacionDB]:
+    stmt = select(HabitacionDB).where(
+        HabitacionDB.hotel_id == hotel_id,
+        HabitacionDB.habitacion_id.in_(habitacion_ids),
+        HabitacionDB.activa == True,
+    )
+    return list(db.scalars(stmt))
+
+
+def list_room_ids(db: Session, hotel_id: str, tipo: str) -> List[str]:
+    """Solo los ids (el índice hotel/activa/tipo cubre la consulta, sin cargar filas)."""
+    stmt = select(HabitacionDB.habitacion_id).where(
+        HabitacionDB.hotel_id == hotel_id, HabitacionDB.activa == True, HabitacionDB.tipo == tipo
+    )
+    return list(db.scalars(stmt))
+
+
+def count_rooms(db: Session, hotel_id: str, tipo: str) -> int:
+    stmt = select(func.count()).select_from(HabitacionDB).where(
+        HabitacionDB.hotel_id == hotel_id, HabitacionDB.activa == True, HabitacionDB.tipo == tipo
+    )
+    return db.scalar(stmt)
+
+
 def overlapping_blocks(db: Session, habitacion_id: str, inicio: date, fin: date) -> List[BloqueoHabitacionDB]:
     # Overlap if (start <= existing.fin) and (end >= existing.inicio)
     stmt = select(BloqueoHabitacionDB).where(
@@ -28,17 +64,27 @@ def overlapping_blocks(db: Session, habitacion_id: str, inicio: date, fin: date)
 
 
 def list_active_blocks_in_range(db: Session, hotel_id: str, inicio: date, fin: date) -> List[BloqueoHabitacionDB]:
-    rooms_stmt = select(HabitacionDB.habitacion_id).where(HabitacionDB.hotel_id == hotel_id)
-    stmt = select(BloqueoHabitacionDB).where(
-        BloqueoHabitacionDB.habitacion_id.in_(rooms_stmt),
-        BloqueoHabitacionDB.estado == "activo",
-        and_(inicio <= BloqueoHabitacionDB.fecha_fin, fin >= BloqueoHabitacionDB.fecha_inicio),
+    # JOIN en lugar de IN (subconsulta): recorre las habitaciones del hotel y busca
+    # sus bloqueos por el índice (habitacion_id, estado, fechas)
+    stmt = (
+        select(BloqueoHabitacionDB)
+        .join(HabitacionDB, HabitacionDB.habitacion_id == BloqueoHabitacionDB.habitacion_id)
+        .where(
+            HabitacionDB.hotel_id == hotel_id,
+            BloqueoHabitacionDB.estado == "activo",
+            and_(inicio <= BloqueoHabitacionDB.fecha_fin, fin >= BloqueoHabitacionDB.fecha_inicio),
+        )
     )
     return list(db.scalars(stmt))
 
 
-def create_block(db: Session, habitacion_id: str, inicio: date, fin: date, expira_en: Optional[datetime], tipo: str = "temporal", reserva_id: Optional[str] = None) -> BloqueoHabitacionDB:
-    bloqueo = BloqueoHabitacionDB(
+def block_days(inicio: date, fin: date) -> List[date]:
+    # Mismo criterio que overlapping_blocks: el rango ocupa [inicio, fin] inclusive
+    return [inicio + timedelta(days=i) for i in range((fin - inicio).days + 1)]
+
+
+def _new_block(habitacion_id: str, inicio: date, fin: date, expira_en: Optional[datetime], tipo: str, reserva_id: Optional[str]) -> BloqueoHabitacionDB:
+    return BloqueoHabitacionDB(
         bloqueo_id=str(uuid.uuid4())[:8],
         habitacion_id=habitacion_id,
         fecha_inicio=inicio,
@@ -48,23 +94,218 @@ def create_block(db: Session, habitacion_id: str, inicio: date, fin: date, expir
         expira_en=expira_en,
         estado="activo",
     )
+
+
+def _claim_days(db: Session, bloqueos: Sequence[BloqueoHabitacionDB]) -> None:
+    db.execute(
+        insert(NocheHabitacionDB),
+        [
+            {"habitacion_id": b.habitacion_id, "fecha": d, "bloqueo_id": b.bloqueo_id}
+            for b in bloqueos
+            for d in block_days(b.fecha_inicio, b.fecha_fin)
+        ],
+    )
+
+
+def create_block(db: Session, habitacion_id: str, inicio: date, fin: date, expira_en: Optional[datetime], tipo: str = "temporal", reserva_id: Optional[str] = None) -> Optional[BloqueoHabitacionDB]:
+    """Crea el bloqueo y reclama sus días en la misma transacción; None si algún día ya estaba tomado."""
+    bloqueo = _new_block(habitacion_id, inicio, fin, expira_en, tipo, reserva_id)
     db.add(bloqueo)
-    db.commit()
+    try:
+        db.flush()
+        _claim_days(db, [bloqueo])
+        shift_inventory(db, [bloqueo], None, "activo")
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(bloqueo)
     return bloqueo
 
 
+def occupied_rooms(db: Session, habitacion_ids: Sequence[str], inicio: date, fin: date) -> Set[str]:
+    """Habitaciones con algún día tomado en [inicio, fin], en una sola consulta por rango."""
+    if not habitacion_ids:
+        return set()
+    by_days = select(NocheHabitacionDB.habitacion_id).where(
+        NocheHabitacionDB.habitacion_id.in_(habitacion_ids),
+        NocheHabitacionDB.fecha.between(inicio, fin),
+    )
+    # Bloqueos activos anteriores a noches_habitacion (sin días reclamados)
+    by_blocks = select(BloqueoHabitacionDB.habitacion_id).where(
+        BloqueoHabitacionDB.habitacion_id.in_(habitacion_ids),
+        BloqueoHabitacionDB.estado == "activo",
+        and_(inicio <= BloqueoHabitacionDB.fecha_fin, fin >= BloqueoHabitacionDB.fecha_inicio),
+    )
+    return set(db.scalars(by_days.union(by_blocks)))
+
+
+def room_neighbours(db: Session, habitacion_ids: Sequence[str], inicio: date, fin: date, horizon: int) -> Dict[str, Neighbours]:
+    """
+    Para cada habitación, la última noche ocupada antes de `inicio` y la primera después
+    de `fin` dentro de ±horizon días: una sola consulta agregada sobre noches_habitacion.
+    """
+    result: Dict[str, Neighbours] = {h: (None, None) for h in habitacion_ids}
+    if not habitacion_ids:
+        return result
+    fecha = NocheHabitacionDB.fecha
+    stmt = (
+        select(
+            NocheHabitacionDB.habitacion_id,
+            func.max(case((fecha < inicio, fecha))),
+            func.min(case((fecha > fin, fecha))),
+        )
+        .where(
+            NocheHabitacionDB.habitacion_id.in_(habitacion_ids),
+            fecha.between(inicio - timedelta(days=horizon), fin + timedelta(days=horizon)),
+        )
+        .group_by(NocheHabitacionDB.habitacion_id)
+    )
+    for habitacion_id, anterior, siguiente in db.execute(stmt):
+        result[habitacion_id] = (anterior, siguiente)
+    return result
+
+
+def create_group_blocks(db: Session, hotel_id: str, habitacion_ids: Sequence[str], inicio: date, fin: date, expira_en: Optional[datetime]) -> Optional[GrupoBloqueoDB]:
+    """Crea los bloqueos del grupo, sus días y el grupo en una única transacción (todo o nada)."""
+    bloqueos = [_new_block(h, inicio, fin, expira_en, "temporal", None) for h in habitacion_ids]
+    grupo = GrupoBloqueoDB(
+        grupo_id=str(uuid.uuid4())[:8],
+        hotel_id=hotel_id,
+        bloqueo_ids=[b.bloqueo_id for b in bloqueos],
+        expira_en=expira_en,
+        estado="activo",
+    )
+    db.add_all([*bloqueos, grupo])
+    try:
+        db.flush()
+        _claim_days(db, bloqueos)
+        shift_inventory(db, bloqueos, None, "activo")
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    db.refresh(grupo)
+    return grupo
+
+
+def get_group(db: Session, grupo_id: str) -> Optional[GrupoBloqueoDB]:
+    return db.scalar(select(GrupoBloqueoDB).where(GrupoBloqueoDB.grupo_id == grupo_id))
+
+
+def confirm_group(db: Session, grupo: GrupoBloqueoDB, reserva_id: str) -> bool:
+    """Confirma todos los bloqueos del grupo o ninguno (False si alguno ya no está activo)."""
+    result = db.execute(
+        update(BloqueoHabitacionDB)
+        .where(BloqueoHabitacionDB.bloqueo_id.in_(grupo.bloqueo_ids), BloqueoHabitacionDB.estado == "activo")
+        .values(estado="confirmado", reserva_id=reserva_id)
+    )
+    if result.rowcount != len(grupo.bloqueo_ids):
+        db.rollback()
+        return False
+    shift_inventory(db, _group_blocks(db, grupo), "activo", "confirmado")
+    grupo.estado = "confirmado"
+    grupo.reserva_id = reserva_id
+    db.add(grupo)
+    db.commit()
+    return True
+
+
+def _group_blocks(db: Session, grupo: GrupoBloqueoDB) -> List[BloqueoHabitacionDB]:
+    return list(db.scalars(select(BloqueoHabitacionDB).where(BloqueoHabitacionDB.bloqueo_id.in_(grupo.bloqueo_ids))))
+
+
+def release_group(db: Session, grupo: GrupoBloqueoDB) -> None:
+    bloqueos = _group_blocks(db, grupo)
+    for estado in INVENTORY_COUNTERS:
+        shift_inventory(db, [b for b in bloqueos if b.estado == estado], estado, None)
+    db.execute(
+        update(BloqueoHabitacionDB)
+        .where(BloqueoHabitacionDB.bloqueo_id.in_(grupo.bloqueo_ids))
+        .values(estado="expirado")
+    )
+    release_block_days(db, grupo.bloqueo_ids)
+    grupo.estado = "liberado"
+    db.add(grupo)
+    db.commit()
+
+
+def release_block_days(db: Session, bloqueo_ids: Iterable[str]) -> None:
+    """Devuelve los días al inventario (sin commit: va en la transacción del llamador)."""
+    db.execute(delete(NocheHabitacionDB).where(NocheHabitacionDB.bloqueo_id.in_(list(bloqueo_ids))))
+
+
 def get_block(db: Session, bloqueo_id: str) -> Optional[BloqueoHabitacionDB]:
     return db.scalar(select(BloqueoHabitacionDB).where(BloqueoHabitacionDB.bloqueo_id == bloqueo_id))
 
 
 def expire_block(db: Session, bloqueo: BloqueoHabitacionDB):
+    shift_inventory(db, [bloqueo], bloqueo.estado, "expirado")
     bloqueo.estado = "expirado"
     db.add(bloqueo)
+    release_block_days(db, [bloqueo.bloqueo_id])
+    db.commit()
+
+
+def expire_blocks_before(db: Session, now: datetime) -> int:
+    """Expira en bloque los bloqueos activos vencidos y libera sus días; devuelve cuántos expiró."""
+    expired = and_(
+        BloqueoHabitacionDB.estado == "activo",
+        BloqueoHabitacionDB.expira_en.is_not(None),
+        BloqueoHabitacionDB.expira_en < now,
+    )
+    # FOR UPDATE (MySQL): ninguno puede confirmarse entre la lectura y el UPDATE, así
+    # los contadores descuentan exactamente los bloqueos que se expiran
+    rows = db.execute(
+        select(BloqueoHabitacionDB.bloqueo_id, BloqueoHabitacionDB.habitacion_id, BloqueoHabitacionDB.fecha_inicio, BloqueoHabitacionDB.fecha_fin)
+        .where(expired)
+        .with_for_update()
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+    ids = [r.bloqueo_id for r in rows]
+    shift_inventory(db, rows, "activo", "expirado")
+    release_block_days(db, ids)
+    result = db.execute(
+        update(BloqueoHabitacionDB)
+        .where(BloqueoHabitacionDB.bloqueo_id.in_(ids), BloqueoHabitacionDB.estado == "activo")
+        .values(estado="expirado")
+    )
     db.commit()
+    return result.rowcount
+
+
+def list_pending_expirations(db: Session) -> List[tuple]:
+    """(expira_en, bloqueo_id) de los bloqueos activos con caducidad."""
+    stmt = select(BloqueoHabitacionDB.expira_en, BloqueoHabitacionDB.bloqueo_id).where(
+        BloqueoHabitacionDB.estado == "activo",
+        BloqueoHabitacionDB.expira_en.is_not(None),
+    )
+    return [tuple(r) for r in db.execute(stmt)]
+
+
+def archive_old_blocks(db: Session, cutoff: date, batch_size: int, pause_seconds: float = 0.0) -> int:
+    """Archiva los bloqueos no activos que terminaron antes de `cutoff` (y libera sus días)."""
+    table = BloqueoHabitacionDB.__table__
+
+    def release_days(db: Session, ids: List[int]) -> None:
+        archived = select(table.c.bloqueo_id).where(table.c.id.in_(ids))
+        db.execute(delete(NocheHabitacionDB).where(NocheHabitacionDB.bloqueo_id.in_(archived)))
+
+    return archive_in_batches(
+        db,
+        table,
+        bloqueos_habitacion_archivo,
+        and_(table.c.estado.in_(("expirado", "confirmado")), table.c.fecha_fin < cutoff),
+        batch_size,
+        pause_seconds,
+        on_batch=release_days,
+    )
 
 
 def confirm_block(db: Session, bloqueo: BloqueoHabitacionDB, reserva_id: str):
+    shift_inventory(db, [bloqueo], bloqueo.estado, "confirmado")
     bloqueo.estado = "confirmado"
     bloqueo.reserva_id = reserva_id
     db.add(bloqueo)
@@ -74,5 +315,178 @@ def confirm_block(db: Session, bloqueo: BloqueoHabitacionDB, reserva_id: str):
 
 
 def delete_block(db: Session, bloqueo: BloqueoHabitacionDB):
+    shift_inventory(db, [bloqueo], bloqueo.estado, None)
+    release_block_days(db, [bloqueo.bloqueo_id])
     db.delete(bloqueo)
     db.commit()
+
+
+# --- Contadores de inventario por hotel / tipo / noche ---
+
+# Contador que ocupa cada estado de bloqueo; expirado no ocupa nada
+INVENTORY_COUNTERS = {"activo": "retenidas", "confirmado": "vendidas"}
+
+_inventory = InventarioTipoDB.__table__
+_insert_inventory_rows = (
+    insert(_inventory).prefix_with("OR IGNORE", dialect="sqlite").prefix_with("IGNORE", dialect="mysql")
+)
+_shift_inventory = (
+    update(_inventory)
+    .where(
+        _inventory.c.hotel_id == bindparam("k_hotel"),
+        _inventory.c.tipo == bindparam("k_tipo"),
+        _inventory.c.fecha == bindparam("k_fecha"),
+    )
+    .values(
+        vendidas=_inventory.c.vendidas + bindparam("d_vendidas"),
+        retenidas=_inventory.c.retenidas + bindparam("d_retenidas"),
+    )
+)
+
+InventoryKey = Tuple[str, str, date]
+
+
+def _room_totals(db: Session, hotel_ids: Optional[Iterable[str]] = None) -> Dict[Tuple[str, str], int]:
+    stmt = (
+        select(HabitacionDB.hotel_id, HabitacionDB.tipo, func.count())
+        .where(HabitacionDB.activa == True)
+        .group_by(HabitacionDB.hotel_id, HabitacionDB.tipo)
+    )
+    if hotel_ids is not None:
+        stmt = stmt.where(HabitacionDB.hotel_id.in_(list(hotel_ids)))
+    return {(h, t): n for h, t, n in db.execute(stmt)}
+
+
+def _ensure_inventory_rows(db: Session, keys: Iterable[InventoryKey]) -> None:
+    keys = list(keys)
+    totals = _room_totals(db, {h for h, _, _ in keys})
+    db.execute(
+        _insert_inventory_rows,
+        [
+            {"hotel_id": h, "tipo": t, "fecha": f, "total": totals.get((h, t), 0), "vendidas": 0, "retenidas": 0}
+            for h, t, f in keys
+        ],
+    )
+
+
+def shift_inventory(db: Session, bloqueos: Iterable, desde: Optional[str], hacia: Optional[str]) -> None:
+    """
+    Mueve las noches de los bloqueos del contador de su estado `desde` al de `hacia`
+    (estados de bloqueo; None = libre). Sin commit: va en la transacción del bloqueo.
+    """
+    origen, destino = INVENTORY_COUNTERS.get(desde), INVENTORY_COUNTERS.get(hacia)
+    bloqueos = list(bloqueos)
+    if origen == destino or not bloqueos:
+        return
+    stmt = select(HabitacionDB.habitacion_id, HabitacionDB.hotel_id, HabitacionDB.tipo).where(
+        HabitacionDB.habitacion_id.in_({b.habitacion_id for b in bloqueos})
+    )
+    rooms = {habitacion_id: (hotel_id, tipo) for habitacion_id, hotel_id, tipo in db.execute(stmt)}
+    deltas: Counter = Counter()
+    for b in bloqueos:
+        room = rooms.get(b.habitacion_id)
+        if room is None:
+            continue  # habitación no registrada: no pertenece al inventario de ningún hotel
+        # La cache de búsquedas se invalida para ese hotel y rango cuando se confirme la transacción
+        record_change(db, room[0], b.fecha_inicio, b.fecha_fin)
+        for day in block_days(b.fecha_inicio, b.fecha_fin):
+            deltas[(*room, day)] += 1
+    if not deltas:
+        return
+    _ensure_inventory_rows(db, deltas)
+    db.execute(
+        _shift_inventory,
+        [
+            {
+                "k_hotel": h,
+                "k_tipo": t,
+                "k_fecha": f,
+                "d_vendidas": n * ((destino == "vendidas") - (origen == "vendidas")),
+                "d_retenidas": n * ((destino == "retenidas") - (origen == "retenidas")),
+            }
+            for (h, t, f), n in deltas.items()
+        ],
+    )
+
+
+def inventory_nights(db: Session, hotel_id: str, tipo: str, inicio: date, fin: date) -> List[Dict]:
+    """Contadores de cada noche de [inicio, fin]; las noches sin fila no tienen nada vendido ni retenido."""
+    stmt = select(_inventory.c.fecha, _inventory.c.total, _inventory.c.vendidas, _inventory.c.retenidas).where(
+        _inventory.c.hotel_id == hotel_id,
+        _inventory.c.tipo == tipo,
+        _inventory.c.fecha.between(inicio, fin),
+    )
+    rows = {r.fecha: r for r in db.execute(stmt)}
+    total = None
+    nights = []
+    for day in block_days(inicio, fin):
+        row = rows.get(day)
+        if row is None:
+            if total is None:
+                total = count_rooms(db, hotel_id, tipo)
+            nights.append({"fecha": day, "total": total, "vendidas": 0, "retenidas": 0})
+        else:
+            nights.append({"fecha": day, "total": row.total, "vendidas": row.vendidas, "retenidas": row.retenidas})
+    return nights
+
+
+def rebuild_inventory(db: Session, desde: date) -> int:
+    """
+    Recalcula los contadores de las noches >= `desde` a partir de noches_habitacion y
+    corrige los que habían derivado; devuelve cuántos corrigió. Cada corrección es un
+    compare-and-set sobre los valores leídos, así que no pisa reservas concurrentes
+    (si una fila cambió entre medias se corrige en la siguiente pasada).
+    """
+    totals = _room_totals(db)
+    stmt = (
+        select(HabitacionDB.hotel_id, HabitacionDB.tipo, NocheHabitacionDB.fecha, BloqueoHabitacionDB.estado, func.count())
+        .join(BloqueoHabitacionDB, BloqueoHabitacionDB.bloqueo_id == NocheHabitacionDB.bloqueo_id)
+        .join(HabitacionDB, HabitacionDB.habitacion_id == NocheHabitacionDB.habitacion_id)
+        .where(NocheHabitacionDB.fecha >= desde, BloqueoHabitacionDB.estado.in_(list(INVENTORY_COUNTERS)))
+        .group_by(HabitacionDB.hotel_id, HabitacionDB.tipo, NocheHabitacionDB.fecha, BloqueoHabitacionDB.estado)
+    )
+    expected: Dict[InventoryKey, Dict[str, int]] = {}
+    for hotel_id, tipo, fecha, estado, n in db.execute(stmt):
+        counters = expected.setdefault(
+            (hotel_id, tipo, fecha), {"total": totals.get((hotel_id, tipo), 0), "vendidas": 0, "retenidas": 0}
+        )
+        counters[INVENTORY_COUNTERS[estado]] = n
+    current = {
+        (r.hotel_id, r.tipo, r.fecha): {"total": r.total, "vendidas": r.vendidas, "retenidas": r.retenidas}
+        for r in db.execute(select(_inventory).where(_inventory.c.fecha >= desde))
+    }
+    missing = [key for key in expected if key not in current]
+    if missing:
+        _ensure_inventory_rows(db, missing)
+    fixes = []
+    for key in expected.keys() | current.keys():
+        hotel_id, tipo, fecha = key
+        want = expected.get(key) or {"total": totals.get((hotel_id, tipo), 0), "vendidas": 0, "retenidas": 0}
+        have = current.get(key) or {"total": want["total"], "vendidas": 0, "retenidas": 0}
+        if want != have:
+            fixes.append({
+                "k_hotel": hotel_id, "k_tipo": tipo, "k_fecha": fecha,
+                "old_vendidas": have["vendidas"], "old_retenidas": have["retenidas"],
+                "new_total": want["total"], "new_vendidas": want["vendidas"], "new_retenidas": want["retenidas"],
+            })
+    if fixes:
+        db.execute(
+            update(_inventory)
+            .where(
+                _inventory.c.hotel_id == bindparam("k_hotel"),
+                _inventory.c.tipo == bindparam("k_tipo"),
+                _inventory.c.fecha == bindparam("k_fecha"),
+                _inventory.c.vendidas == bindparam("old_vendidas"),
+                _inventory.c.retenidas == bindparam("old_retenidas"),
+            )
+            .values(total=bindparam("new_total"), vendidas=bindparam("new_vendidas"), retenidas=bindparam("new_retenidas")),
+            fixes,
+        )
+    db.commit()
+    return len(fixes)
+
+
+def prune_inventory(db: Session, before: date) -> int:
+    result = db.execute(delete(_inventory).where(_inventory.c.fecha < before))
+    db.commit()
+    return result.rowcount
@@ -4,7 +4,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ConsultaDisponibilidadRequest(BaseModel):
@@ -47,3 +47,60 @@ class BloqueoResponse(BaseModel):
     habitacion_id: str
     expira_en: datetime
     estado: str
+
+
+class AsignarHabitacionRequest(BaseModel):
+    """Bloqueo de una habitación cualquiera del tipo (la elige el servicio)."""
+
+    hotel_id: str
+    tipo_habitacion: str
+    fecha_inicio: date
+    fecha_fin: date
+    duracion_minutos: int = 15
+
+
+class NocheInventario(BaseModel):
+    fecha: date
+    total: int
+    vendidas: int
+    retenidas: int
+    disponibles: int
+
+
+class InventarioResponse(BaseModel):
+    hotel_id: str
+    tipo: str
+    fecha_inicio: date
+    fecha_fin: date
+    disponibles: int
+    noches: List[NocheInventario]
+
+
+class BloquearGrupoRequest(BaseModel):
+    """Bloqueo de varias habitaciones a la vez: lista explícita o selección automática."""
+
+    hotel_id: str
+    fecha_inicio: date
+    fecha_fin: date
+    habitacion_ids: Optional[List[str]] = Field(default=None, min_length=1, max_length=200)
+    cantidad: Optional[int] = Field(default=None, ge=1, le=200)
+    tipo_habitacion: Optional[str] = None
+    piso: Optional[int] = None
+    contiguas: bool = False
+    duracion_minutos: int = 15
+
+    @model_validator(mode="after")
+    def check_seleccion(self):
+        if (self.habitacion_ids is None) == (self.cantidad is None):
+            raise ValueError("Indicar habitacion_ids o cantidad (no ambos)")
+        if self.fecha_fin < self.fecha_inicio:
+            raise ValueError("fecha_fin debe ser posterior a fecha_inicio")
+        return self
+
+
+class BloqueoGrupoResponse(BaseModel):
+    grupo_id: str
+    estado: str
+    expira_en: Optional[datetime]
+    habitaciones: List[str]
+    bloqueos: List[str]
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from shared.cache import register_cache
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE = "availability.search"
+# Evento publicado tras cada commit que cambia bloqueos: {"hotel_id", "fecha_inicio", "fecha_fin"}
+AVAILABILITY_CHANGED = "disponibilidad.cambiada"
+# Clave de Session.info donde el repositorio anota los rangos tocados en la transacción
+_PENDING_CHANGES = "availability_changes"
+
+
+def record_change(db: Session, hotel_id: str, inicio: date, fin: date) -> None:
+    """Anota un rango de noches de un hotel cuyo estado cambia; se publica al hacer commit."""
+    db.info.setdefault(_PENDING_CHANGES, []).append((hotel_id, inicio, fin))
+
+
+def _merge(changes: List[Tuple[str, date, date]]) -> Dict[str, Tuple[date, date]]:
+    # Un evento por hotel y commit (un grupo de 200 habitaciones no publica 200)
+    merged: Dict[str, Tuple[date, date]] = {}
+    for hotel_id, inicio, fin in changes:
+        prev = merged.get(hotel_id)
+        merged[hotel_id] = (inicio, fin) if prev is None else (min(prev[0], inicio), max(prev[1], fin))
+    return merged
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(db: Session) -> None:
+    changes = db.info.pop(_PENDING_CHANGES, None)
+    if not changes:
+        return
+    for hotel_id, (inicio, fin) in _merge(changes).items():
+        event_bus.publicar(AVAILABILITY_CHANGED, {"hotel_id": hotel_id, "fecha_inicio": inicio, "fecha_fin": fin})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(db: Session) -> None:
+    db.info.pop(_PENDING_CHANGES, None)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    hotel_id: str
+    inicio: date
+    fin: date
+    fresh_until: float
+    stale_until: float
+    hits: int = 0
+
+
+class SearchCache:
+    """
+    Resultados de search_availability por consulta (hotel, fechas, tipo, precio máximo).
+
+    Un cambio de bloqueos en [a, b] de un hotel invalida solo las consultas de ese hotel
+    cuyo rango se solapa (el mismo criterio con el que la búsqueda descarta bloqueos).
+    Las entradas con al menos `hot_hits` aciertos se siguen sirviendo durante
+    `stale_ttl` tras caducar mientras un hilo las recalcula (stale-while-revalidate).
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float, hot_hits: int, maxsize: int,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hot_hits = hot_hits
+        self.maxsize = maxsize
+        self.session_factory = session_factory
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.refreshes = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_hotel: Dict[str, Set[str]] = {}
+        # Se incrementa con cada invalidación del hotel: una carga que empezó antes no se guarda
+        self._generation: Dict[str, int] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+
+    @staticmethod
+    def key(hotel_id: str, inicio: date, fin: date, tipo: Optional[str], precio_maximo: Optional[Decimal]) -> str:
+        return f"{hotel_id}|{inicio}|{fin}|{tipo or ''}|{precio_maximo or ''}"
+
+    def get_or_load(self, db: Session, hotel_id: str, inicio: date, fin: date, key: str, loader: Callable[[Session], Any]) -> Any:
+        if self.ttl <= 0:
+            return loader(db)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                entry.hits += 1
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if entry is not None and now < entry.stale_until and entry.hits >= self.hot_hits and self.session_factory:
+                entry.hits += 1
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self._executor.submit(self._refresh, key, entry, loader)
+                return entry.value
+            self.misses += 1
+            generation = self._generation.get(hotel_id, 0)
+        value = loader(db)
+        self._store(key, hotel_id, inicio, fin, value, generation, hits=0)
+        return value
+
+    def _refresh(self, key: str, old: _Entry, loader: Callable[[Session], Any]) -> None:
+        try:
+            with self._lock:
+                generation = self._generation.get(old.hotel_id, 0)
+            db = self.session_factory()
+            try:
+                value = loader(db)
+            finally:
+                db.close()
+            # Conserva los aciertos: la clave sigue siendo caliente tras recalcularse
+            if self._store(key, old.hotel_id, old.inicio, old.fin, value, generation, hits=old.hits):
+                with self._lock:
+                    self.refreshes += 1
+        except Exception as e:
+            logger.error(f"Error recalculando la búsqueda {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: str, hotel_id: str, inicio: date, fin: date, value: Any, generation: int, hits: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._generation.get(hotel_id, 0) != generation:
+                return False
+            self._entries[key] = _Entry(value, hotel_id, inicio, fin, now + self.ttl, now + self.ttl + self.stale_ttl, hits)
+            self._entries.move_to_end(key)
+            self._by_hotel.setdefault(hotel_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                evicted, old = self._entries.popitem(last=False)
+                self._forget(evicted, old.hotel_id)
+            return True
+
+    def _forget(self, key: str, hotel_id: str) -> None:
+        keys = self._by_hotel.get(hotel_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_hotel[hotel_id]
+
+    def invalidate(self, hotel_id: str, inicio: date, fin: date) -> int:
+        """Elimina las consultas del hotel que se solapan con [inicio, fin]; devuelve cuántas."""
+        with self._lock:
+            self._generation[hotel_id] = self._generation.get(hotel_id, 0) + 1
+            stale = [k for k in self._by_hotel.get(hotel_id, ()) if self._entries[k].inicio <= fin and self._entries[k].fin >= inicio]
+            for k in stale:
+                del self._entries[k]
+                self._forget(k, hotel_id)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def on_availability_changed(self, datos: dict) -> None:
+        self.invalidate(datos["hotel_id"], datos["fecha_inicio"], datos["fecha_fin"])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_hotel.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, stale_hits, misses = self.hits, self.stale_hits, self.misses
+            result = {
+                "hits": hits,
+                "stale_hits": stale_hits,
+                "misses": misses,
+                "invalidations": self.invalidations,
+                "refreshes": self.refreshes,
+                "size": len(self._entries),
+            }
+        total = hits + stale_hits + misses
+        result["hit_rate"] = round((hits + stale_hits) / total, 4) if total else 0.0
+        return result
+
+
+def _make_search_cache() -> SearchCache:
+    cache = SearchCache(
+        SEARCH_CACHE,
+        ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+        stale_ttl=settings.SEARCH_CACHE_STALE_SECONDS,
+        hot_hits=settings.SEARCH_CACHE_HOT_HITS,
+        maxsize=settings.SEARCH_CACHE_MAXSIZE,
+        session_factory=SessionLocal,
+    )
+    event_bus.suscribir(AVAILABILITY_CHANGED, cache.on_availability_changed)
+    return register_cache(cache)
+
+
+search_cache = _make_search_cache()
@@ -1,29 +1,70 @@
 from __future__ import annotations
 
+import threading
+from contextlib import nullcontext
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List
+from typing import ContextManager, Dict, List, Optional, Sequence
 
 from sqlalchemy.orm import Session
 
+from services.availability.allocation import ALLOCATION_HORIZON_DAYS, rank_rooms
+from services.availability.expiry import expiry_scheduler
 from services.availability.models import HabitacionDB
 from services.availability.repository import (
+    archive_old_blocks,
     confirm_block,
+    confirm_group,
     create_block,
+    create_group_blocks,
     expire_block,
+    expire_blocks_before,
     get_block,
+    get_group,
+    inventory_nights,
     list_active_blocks_in_range,
+    list_room_ids,
     list_rooms_by_hotel,
+    list_rooms_by_ids,
+    occupied_rooms,
     overlapping_blocks,
+    prune_inventory,
+    rebuild_inventory,
+    release_group,
+    room_neighbours,
 )
+from services.availability.search_cache import search_cache
+from shared.database import settings
 from shared.exceptions import BadRequestError, NotFoundError
 
 
+# SQLite admite un único escritor por fichero: con varios hilos escribiendo a la vez
+# (aunque sea sobre habitaciones distintas) acaba en "database is locked", así que
+# allí los bloqueos se serializan en el proceso. La garantía frente a dobles
+# reservas sigue siendo la clave única de noches_habitacion.
+_sqlite_write_lock = threading.Lock()
+
+
+def _claim_lock(db: Session) -> ContextManager:
+    if db.get_bind().dialect.name != "sqlite":
+        return nullcontext()
+    return _sqlite_write_lock
+
+
 def nights_between(start: date, end: date) -> int:
     return (end - start).days
 
 
 def search_availability(db: Session, hotel_id: str, fecha_inicio: date, fecha_fin: date, tipo_habitacion: str | None, precio_maximo: Decimal | None) -> List[dict]:
+    """Servida desde search_cache; cada bloqueo, confirmación o liberación del rango la invalida."""
+    key = search_cache.key(hotel_id, fecha_inicio, fecha_fin, tipo_habitacion, precio_maximo)
+    return search_cache.get_or_load(
+        db, hotel_id, fecha_inicio, fecha_fin, key,
+        lambda s: _search_availability(s, hotel_id, fecha_inicio, fecha_fin, tipo_habitacion, precio_maximo),
+    )
+
+
+def _search_availability(db: Session, hotel_id: str, fecha_inicio: date, fecha_fin: date, tipo_habitacion: str | None, precio_maximo: Decimal | None) -> List[dict]:
     rooms = list_rooms_by_hotel(db, hotel_id, tipo_habitacion)
     blocks = list_active_blocks_in_range(db, hotel_id, fecha_inicio, fecha_fin)
     blocked_ids = {b.habitacion_id for b in blocks}
@@ -51,10 +92,66 @@ def search_availability(db: Session, hotel_id: str, fecha_inicio: date, fecha_fi
 
 
 def block_room(db: Session, habitacion_id: str, fecha_inicio: date, fecha_fin: date, duracion_minutos: int) -> dict:
-    if overlapping_blocks(db, habitacion_id, fecha_inicio, fecha_fin):
+    if fecha_fin < fecha_inicio:
+        raise BadRequestError("fecha_fin debe ser posterior a fecha_inicio")
+    expira = datetime.utcnow() + timedelta(minutes=duracion_minutos)
+    with _claim_lock(db):
+        # La consulta previa descarta rápido los casos comunes (y bloqueos anteriores a
+        # noches_habitacion); la atomicidad la da la inserción de los días en create_block
+        bloqueo = None
+        if not overlapping_blocks(db, habitacion_id, fecha_inicio, fecha_fin):
+            bloqueo = create_block(db, habitacion_id, fecha_inicio, fecha_fin, expira, "temporal")
+    if bloqueo is None:
         raise BadRequestError("La habitación ya tiene un bloqueo activo en ese rango")
+    expiry_scheduler.schedule(bloqueo.bloqueo_id, bloqueo.expira_en)
+    return {
+        "bloqueo_id": bloqueo.bloqueo_id,
+        "habitacion_id": bloqueo.habitacion_id,
+        "expira_en": bloqueo.expira_en,
+        "estado": bloqueo.estado,
+    }
+
+
+def inventory_summary(db: Session, hotel_id: str, tipo: str, fecha_inicio: date, fecha_fin: date) -> Dict:
+    """Cuántas habitaciones del tipo quedan libres en todas las noches, desde los contadores."""
+    if fecha_fin < fecha_inicio:
+        raise BadRequestError("fecha_fin debe ser posterior a fecha_inicio")
+    noches = inventory_nights(db, hotel_id, tipo, fecha_inicio, fecha_fin)
+    for n in noches:
+        n["disponibles"] = max(0, n["total"] - n["vendidas"] - n["retenidas"])
+    return {
+        "hotel_id": hotel_id,
+        "tipo": tipo,
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "disponibles": min(n["disponibles"] for n in noches),
+        "noches": noches,
+    }
+
+
+def allocate_room(db: Session, hotel_id: str, tipo: str, fecha_inicio: date, fecha_fin: date, duracion_minutos: int) -> dict:
+    """
+    Bloquea una habitación del tipo: los contadores descartan en O(noches) los tipos
+    agotados y la habitación concreta se elige solo al bloquear, la de mejor encaje
+    con su calendario (ver allocation.py) para no dejar noches sueltas.
+    """
+    if inventory_summary(db, hotel_id, tipo, fecha_inicio, fecha_fin)["disponibles"] <= 0:
+        raise BadRequestError(f"No hay habitaciones {tipo} disponibles para esas fechas")
     expira = datetime.utcnow() + timedelta(minutes=duracion_minutos)
-    bloqueo = create_block(db, habitacion_id, fecha_inicio, fecha_fin, expira, "temporal")
+    bloqueo = None
+    with _claim_lock(db):
+        room_ids = list_room_ids(db, hotel_id, tipo)
+        busy = occupied_rooms(db, room_ids, fecha_inicio, fecha_fin)
+        free = [h for h in room_ids if h not in busy]
+        neighbours = room_neighbours(db, free, fecha_inicio, fecha_fin, ALLOCATION_HORIZON_DAYS)
+        for habitacion_id in rank_rooms(neighbours, fecha_inicio, fecha_fin):
+            # Si otra petición se adelanta con esta habitación, se prueba la siguiente
+            bloqueo = create_block(db, habitacion_id, fecha_inicio, fecha_fin, expira, "temporal")
+            if bloqueo is not None:
+                break
+    if bloqueo is None:
+        raise BadRequestError(f"No hay habitaciones {tipo} disponibles para esas fechas")
+    expiry_scheduler.schedule(bloqueo.bloqueo_id, bloqueo.expira_en)
     return {
         "bloqueo_id": bloqueo.bloqueo_id,
         "habitacion_id": bloqueo.habitacion_id,
@@ -85,15 +182,110 @@ def confirm_block_reservation(db: Session, bloqueo_id: str, reserva_id: str) ->
     }
 
 
-def cleanup_expired_blocks(db: Session):
-    from sqlalchemy import select
-    from services.availability.models import BloqueoHabitacionDB
+def _room_number(room: HabitacionDB) -> int:
+    digits = "".join(ch for ch in room.numero or "" if ch.isdigit())
+    return int(digits) if digits else 0
 
-    now = datetime.utcnow()
-    stmt = select(BloqueoHabitacionDB).where(
-        BloqueoHabitacionDB.estado == "activo",
-        BloqueoHabitacionDB.expira_en.is_not(None),
-        BloqueoHabitacionDB.expira_en < now,
-    )
-    for bloqueo in db.scalars(stmt):
-        expire_block(db, bloqueo)
+
+def select_group_rooms(free: Sequence[HabitacionDB], cantidad: int, contiguas: bool) -> Optional[List[HabitacionDB]]:
+    """
+    Elige `cantidad` habitaciones libres ordenadas por piso y número. Con `contiguas`,
+    busca en un mismo piso la ventana con menor distancia entre números; si ningún
+    piso tiene suficientes, las toma de los pisos consecutivos.
+    """
+    if len(free) < cantidad:
+        return None
+    ordered = sorted(free, key=lambda r: (r.piso or 0, _room_number(r), r.habitacion_id))
+    if not contiguas:
+        return ordered[:cantidad]
+    best, best_span = None, None
+    for i in range(len(ordered) - cantidad + 1):
+        window = ordered[i : i + cantidad]
+        if window[0].piso != window[-1].piso:
+            continue
+        span = _room_number(window[-1]) - _room_number(window[0])
+        if best_span is None or span < best_span:
+            best, best_span = window, span
+    return best or ordered[:cantidad]
+
+
+def block_group(
+    db: Session,
+    hotel_id: str,
+    fecha_inicio: date,
+    fecha_fin: date,
+    duracion_minutos: int,
+    habitacion_ids: Optional[List[str]] = None,
+    cantidad: Optional[int] = None,
+    tipo_habitacion: Optional[str] = None,
+    piso: Optional[int] = None,
+    contiguas: bool = False,
+) -> Dict:
+    if habitacion_ids is not None:
+        rooms = list_rooms_by_ids(db, hotel_id, habitacion_ids)
+        missing = set(habitacion_ids) - {r.habitacion_id for r in rooms}
+        if missing:
+            raise NotFoundError(f"Habitaciones no encontradas en el hotel: {', '.join(sorted(missing))}")
+    else:
+        rooms = [r for r in list_rooms_by_hotel(db, hotel_id, tipo_habitacion) if piso is None or r.piso == piso]
+    expira = datetime.utcnow() + timedelta(minutes=duracion_minutos)
+    with _claim_lock(db):
+        busy = occupied_rooms(db, [r.habitacion_id for r in rooms], fecha_inicio, fecha_fin)
+        if habitacion_ids is not None:
+            if busy:
+                raise BadRequestError(f"Habitaciones no disponibles: {', '.join(sorted(busy))}")
+            chosen = list(dict.fromkeys(habitacion_ids))
+        else:
+            selected = select_group_rooms([r for r in rooms if r.habitacion_id not in busy], cantidad, contiguas)
+            if selected is None:
+                raise BadRequestError(f"No hay {cantidad} habitaciones disponibles con esos criterios")
+            chosen = [r.habitacion_id for r in selected]
+        grupo = create_group_blocks(db, hotel_id, chosen, fecha_inicio, fecha_fin, expira)
+    if grupo is None:
+        raise BadRequestError("Alguna habitación fue bloqueada por otra solicitud; no se bloqueó ninguna")
+    for bloqueo_id in grupo.bloqueo_ids:
+        expiry_scheduler.schedule(bloqueo_id, expira)
+    return {
+        "grupo_id": grupo.grupo_id,
+        "estado": grupo.estado,
+        "expira_en": grupo.expira_en,
+        "habitaciones": chosen,
+        "bloqueos": grupo.bloqueo_ids,
+    }
+
+
+def confirm_group_reservation(db: Session, grupo_id: str, reserva_id: str) -> Dict:
+    grupo = get_group(db, grupo_id)
+    if not grupo:
+        raise NotFoundError("Grupo de bloqueos no encontrado")
+    if grupo.estado != "activo" or not confirm_group(db, grupo, reserva_id):
+        raise BadRequestError("El grupo tiene bloqueos que ya no están activos")
+    return {"grupo_id": grupo.grupo_id, "estado": grupo.estado, "reserva_id": grupo.reserva_id}
+
+
+def release_group_blocks(db: Session, grupo_id: str) -> None:
+    grupo = get_group(db, grupo_id)
+    if not grupo:
+        raise NotFoundError("Grupo de bloqueos no encontrado")
+    release_group(db, grupo)
+
+
+def cleanup_expired_blocks(db: Session) -> int:
+    return expire_blocks_before(db, datetime.utcnow())
+
+
+def expire_due_blocks(db: Session) -> int:
+    """Expira los bloqueos vencidos solo si el heap de caducidades tiene alguno pendiente."""
+    return expiry_scheduler.run_due(datetime.utcnow(), lambda now: expire_blocks_before(db, now))
+
+
+def reconcile_inventory(db: Session) -> int:
+    """Corrige la deriva de los contadores de hoy en adelante; devuelve cuántas noches corrigió."""
+    return rebuild_inventory(db, date.today())
+
+
+def archive_history(db: Session) -> int:
+    cutoff = date.today() - timedelta(days=settings.ARCHIVE_HORIZON_DAYS)
+    archived = archive_old_blocks(db, cutoff, settings.ARCHIVE_BATCH_SIZE, settings.ARCHIVE_PAUSE_SECONDS)
+    prune_inventory(db, cutoff)
+    return archived
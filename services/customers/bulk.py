@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from services.customers.repository import (
+    existing_emails,
+    get_customers_by_cliente_ids,
+    insert_customers_bulk,
+    iter_customer_batches,
+)
+from services.customers.schemas import CrearClienteRequest
+from services.customers.search import INDEX_COLUMNS, index_customers, search_index
+from shared.database import SessionLocal
+from shared.exceptions import BadRequestError
+
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_COLUMNS = [
+    "cliente_id",
+    "usuario_id",
+    "nombre_completo",
+    "email",
+    "telefono",
+    "fecha_nacimiento",
+    "direccion",
+    "ciudad",
+    "pais",
+    "creado_en",
+]
+
+
+def check_format(formato: str) -> str:
+    if formato not in FORMATS:
+        raise BadRequestError(f"Formato no soportado: {formato} (usar csv o ndjson)")
+    return formato
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _ends_inside_quotes(line: str, in_quotes: bool) -> bool:
+    """
+    Sigue el estado de comillas del dialecto CSV por defecto: una comilla solo abre
+    campo al inicio del campo, "" dentro de un campo entrecomillado es un escape y
+    las comillas sueltas en campos sin comillas son literales (O"Brien).
+    """
+    field_start = not in_quotes
+    i, n = 0, len(line)
+    while i < n:
+        ch = line[i]
+        if in_quotes:
+            if ch == '"':
+                if i + 1 < n and line[i + 1] == '"':
+                    i += 1
+                else:
+                    in_quotes = False
+        elif ch == '"' and field_start:
+            in_quotes = True
+        field_start = ch == "," and not in_quotes
+        i += 1
+    return in_quotes
+
+
+async def _iter_records(chunks: AsyncIterator[bytes], formato: str) -> AsyncIterator[Tuple[int, Dict | None, str | None]]:
+    """Produce (línea, datos, error) sin cargar el fichero completo en memoria."""
+    header: List[str] | None = None
+    record = ""
+    in_quotes = False
+    record_line = 0
+    line_no = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if formato == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield line_no, None, "Se esperaba un objeto JSON"
+                continue
+            yield line_no, data, None
+            continue
+
+        # CSV: acumular líneas mientras haya comillas abiertas (campos multilínea)
+        if not record:
+            record_line = line_no
+        record += line
+        in_quotes = _ends_inside_quotes(line, in_quotes)
+        if in_quotes:
+            continue
+        if not record.strip():
+            record = ""
+            continue
+        values = next(csv.reader(io.StringIO(record)))
+        record = ""
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) != len(header):
+            yield record_line, None, f"Se esperaban {len(header)} columnas y hay {len(values)}"
+            continue
+        yield record_line, {k: (v if v != "" else None) for k, v in zip(header, values)}, None
+    if in_quotes:
+        yield record_line, None, "Registro CSV incompleto (comillas sin cerrar)"
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+def _insert_batch(db: Session, batch: List[Tuple[int, dict]]) -> Tuple[int, List[Tuple[int, str]]]:
+    errores: List[Tuple[int, str]] = []
+    taken = existing_emails(db, (data["email"] for _, data in batch))
+    rows: List[Tuple[int, dict]] = []
+    for linea, data in batch:
+        if data["email"] in taken:
+            errores.append((linea, "Email ya registrado"))
+            continue
+        taken.add(data["email"])
+        rows.append((linea, data))
+    if not rows:
+        return 0, errores
+    inserted: List[str] = []
+    try:
+        inserted = insert_customers_bulk(db, [data for _, data in rows])
+    except IntegrityError:
+        # Conflicto concurrente: reintentar fila a fila para aislar las que fallan
+        db.rollback()
+        for linea, data in rows:
+            try:
+                inserted += insert_customers_bulk(db, [data])
+            except IntegrityError as e:
+                db.rollback()
+                errores.append((linea, f"Conflicto de datos: {e.orig}"))
+    if inserted and search_index.built:
+        index_customers(get_customers_by_cliente_ids(db, inserted, INDEX_COLUMNS))
+    return len(inserted), errores
+
+
+async def import_customers_stream(db: Session, chunks: AsyncIterator[bytes], formato: str) -> Dict:
+    check_format(formato)
+    procesados = 0
+    importados = 0
+    total_errores = 0
+    errores: List[Dict] = []
+
+    def report(linea: int, error: str):
+        nonlocal total_errores
+        total_errores += 1
+        if len(errores) < MAX_REPORTED_ERRORS:
+            errores.append({"linea": linea, "error": error})
+
+    batch: List[Tuple[int, dict]] = []
+
+    async def flush():
+        nonlocal importados
+        inserted, batch_errors = await run_in_threadpool(_insert_batch, db, list(batch))
+        importados += inserted
+        for linea, error in batch_errors:
+            report(linea, error)
+        batch.clear()
+
+    async for linea, data, error in _iter_records(chunks, formato):
+        procesados += 1
+        if error:
+            report(linea, error)
+            continue
+        try:
+            cliente = CrearClienteRequest(**data)
+        except ValidationError as e:
+            report(linea, _validation_message(e))
+            continue
+        batch.append((linea, cliente.model_dump()))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    return {
+        "procesados": procesados,
+        "importados": importados,
+        "total_errores": total_errores,
+        "errores": errores,
+    }
+
+
+def export_customers_stream(formato: str) -> Iterator[str]:
+    """Genera el export por lotes con su propia sesión (la respuesta vive más que la request)."""
+    check_format(formato)
+    db = SessionLocal()
+    try:
+        if formato == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buf.getvalue()
+        for rows in iter_customer_batches(db, EXPORT_COLUMNS, EXPORT_BATCH_SIZE):
+            buf = io.StringIO()
+            if formato == "csv":
+                writer = csv.writer(buf)
+                writer.writerows(["" if v is None else v for v in r] for r in rows)
+            else:
+                for r in rows:
+                    buf.write(json.dumps(dict(zip(EXPORT_COLUMNS, r)), default=str))
+                    buf.write("\n")
+            yield buf.getvalue()
+    finally:
+        db.close()
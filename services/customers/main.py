@@ -1,18 +1,43 @@
 from __future__ import annotations
 
+import logging
+import time
 from typing import Dict
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from shared.database import Base, engine, get_db
+from shared.database import engine, get_db, setup_sql_profiler
+from shared.cache import cache_stats
+from shared.migrations import ensure_schema
 from shared.security import verify_token
-from services.customers.schemas import CrearClienteRequest, ClienteResponse
-from services.customers.service import create_customer_service, get_customer_service, update_customer_service
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, setup_compression
+from shared.tracing import setup_tracing
+from services.customers.bulk import FORMATS, check_format, export_customers_stream, import_customers_stream
+from services.customers.migrations import MIGRATIONS
+from services.customers.schemas import (
+    BusquedaClientesResponse,
+    ClienteBusqueda,
+    ClienteResponse,
+    CrearClienteRequest,
+    ImportacionResponse,
+)
+from services.customers.search import start_index_build
+from services.customers.service import (
+    create_customer_service,
+    get_customer_service,
+    search_customers_service,
+    update_customer_service,
+)
 
 
-app = FastAPI(title="Customers Service", version="1.0.0")
+logger = logging.getLogger("customers-service")
+app = FastAPI(title="Customers Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,11 +46,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "customers", engine)
+setup_metrics(app, "customers", engine)
+setup_readiness(app, "customers", engine)
+setup_sql_profiler(app, engine)
 
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    version = ensure_schema(engine, "customers", MIGRATIONS)
+    if engine.dialect.name != "mysql":
+        # Sin FULLTEXT: índice en memoria, construido sin bloquear el arranque
+        start_index_build()
+    logger.info(f"Customers service iniciado en {(time.perf_counter() - started) * 1000:.1f} ms (esquema v{version})")
 
 
 @app.get("/health")
@@ -33,6 +69,11 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+def cache_stats_api() -> Dict:
+    return cache_stats()
+
+
 @app.post("/api/v1/customers", status_code=201)
 def create_customer(payload: CrearClienteRequest, db: Session = Depends(get_db), current_user: dict = Depends(verify_token)) -> ClienteResponse:
     cliente = create_customer_service(db, payload.model_dump())
@@ -47,6 +88,54 @@ def create_customer(payload: CrearClienteRequest, db: Session = Depends(get_db),
     )
 
 
+@app.post("/api/v1/customers/import")
+async def import_customers(request: Request, formato: str = "csv", db: Session = Depends(get_db), current_user: dict = Depends(verify_token)) -> ImportacionResponse:
+    # El cuerpo (CSV o NDJSON) se lee en streaming, sin multipart ni buffer completo
+    check_format(formato)
+    result = await import_customers_stream(db, request.stream(), formato)
+    return ImportacionResponse(**result)
+
+
+@app.get("/api/v1/customers/export")
+def export_customers(formato: str = "csv", current_user: dict = Depends(verify_token)) -> StreamingResponse:
+    check_format(formato)
+    return StreamingResponse(
+        export_customers_stream(formato),
+        media_type=FORMATS[formato],
+        headers={"Content-Disposition": f"attachment; filename=clientes.{formato}"},
+    )
+
+
+@app.get("/api/v1/customers/search")
+def search_customers(
+    q: str = Query(min_length=2),
+    pagina: int = Query(1, ge=1),
+    tamano: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(verify_token),
+) -> BusquedaClientesResponse:
+    data = search_customers_service(db, q, pagina, tamano)
+    return BusquedaClientesResponse(
+        q=q,
+        total=data["total"],
+        pagina=pagina,
+        tamano=tamano,
+        resultados=[
+            ClienteBusqueda(
+                cliente_id=c.cliente_id,
+                nombre_completo=c.nombre_completo,
+                email=c.email,
+                telefono=c.telefono,
+                ciudad=c.ciudad,
+                pais=c.pais,
+                creado_en=c.creado_en,
+                score=score,
+            )
+            for c, score in data["resultados"]
+        ],
+    )
+
+
 @app.get("/api/v1/customers/{cliente_id}")
 def get_customer(cliente_id: str, db: Session = Depends(get_db), current_user: dict = Depends(verify_token)) -> ClienteResponse:
     c = get_customer_service(db, cliente_id)
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from services.customers.models import ClienteDB
+from shared.migrations import Migration, create_tables, sync_indexes
+
+
+MIGRATIONS = [
+    Migration(1, "esquema base", create_tables(ClienteDB.__table__)),
+    # El índice FULLTEXT solo se crea en MySQL (ddl_if del modelo)
+    Migration(2, "índice FULLTEXT de búsqueda de clientes", sync_indexes(ClienteDB.__table__)),
+]
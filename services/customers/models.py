@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date
-from sqlalchemy import Column, Date, DateTime, Enum, Integer, String, func
+from sqlalchemy import Column, Date, DateTime, Enum, Index, Integer, String, func
 
 from shared.database import Base
 
@@ -23,3 +23,15 @@ class ClienteDB(Base):
     tipo_documento = Column(Enum("dni", "pasaporte", "cedula"), nullable=True)
     creado_en = Column(DateTime, server_default=func.now())
     actualizado_en = Column(DateTime, onupdate=func.now())
+
+
+# Índice FULLTEXT para la búsqueda de clientes; solo existe en MySQL (en SQLite
+# la búsqueda usa el índice en memoria de services/customers/search.py).
+Index(
+    "ix_clientes_busqueda",
+    ClienteDB.nombre_completo,
+    ClienteDB.email,
+    ClienteDB.telefono,
+    ClienteDB.documento_identidad,
+    mysql_prefix="FULLTEXT",
+).ddl_if(dialect="mysql")
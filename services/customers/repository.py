@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import uuid
-from typing import Optional
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.orm import Session
 
 from services.customers.models import ClienteDB
@@ -11,7 +12,7 @@ from services.customers.models import ClienteDB
 
 def create_customer(db: Session, data: dict) -> ClienteDB:
     cliente = ClienteDB(
-        cliente_id=str(uuid.uuid4())[:8],
+        cliente_id=new_customer_id(),
         **data,
     )
     db.add(cliente)
@@ -31,3 +32,68 @@ def update_customer(db: Session, cliente: ClienteDB, data: dict) -> ClienteDB:
     db.commit()
     db.refresh(cliente)
     return cliente
+
+
+def new_customer_id() -> str:
+    return str(uuid.uuid4())[:8]
+
+
+def existing_emails(db: Session, emails: Iterable[str]) -> Set[str]:
+    return set(db.scalars(select(ClienteDB.email).where(ClienteDB.email.in_(list(emails)))))
+
+
+def insert_customers_bulk(db: Session, rows: List[dict]) -> List[str]:
+    # executemany en una sola sentencia; sin refresh por fila
+    rows = [{"cliente_id": new_customer_id(), **r} for r in rows]
+    db.execute(insert(ClienteDB), rows)
+    db.commit()
+    return [r["cliente_id"] for r in rows]
+
+
+def get_customers_by_cliente_ids(db: Session, cliente_ids: List[str], columns: List[str]) -> List[tuple]:
+    cols = [getattr(ClienteDB, c) for c in columns]
+    return [tuple(r) for r in db.execute(select(*cols).where(ClienteDB.cliente_id.in_(cliente_ids)))]
+
+
+def get_customers_by_ids(db: Session, ids: List[int]) -> List[ClienteDB]:
+    return list(db.scalars(select(ClienteDB).where(ClienteDB.id.in_(ids))))
+
+
+def search_customers_fulltext(db: Session, boolean_query: str, limit: int, offset: int) -> Tuple[int, List[Tuple[ClienteDB, float]]]:
+    """Búsqueda sobre el índice FULLTEXT de MySQL, ordenada por relevancia."""
+    relevance = match(
+        ClienteDB.nombre_completo,
+        ClienteDB.email,
+        ClienteDB.telefono,
+        ClienteDB.documento_identidad,
+        against=boolean_query,
+    ).in_boolean_mode()
+    total = db.scalar(select(func.count()).select_from(ClienteDB).where(relevance))
+    rows = db.execute(
+        select(ClienteDB, relevance.label("score")).where(relevance).order_by(relevance.desc(), ClienteDB.id).limit(limit).offset(offset)
+    ).all()
+    return total or 0, [(r[0], float(r[1])) for r in rows]
+
+
+def search_customers_like(db: Session, terms: List[str], limit: int, offset: int) -> Tuple[int, List[Tuple[ClienteDB, float]]]:
+    """Respaldo sin ranking mientras se construye el índice en memoria: cada término en algún campo."""
+    fields = (ClienteDB.nombre_completo, ClienteDB.email, ClienteDB.telefono, ClienteDB.documento_identidad)
+    # Los términos solo contienen [a-z0-9], no hace falta escapar comodines
+    where = [or_(*(func.lower(f).like(f"%{t}%") for f in fields)) for t in terms]
+    total = db.scalar(select(func.count()).select_from(ClienteDB).where(*where))
+    rows = db.scalars(select(ClienteDB).where(*where).order_by(ClienteDB.id).limit(limit).offset(offset)).all()
+    return total or 0, [(c, 0.0) for c in rows]
+
+
+def iter_customer_batches(db: Session, columns: List[str], batch_size: int = 1000, include_id: bool = False) -> Iterator[list]:
+    """Recorre clientes por keyset sobre `id`, proyectando solo `columns`."""
+    cols = [getattr(ClienteDB, c) for c in columns]
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(ClienteDB.id, *cols).where(ClienteDB.id > last_id).order_by(ClienteDB.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [tuple(r) for r in rows] if include_id else [r[1:] for r in rows]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -25,3 +25,27 @@ class ClienteResponse(BaseModel):
     ciudad: Optional[str]
     pais: Optional[str]
     creado_en: datetime
+
+
+class ClienteBusqueda(ClienteResponse):
+    score: float
+
+
+class BusquedaClientesResponse(BaseModel):
+    q: str
+    total: int
+    pagina: int
+    tamano: int
+    resultados: List[ClienteBusqueda]
+
+
+class ErrorImportacion(BaseModel):
+    linea: int
+    error: str
+
+
+class ImportacionResponse(BaseModel):
+    procesados: int
+    importados: int
+    total_errores: int
+    errores: List[ErrorImportacion]
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+
+# Peso de cada campo en el ranking; una coincidencia exacta del término vale el doble que un prefijo
+FIELD_WEIGHTS = {
+    "documento_identidad": 4,
+    "email": 3,
+    "telefono": 3,
+    "nombre_completo": 2,
+}
+INDEX_COLUMNS = ["id", *FIELD_WEIGHTS]
+MIN_TERM_LENGTH = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PHONE_RE = re.compile(r"[\d\s+\-().]+")
+
+
+def normalize(text: str) -> str:
+    folded = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in folded if not unicodedata.combining(ch))
+
+
+def tokenize(field: str, value: str | None) -> List[str]:
+    if not value:
+        return []
+    value = normalize(value)
+    tokens = _TOKEN_RE.findall(value)
+    if field == "telefono":
+        return ["".join(tokens)]
+    return tokens
+
+
+def query_terms(q: str) -> List[str]:
+    if _PHONE_RE.fullmatch(q.strip()):
+        # "+57 300 123" se busca como un único prefijo de dígitos
+        digits = "".join(ch for ch in q if ch.isdigit())
+        return [digits] if digits else []
+    terms = _TOKEN_RE.findall(normalize(q))
+    long_terms = [t for t in terms if len(t) >= MIN_TERM_LENGTH]
+    return long_terms or terms
+
+
+class CustomerSearchIndex:
+    """
+    Índice invertido en memoria para backends sin full-text (SQLite).
+
+    Los términos se guardan ordenados, de modo que un prefijo se resuelve con dos
+    búsquedas binarias sobre la lista; cada término apunta a {id: peso}.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._terms: List[str] = []
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._building = False
+        self._pending: List[Sequence] = []
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _doc_postings(self, row: Sequence) -> Dict[str, int]:
+        weights: Dict[str, int] = {}
+        for field, value in zip(FIELD_WEIGHTS, row[1:]):
+            w = FIELD_WEIGHTS[field]
+            for token in tokenize(field, value):
+                if weights.get(token, 0) < w:
+                    weights[token] = w
+        return weights
+
+    def _add(self, row: Sequence, keep_sorted: bool) -> None:
+        doc_id = row[0]
+        self._remove(doc_id)
+        weights = self._doc_postings(row)
+        for token, w in weights.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if keep_sorted:
+                    bisect.insort(self._terms, token)
+            posting[doc_id] = w
+        self._doc_terms[doc_id] = tuple(weights)
+
+    def _remove(self, doc_id: int) -> None:
+        for token in self._doc_terms.pop(doc_id, ()):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[token]
+                i = bisect.bisect_left(self._terms, token)
+                if i < len(self._terms) and self._terms[i] == token:
+                    del self._terms[i]
+
+    def build(self, rows: Iterable[Sequence]) -> None:
+        """
+        Carga masiva fuera del lock: se construye aparte (insertando sin orden y ordenando
+        una sola vez) y se intercambia al final. Las altas/cambios que llegan mientras
+        tanto se encolan y se aplican antes de marcar el índice como construido.
+        """
+        with self._lock:
+            self._building = True
+            self._pending = []
+        fresh = CustomerSearchIndex()
+        try:
+            for row in rows:
+                fresh._add(row, keep_sorted=False)
+            fresh._terms = sorted(fresh._postings)
+        except BaseException:
+            with self._lock:
+                self._building = False
+                self._pending = []
+            raise
+        with self._lock:
+            self._postings, self._terms, self._doc_terms = fresh._postings, fresh._terms, fresh._doc_terms
+            for row in self._pending:
+                self._add(row, keep_sorted=True)
+            self._pending = []
+            self._building = False
+            self.built = True
+
+    def add(self, rows: Iterable[Sequence]) -> None:
+        with self._lock:
+            rows = list(rows)
+            if self._building:
+                self._pending.extend(rows)
+            for row in rows:
+                self._add(row, keep_sorted=True)
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            self._remove(doc_id)
+
+    def _term_range(self, term: str) -> Tuple[int, int]:
+        start = bisect.bisect_left(self._terms, term)
+        end = bisect.bisect_left(self._terms, term + "\uffff", lo=start)
+        return start, end
+
+    def _match_term(self, term: str, start: int, end: int) -> Dict[int, int]:
+        scores: Dict[int, int] = {}
+        for token in self._terms[start:end]:
+            bonus = 2 if token == term else 1
+            for doc_id, w in self._postings[token].items():
+                s = w * bonus
+                if scores.get(doc_id, 0) < s:
+                    scores[doc_id] = s
+        return scores
+
+    def _doc_score(self, doc_id: int, term: str) -> int:
+        best = 0
+        for token in self._doc_terms[doc_id]:
+            if token.startswith(term):
+                s = self._postings[token][doc_id] * (2 if token == term else 1)
+                if s > best:
+                    best = s
+        return best
+
+    def search(self, q: str, limit: int, offset: int = 0) -> Tuple[int, List[Tuple[int, int]]]:
+        """Devuelve (total, [(id, score)]) con todos los términos presentes (AND)."""
+        terms = query_terms(q)
+        if not terms:
+            return 0, []
+        with self._lock:
+            # Solo el término más selectivo recorre sus postings; el resto se
+            # verifica contra los términos de cada candidato.
+            ranges = []
+            for term in terms:
+                start, end = self._term_range(term)
+                size = sum(len(self._postings[t]) for t in self._terms[start:end])
+                ranges.append((size, term, start, end))
+            ranges.sort()
+            _, first, start, end = ranges[0]
+            scores = self._match_term(first, start, end)
+            for _, term, _, _ in ranges[1:]:
+                if not scores:
+                    break
+                next_scores = {}
+                for doc_id, s in scores.items():
+                    extra = self._doc_score(doc_id, term)
+                    if extra:
+                        next_scores[doc_id] = s + extra
+                scores = next_scores
+        top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return len(scores), top[offset:]
+
+
+search_index = CustomerSearchIndex()
+_build_lock = threading.Lock()
+_build_thread: Optional[threading.Thread] = None
+
+
+def _build_from_db() -> None:
+    from services.customers.repository import iter_customer_batches
+    from shared.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        search_index.build(
+            row for batch in iter_customer_batches(db, INDEX_COLUMNS[1:], 5000, include_id=True) for row in batch
+        )
+    finally:
+        db.close()
+
+
+def start_index_build() -> threading.Thread:
+    """Lanza (una sola vez por proceso) la construcción del índice en segundo plano."""
+    global _build_thread
+    with _build_lock:
+        if _build_thread is None or (not _build_thread.is_alive() and not search_index.built):
+            _build_thread = threading.Thread(target=_build_from_db, name="customer-search-index", daemon=True)
+            _build_thread.start()
+        return _build_thread
+
+
+def index_customers(rows: Iterable[Sequence]) -> None:
+    """Aplica altas/cambios al índice; durante la construcción quedan encolados."""
+    if search_index.built or search_index._building:
+        search_index.add(rows)
+
+
+def index_row(cliente) -> Tuple:
+    return tuple(getattr(cliente, c) for c in INDEX_COLUMNS)
+
+
+def uses_fulltext(db: Session) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+def boolean_mode_query(q: str) -> str:
+    # "ana gar" -> "+ana* +gar*": todos los términos, como prefijo
+    return " ".join(f"+{t}*" for t in query_terms(q))
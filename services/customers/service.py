@@ -1,23 +1,82 @@
 from __future__ import annotations
 
+from typing import Dict
+
 from sqlalchemy.orm import Session
 
 from services.customers.models import ClienteDB
-from services.customers.repository import create_customer, get_customer, update_customer
+from services.customers.repository import (
+    create_customer,
+    get_customer,
+    get_customers_by_ids,
+    search_customers_fulltext,
+    search_customers_like,
+    update_customer,
+)
+from services.customers.search import (
+    boolean_mode_query,
+    index_customers,
+    index_row,
+    query_terms,
+    search_index,
+    start_index_build,
+    uses_fulltext,
+)
+from shared.cache import CUSTOMER_CACHE, CUSTOMER_HTTP_CACHE, customer_cache as get_customer_cache
 from shared.exceptions import NotFoundError
 
 
+# Snapshot de columnas por cliente_id; se invalida en cada actualización
+customer_cache = get_customer_cache(CUSTOMER_CACHE)
+# Copia que ServiceClient guarda en otros servicios: con CACHE_BACKEND=sqlite comparten
+# el fichero y la invalidación les llega; con memory solo caduca por TTL
+http_customer_cache = get_customer_cache(CUSTOMER_HTTP_CACHE)
+
+
+def _snapshot(cliente: ClienteDB | None) -> dict | None:
+    if cliente is None:
+        return None
+    return {c.name: getattr(cliente, c.name) for c in ClienteDB.__table__.columns}
+
+
 def create_customer_service(db: Session, data: dict) -> ClienteDB:
-    return create_customer(db, data)
+    cliente = create_customer(db, data)
+    index_customers([index_row(cliente)])
+    return cliente
 
 
 def get_customer_service(db: Session, cliente_id: str) -> ClienteDB:
+    data = customer_cache.get_or_load(cliente_id, lambda: _snapshot(get_customer(db, cliente_id)))
+    if not data:
+        raise NotFoundError("Cliente no encontrado")
+    # Instancia transitoria (fuera de la sesión): solo lectura
+    return ClienteDB(**data)
+
+
+def update_customer_service(db: Session, cliente_id: str, data: dict) -> ClienteDB:
     cliente = get_customer(db, cliente_id)
     if not cliente:
         raise NotFoundError("Cliente no encontrado")
+    cliente = update_customer(db, cliente, data)
+    customer_cache.invalidate(cliente_id)
+    http_customer_cache.invalidate(cliente_id)
+    index_customers([index_row(cliente)])
     return cliente
 
 
-def update_customer_service(db: Session, cliente_id: str, data: dict) -> ClienteDB:
-    cliente = get_customer_service(db, cliente_id)
-    return update_customer(db, cliente, data)
+def search_customers_service(db: Session, q: str, pagina: int, tamano: int) -> Dict:
+    offset = (pagina - 1) * tamano
+    if uses_fulltext(db):
+        total, resultados = search_customers_fulltext(db, boolean_mode_query(q), tamano, offset)
+        return {"total": total, "resultados": resultados}
+    if not search_index.built:
+        # El índice se construye en segundo plano; mientras tanto, LIKE sin ranking
+        start_index_build()
+        terms = query_terms(q)
+        if not terms:
+            return {"total": 0, "resultados": []}
+        total, resultados = search_customers_like(db, terms, tamano, offset)
+        return {"total": total, "resultados": resultados}
+    total, ranked = search_index.search(q, tamano, offset)
+    by_id = {c.id: c for c in get_customers_by_ids(db, [doc_id for doc_id, _ in ranked])}
+    return {"total": total, "resultados": [(by_id[d], float(s)) for d, s in ranked if d in by_id]}
@@ -5,10 +5,15 @@ from typing import Dict
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, json_response, setup_compression
+from shared.tracing import setup_tracing
 from services.notifications.service import notification_service
 
 
-app = FastAPI(title="Notifications Service", version="1.0.0")
+app = FastAPI(title="Notifications Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +22,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "notifications")
+setup_metrics(app, "notifications")
+setup_readiness(app, "notifications")
 
 
 @app.get("/health")
@@ -25,8 +35,9 @@ def health() -> Dict[str, str]:
 
 
 @app.get("/api/v1/notifications/history")
-def history(cliente_id: str | None = None) -> Dict:
-    return {"notificaciones": notification_service.history(cliente_id)}
+def history(cliente_id: str | None = None) -> ORJSONResponse:
+    # El historial ya es JSON (llega por HTTP): se serializa sin validarlo contra un modelo
+    return json_response({"notificaciones": notification_service.history(cliente_id)})
 
 
 @app.get("/api/v1/notifications/stats")
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import logging
+import time
 from datetime import datetime
 from decimal import Decimal
 from typing import Dict
@@ -8,15 +10,23 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from shared.database import Base, engine, get_db
+from shared.database import engine, get_db, setup_sql_profiler
 from shared.events import event_bus
+from shared.migrations import ensure_schema
 from shared.security import verify_token
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, setup_compression
+from shared.tracing import setup_tracing
+from services.payments.migrations import MIGRATIONS
 from services.payments.models import TransaccionDB
 from services.payments.schemas import ProcesarPagoRequest, ReembolsarRequest, TransaccionResponse
-from services.payments.simulator import simular_procesamiento_pago
+from services.payments.simulator import generar_codigo, simular_procesamiento_pago
 
 
-app = FastAPI(title="Payments Service", version="1.0.0")
+logger = logging.getLogger("payments-service")
+app = FastAPI(title="Payments Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,11 +35,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "payments", engine)
+setup_metrics(app, "payments", engine)
+setup_readiness(app, "payments", engine)
+setup_sql_profiler(app, engine)
 
 
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    version = ensure_schema(engine, "payments", MIGRATIONS)
+    logger.info(f"Payments service iniciado en {(time.perf_counter() - started) * 1000:.1f} ms (esquema v{version})")
 
 
 @app.get("/health")
@@ -41,7 +59,7 @@ def health() -> Dict[str, str]:
 def process_payment(payload: ProcesarPagoRequest, db: Session = Depends(get_db), current_user: dict = Depends(verify_token)) -> TransaccionResponse:
     sim = simular_procesamiento_pago(payload.monto, payload.metodo_pago.token)
     tx = TransaccionDB(
-        transaccion_id=f"TX_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+        transaccion_id=f"TX_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{generar_codigo()}",
         cliente_id=payload.cliente_id,
         reserva_id=payload.reserva_id,
         monto=Decimal(payload.monto),
@@ -78,7 +96,7 @@ def process_payment(payload: ProcesarPagoRequest, db: Session = Depends(get_db),
 def refund(payload: ReembolsarRequest, db: Session = Depends(get_db), current_user: dict = Depends(verify_token)) -> Dict[str, str]:
     # Simplificado: registrar reembolso
     tx = TransaccionDB(
-        transaccion_id=f"RF_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+        transaccion_id=f"RF_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{generar_codigo()}",
         cliente_id="",
         reserva_id=None,
         monto=Decimal(payload.monto),
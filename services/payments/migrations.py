@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from services.payments.models import TransaccionDB
+from shared.migrations import Migration, create_tables, sync_indexes
+
+
+MIGRATIONS = [
+    Migration(1, "esquema base", create_tables(TransaccionDB.__table__)),
+    Migration(
+        2,
+        "índice compuesto de transacciones por reserva",
+        sync_indexes(TransaccionDB.__table__, drop=["ix_transacciones_reserva_id"]),
+    ),
+]
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Enum, Integer, Numeric, String, func
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, Numeric, String, func
 
 from shared.database import Base
 
 
 class TransaccionDB(Base):
     __tablename__ = "transacciones"
+    # Pagos de una reserva (cancelación: último cargo aprobado)
+    __table_args__ = (Index("ix_transacciones_reserva_tipo_estado", "reserva_id", "tipo", "estado"),)
 
     id = Column(Integer, primary_key=True)
     transaccion_id = Column(String(50), unique=True, index=True)
-    reserva_id = Column(String(50), index=True, nullable=True)
+    reserva_id = Column(String(50), nullable=True)
     cliente_id = Column(String(50), index=True)
     monto = Column(Numeric(10, 2))
     moneda = Column(String(3), default="USD")
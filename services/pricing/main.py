@@ -7,11 +7,16 @@ from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from shared.security import verify_token
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, setup_compression
+from shared.tracing import setup_tracing
 from services.pricing.rules_engine import calculate_price
 from services.pricing.schemas import CalcularPrecioRequest, DetallesPrecio, ValidarCuponRequest, ValidarCuponResponse
 
 
-app = FastAPI(title="Pricing Service", version="1.0.0")
+app = FastAPI(title="Pricing Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +25,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_rate_limit(app)
+setup_tracing(app, "pricing")
+setup_metrics(app, "pricing")
+setup_readiness(app, "pricing")
 
 
 @app.get("/health")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Pattern, Sequence
+
+from shared.config import settings
+from shared.metrics import registry
+from shared.resilience import Bulkhead, BulkheadFullError
+
+
+@dataclass
+class AdmissionRule:
+    """Peticiones (método + ruta) que comparten un cupo de ejecución y una cola."""
+
+    name: str
+    method: str
+    path: Pattern[str]
+    limiter: Bulkhead
+    # Media móvil del tiempo de servicio, para estimar el Retry-After
+    avg_seconds: float = 0.1
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.path.fullmatch(path) is not None
+
+    def retry_after(self) -> int:
+        backlog = self.limiter.queued + 1
+        return max(1, math.ceil(self.avg_seconds * backlog / self.limiter.max_concurrent))
+
+
+class AdmissionController:
+    """
+    Middleware ASGI que limita las operaciones caras de Reservations (las que llaman a
+    otros servicios: crear y cancelar). Con el cupo lleno esperan en una cola acotada;
+    si la cola está llena o la espera vence responde 503 con Retry-After en vez de
+    acumular trabajo que acabaría en timeout. Las consultas (GET) no pasan por aquí y
+    mantienen su latencia aunque el servicio esté saturado de reservas.
+    """
+
+    def __init__(self, app, rules: Sequence[AdmissionRule]):
+        self.app = app
+        self.rules = list(rules)
+
+    async def __call__(self, scope, receive, send):
+        rule = None
+        if scope["type"] == "http":
+            rule = next((r for r in self.rules if r.matches(scope["method"], scope["path"])), None)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await rule.limiter.acquire()
+        except BulkheadFullError:
+            await self._reject(rule, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rule.limiter.release()
+            rule.avg_seconds = 0.9 * rule.avg_seconds + 0.1 * (time.perf_counter() - started)
+
+    async def _reject(self, rule: AdmissionRule, send) -> None:
+        body = b'{"detail":"Servicio saturado, reintente m\\u00e1s tarde"}'
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rule.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def default_rules() -> Sequence[AdmissionRule]:
+    def limiter(name: str) -> Bulkhead:
+        return Bulkhead(
+            f"reservations.{name}",
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            settings.ADMISSION_MAX_QUEUE,
+            settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        )
+
+    # Crear y cancelar comparten cupo: los dos consumen la capacidad de los mismos servicios
+    shared = limiter("saga")
+    return [
+        AdmissionRule("crear", "POST", re.compile(r"/api/v1/reservations"), shared),
+        AdmissionRule("cancelar", "DELETE", re.compile(r"/api/v1/reservations/[^/]+"), shared),
+    ]
+
+
+def setup_admission(app) -> None:
+    rules = default_rules()
+    app.add_middleware(AdmissionController, rules=rules)
+    limiters = {r.limiter.target: r.limiter for r in rules}
+
+    def samples():
+        for name, limiter in limiters.items():
+            yield {"limiter": name, "state": "active"}, limiter.active
+            yield {"limiter": name, "state": "queued"}, limiter.queued
+
+    registry.callback("admission_requests", "Peticiones admitidas en curso y en cola", samples)
+    registry.callback(
+        "admission_rejections_total",
+        "Peticiones rechazadas con 503 por saturación",
+        lambda: (({"limiter": name}, limiter.rejected) for name, limiter in limiters.items()),
+        "counter",
+    )
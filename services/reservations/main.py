@@ -1,28 +1,51 @@
 from __future__ import annotations
 
-from typing import Dict
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import Dict, Literal, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
+from shared.cache import cache_stats
 from shared.events import event_bus
+from shared.exceptions import ServiceUnavailableError
 from shared.security import verify_token
-from shared.database import Base, engine, get_db
+from shared.database import SessionLocal, engine, get_db, setup_sql_profiler, settings
+from shared.migrations import ensure_schema
+from shared.health import setup_readiness
+from shared.metrics import setup_metrics
+from shared.rate_limit import setup_rate_limit
+from shared.responses import ORJSONResponse, setup_compression
+from shared.tracing import setup_tracing
+from services.reservations.admission import setup_admission
+from services.reservations.manifest import MANIFEST_REBUILD_SECONDS
+from services.reservations.migrations import MIGRATIONS
 from services.reservations.orchestrator import CrearReservaOrchestrator
 from shared.security import create_access_token
 from services.reservations.schemas import CrearReservaRequest, ReservaResponse
 from services.reservations.service import (
+    archive_history,
     cancel_reservation,
     checkin_reservation,
+    check_daily_manifest,
     checkout_reservation,
     create_reservation_flow,
+    get_daily_manifest,
+    list_customer_reservations,
+    list_hotel_reservations,
     modify_reservation,
+    rebuild_manifest,
 )
 from services.reservations.repository import get_reservation
 from sqlalchemy.orm import Session
 
+logger = logging.getLogger("reservations-service")
 
-app = FastAPI(title="Reservations Service", version="1.0.0")
+app = FastAPI(title="Reservations Service", version="1.0.0", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +54,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+setup_compression(app)
+setup_admission(app)
+setup_rate_limit(app)
+setup_tracing(app, "reservations", engine)
+setup_metrics(app, "reservations", engine)
+setup_readiness(app, "reservations", engine, dependencies=("customers", "availability", "pricing", "payments", "notifications"))
+setup_sql_profiler(app, engine)
 
 
 @app.get("/health")
@@ -38,6 +68,11 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+def cache_stats_api() -> Dict:
+    return cache_stats()
+
+
 @app.post("/api/v1/reservations")
 async def create_reservation(payload: CrearReservaRequest, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> ReservaResponse:
     try:
@@ -52,11 +87,66 @@ async def create_reservation(payload: CrearReservaRequest, current_user: dict =
         reserva = await create_reservation_flow(db, {**payload.model_dump(), **orchestration}, internal_token)
         event_bus.publicar("reserva.creada", {"cliente_id": payload.cliente_id, "hotel_id": payload.hotel_id})
         return ReservaResponse(estado="CONFIRMADA", detalles={"reserva_id": reserva.reserva_id})
+    except ServiceUnavailableError:
+        # Circuito abierto o bulkhead lleno hacia una dependencia: 503 con Retry-After
+        raise
     except Exception as e:
         # Map known issues to 400 to avoid 500 noise in client mistakes
         raise HTTPException(status_code=400, detail=f"Error al crear reserva: {str(e)}")
 
 
+EstadoReserva = Literal["CREADA", "CONFIRMADA", "CANCELADA", "CHECKIN", "CHECKOUT"]
+
+
+@app.get("/api/v1/reservations")
+def list_reservations_api(
+    hotel_id: str,
+    campo_fecha: Literal["fecha_inicio", "fecha_fin"] = "fecha_inicio",
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    estado: Optional[EstadoReserva] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db),
+) -> Dict:
+    # campo_fecha=fecha_inicio -> llegadas; campo_fecha=fecha_fin -> salidas
+    return list_hotel_reservations(db, hotel_id, campo_fecha, desde, hasta, estado, cursor, limite)
+
+
+@app.get("/api/v1/reservations/customer/{cliente_id}")
+def list_customer_reservations_api(
+    cliente_id: str,
+    estado: Optional[EstadoReserva] = None,
+    cursor: Optional[str] = None,
+    limite: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db),
+) -> Dict:
+    return list_customer_reservations(db, cliente_id, estado, cursor, limite)
+
+
+@app.get("/api/v1/reservations/manifest/{hotel_id}")
+def manifest_api(
+    hotel_id: str,
+    fecha: Optional[date] = None,
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db),
+) -> Dict:
+    # Llegadas y salidas del día (hoy por defecto), servidas desde memoria
+    return get_daily_manifest(db, hotel_id, fecha or date.today())
+
+
+@app.get("/api/v1/reservations/manifest/{hotel_id}/check")
+def manifest_check_api(
+    hotel_id: str,
+    fecha: Optional[date] = None,
+    current_user: dict = Depends(verify_token),
+    db: Session = Depends(get_db),
+) -> Dict:
+    return check_daily_manifest(db, hotel_id, fecha or date.today())
+
+
 @app.get("/api/v1/reservations/{reserva_id}")
 def get_reservation_api(reserva_id: str, current_user: dict = Depends(verify_token), db: Session = Depends(get_db)) -> Dict:
     r = get_reservation(db, reserva_id)
@@ -104,6 +194,40 @@ async def cancel_api(reserva_id: str, current_user: dict = Depends(verify_token)
     return {"message": "reserva cancelada"}
 
 
+def _with_session(fn):
+    db = SessionLocal()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
 @app.on_event("startup")
 def on_startup():
-    Base.metadata.create_all(bind=engine)
+    started = time.perf_counter()
+    version = ensure_schema(engine, "reservations", MIGRATIONS)
+
+    # Background task: reconstruir el manifiesto diario (también cubre el cambio de día)
+    async def manifest_rebuilder():
+        while True:
+            try:
+                await run_in_threadpool(_with_session, rebuild_manifest)
+            except Exception as e:
+                logger.error(f"Error reconstruyendo el manifiesto diario: {e}")
+            await asyncio.sleep(MANIFEST_REBUILD_SECONDS)
+
+    asyncio.create_task(manifest_rebuilder())
+
+    # Background task: archivar estancias antiguas (lotes cortos)
+    async def archiver():
+        while True:
+            try:
+                archived = await run_in_threadpool(_with_session, archive_history)
+                if archived:
+                    logger.info(f"Reservas archivadas: {archived}")
+            except Exception as e:
+                logger.error(f"Error archivando reservas: {e}")
+            await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+
+    asyncio.create_task(archiver())
+    logger.info(f"Reservations service iniciado en {(time.perf_counter() - started) * 1000:.1f} ms (esquema v{version})")
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Días materializados: desde ayer hasta hoy + MANIFEST_HORIZON_DAYS
+MANIFEST_HORIZON_DAYS = 7
+MANIFEST_REBUILD_SECONDS = 3600
+# Las canceladas no aparecen en el manifiesto; el resto sí, con su estado
+EXCLUDED_STATES = ("CANCELADA",)
+ENTRY_FIELDS = ("reserva_id", "cliente_id", "habitacion_id", "fecha_inicio", "fecha_fin", "estado")
+
+Key = Tuple[str, date]
+
+
+def manifest_window(today: Optional[date] = None) -> Tuple[date, date]:
+    today = today or date.today()
+    return today - timedelta(days=1), today + timedelta(days=MANIFEST_HORIZON_DAYS)
+
+
+def manifest_entry(reserva) -> Dict[str, str]:
+    return {f: str(getattr(reserva, f)) for f in ENTRY_FIELDS}
+
+
+class DailyManifest:
+    """
+    Llegadas y salidas por (hotel, día) en memoria, para la ventana de días cercanos.
+
+    Se mantiene de forma incremental con cada alta/cambio de reserva y se reconstruye
+    periódicamente desde la BD; los cambios que llegan durante una reconstrucción se
+    encolan y se aplican antes del intercambio para no perderlos.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._llegadas: Dict[Key, Dict[str, Dict[str, str]]] = {}
+        self._salidas: Dict[Key, Dict[str, Dict[str, str]]] = {}
+        # reserva_id -> (hotel, fecha_inicio, fecha_fin) para poder retirarla al cambiar
+        self._reservas: Dict[str, Tuple[str, date, date]] = {}
+        self._building = False
+        self._pending: List = []
+        self.desde: Optional[date] = None
+        self.hasta: Optional[date] = None
+        self.reconstruido_en: Optional[datetime] = None
+
+    @property
+    def built(self) -> bool:
+        return self.reconstruido_en is not None
+
+    def covers(self, day: date) -> bool:
+        return self.built and self.desde <= day <= self.hasta
+
+    def _discard(self, reserva_id: str) -> None:
+        old = self._reservas.pop(reserva_id, None)
+        if old is None:
+            return
+        hotel_id, inicio, fin = old
+        for days, day in ((self._llegadas, inicio), (self._salidas, fin)):
+            entries = days.get((hotel_id, day))
+            if entries is not None:
+                entries.pop(reserva_id, None)
+                if not entries:
+                    del days[(hotel_id, day)]
+
+    def _apply(self, reserva) -> None:
+        self._discard(reserva.reserva_id)
+        if reserva.estado in EXCLUDED_STATES:
+            return
+        inicio, fin = reserva.fecha_inicio, reserva.fecha_fin
+        in_arrivals = self.desde <= inicio <= self.hasta
+        in_departures = self.desde <= fin <= self.hasta
+        if not (in_arrivals or in_departures):
+            return
+        entry = manifest_entry(reserva)
+        if in_arrivals:
+            self._llegadas.setdefault((reserva.hotel_id, inicio), {})[reserva.reserva_id] = entry
+        if in_departures:
+            self._salidas.setdefault((reserva.hotel_id, fin), {})[reserva.reserva_id] = entry
+        self._reservas[reserva.reserva_id] = (reserva.hotel_id, inicio, fin)
+
+    def apply(self, reservas: Iterable) -> None:
+        """Alta, modificación o cambio de estado (incluida la cancelación)."""
+        with self._lock:
+            reservas = list(reservas)
+            if self._building:
+                self._pending.extend(reservas)
+            if self.built:
+                for reserva in reservas:
+                    self._apply(reserva)
+
+    def rebuild(self, rows: Iterable, desde: date, hasta: date) -> int:
+        """Reconstruye la ventana [desde, hasta]; devuelve cuántas reservas habían derivado."""
+        with self._lock:
+            self._building = True
+            self._pending = []
+        fresh = DailyManifest()
+        fresh.desde, fresh.hasta = desde, hasta
+        try:
+            for row in rows:
+                fresh._apply(row)
+        except BaseException:
+            with self._lock:
+                self._building = False
+                self._pending = []
+            raise
+        with self._lock:
+            for reserva in self._pending:
+                fresh._apply(reserva)
+            drift = 0
+            if self.built and (self.desde, self.hasta) == (desde, hasta):
+                old, new = self._snapshot(), fresh._snapshot()
+                drift = sum(1 for k in old.keys() | new.keys() if old.get(k) != new.get(k))
+            self._llegadas, self._salidas, self._reservas = fresh._llegadas, fresh._salidas, fresh._reservas
+            self.desde, self.hasta = desde, hasta
+            self.reconstruido_en = datetime.utcnow()
+            self._pending = []
+            self._building = False
+        return drift
+
+    def _snapshot(self) -> Dict[str, Tuple]:
+        by_id: Dict[str, Tuple] = {}
+        for entries in (*self._llegadas.values(), *self._salidas.values()):
+            for reserva_id, entry in entries.items():
+                by_id[reserva_id] = tuple(entry.values())
+        return by_id
+
+    def get(self, hotel_id: str, day: date) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """Manifiesto del día, o None si el día está fuera de la ventana materializada."""
+        with self._lock:
+            if not self.covers(day):
+                return None
+            return {
+                "llegadas": sorted(self._llegadas.get((hotel_id, day), {}).values(), key=lambda e: e["habitacion_id"]),
+                "salidas": sorted(self._salidas.get((hotel_id, day), {}).values(), key=lambda e: e["habitacion_id"]),
+            }
+
+
+daily_manifest = DailyManifest()
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from services.reservations.models import ReservaDB, reservas_archivo
+from shared.migrations import Migration, create_tables, sync_indexes
+
+
+MIGRATIONS = [
+    Migration(1, "esquema base", create_tables(ReservaDB.__table__)),
+    # ix_reservas_cliente_id pasa de (cliente_id) a (cliente_id, id): se recrea
+    Migration(
+        2,
+        "índices compuestos por hotel/cliente y fechas",
+        sync_indexes(ReservaDB.__table__, drop=["ix_reservas_hotel_id"]),
+    ),
+    Migration(3, "tabla de archivo de reservas", create_tables(reservas_archivo)),
+]
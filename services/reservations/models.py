@@ -1,17 +1,30 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Date, DateTime, Enum, Integer, Numeric, String, func
+from sqlalchemy import Column, Date, DateTime, Enum, Index, Integer, Numeric, String, func
 
+from shared.archival import archive_table
 from shared.database import Base
 
 
 class ReservaDB(Base):
     __tablename__ = "reservas"
+    __table_args__ = (
+        # Listados por hotel (llegadas / salidas), por cliente y por estado
+        Index("ix_reservas_hotel_inicio", "hotel_id", "fecha_inicio"),
+        Index("ix_reservas_hotel_fin", "hotel_id", "fecha_fin"),
+        # Listado por cliente: keyset sobre id (ORDER BY id DESC sin ordenar en memoria)
+        Index("ix_reservas_cliente_id", "cliente_id", "id"),
+        Index("ix_reservas_estado", "estado"),
+        # Manifiesto diario de todos los hoteles (llegadas OR salidas en la ventana)
+        Index("ix_reservas_inicio", "fecha_inicio"),
+        Index("ix_reservas_fin", "fecha_fin"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     reserva_id = Column(String(50), unique=True, index=True)
-    cliente_id = Column(String(50), index=True)
-    hotel_id = Column(String(50), index=True)
+    # hotel_id / cliente_id se indexan como prefijo de los índices compuestos
+    cliente_id = Column(String(50))
+    hotel_id = Column(String(50))
     habitacion_id = Column(String(50), index=True)
     fecha_inicio = Column(Date)
     fecha_fin = Column(Date)
@@ -20,3 +33,7 @@ class ReservaDB(Base):
     bloqueo_id = Column(String(50), nullable=True)
     creado_en = Column(DateTime, server_default=func.now())
     actualizado_en = Column(DateTime, onupdate=func.now())
+
+
+# Estancias terminadas o canceladas ya pasadas (ver archive_old_reservations)
+reservas_archivo = archive_table(ReservaDB.__table__, "reservas_archivo", "fecha_fin")
@@ -10,9 +10,9 @@ class CrearReservaOrchestrator:
     Orquesta el proceso completo de crear una reserva:
     1. Validar datos
     2. Obtener info cliente (Customer Service)
-    3. Consultar disponibilidad (Availability Service)
-    4. Calcular precio (Pricing Service)
-    5. Bloquear habitación (Availability Service)
+    3. Calcular precio (Pricing Service)
+    4. Bloquear habitación (Availability Service); si no viene indicada, Availability
+       asigna una del tipo a partir de sus contadores, sin listar habitaciones
     6. Procesar pago (Payment Service)
     7. Crear reserva en BD
     8. Confirmar bloqueo (Availability Service)
@@ -38,36 +38,32 @@ class CrearReservaOrchestrator:
             },
             token,
         )
-        # 3. Buscar disponibilidad y elegir una habitación si no viene especificada
+        # 3. Bloquear habitación (temporal): la indicada o una asignada por Availability
         habitacion_id = payload.get("habitacion_id")
-        if not habitacion_id:
-            dispo = await self.client.check_availability(
+        if habitacion_id:
+            block = await self.client.availability_block(
+                {
+                    "habitacion_id": habitacion_id,
+                    "fecha_inicio": payload["fecha_inicio"],
+                    "fecha_fin": payload["fecha_fin"],
+                    "duracion_minutos": 15,
+                },
+                token,
+            )
+        else:
+            block = await self.client.availability_allocate(
                 {
                     "hotel_id": payload["hotel_id"],
+                    "tipo_habitacion": payload["tipo_habitacion"],
                     "fecha_inicio": payload["fecha_inicio"],
                     "fecha_fin": payload["fecha_fin"],
-                    "tipo_habitacion": payload.get("tipo_habitacion"),
-                    "numero_huespedes": payload.get("numero_huespedes", 2),
-                    "precio_maximo": None,
+                    "duracion_minutos": 15,
                 },
                 token,
             )
-            habitaciones = dispo.get("habitaciones", [])
-            if not habitaciones:
-                raise ValueError("No hay habitaciones disponibles para el rango solicitado")
-            habitacion_id = habitaciones[0]["habitacion_id"]
+            habitacion_id = block["habitacion_id"]
 
-        # 4. Bloquear habitación (temporal)
-        block = await self.client.availability_block(
-            {
-                "habitacion_id": habitacion_id,
-                "fecha_inicio": payload["fecha_inicio"],
-                "fecha_fin": payload["fecha_fin"],
-                "duracion_minutos": 15,
-            },
-            token,
-        )
-        # 5. Procesar pago
+        # 4. Procesar pago
         pago = await self.client.process_payment(
             {
                 "cliente_id": payload["cliente_id"],
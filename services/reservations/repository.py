@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import uuid
-from typing import List, Optional
+from datetime import date
+from typing import Any, List, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
-from services.reservations.models import ReservaDB
+from services.reservations.models import ReservaDB, reservas_archivo
+from shared.archival import archive_in_batches
 
 
 def create_reservation(db: Session, data: dict) -> ReservaDB:
@@ -28,6 +31,108 @@ def list_reservations_by_customer(db: Session, cliente_id: str) -> List[ReservaD
     return list(db.scalars(select(ReservaDB).where(ReservaDB.cliente_id == cliente_id)))
 
 
+# Columnas proyectadas en los listados (sin cargar entidades ORM)
+LIST_COLUMNS = (
+    ReservaDB.reserva_id,
+    ReservaDB.cliente_id,
+    ReservaDB.hotel_id,
+    ReservaDB.habitacion_id,
+    ReservaDB.fecha_inicio,
+    ReservaDB.fecha_fin,
+    ReservaDB.estado,
+    ReservaDB.monto_total,
+    ReservaDB.creado_en,
+)
+DATE_FIELDS = {"fecha_inicio": ReservaDB.fecha_inicio, "fecha_fin": ReservaDB.fecha_fin}
+
+
+def list_reservations_by_hotel(
+    db: Session,
+    hotel_id: str,
+    campo_fecha: str = "fecha_inicio",
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    estado: Optional[str] = None,
+    after: Optional[Sequence[Any]] = None,
+    limit: int = 50,
+) -> List[Row]:
+    """Reservas de un hotel ordenadas por (fecha, id); `after` = (fecha, id) de la última fila vista."""
+    fecha = DATE_FIELDS[campo_fecha]
+    stmt = select(ReservaDB.id, *LIST_COLUMNS).where(ReservaDB.hotel_id == hotel_id)
+    if desde:
+        stmt = stmt.where(fecha >= desde)
+    if hasta:
+        stmt = stmt.where(fecha <= hasta)
+    if estado:
+        stmt = stmt.where(ReservaDB.estado == estado)
+    if after:
+        last_fecha, last_id = after
+        stmt = stmt.where(or_(fecha > last_fecha, and_(fecha == last_fecha, ReservaDB.id > last_id)))
+    return list(db.execute(stmt.order_by(fecha, ReservaDB.id).limit(limit)))
+
+
+def list_reservations_page_by_customer(
+    db: Session,
+    cliente_id: str,
+    estado: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = 50,
+) -> List[Row]:
+    """Reservas de un cliente, las más recientes primero; `after` = id de la última fila vista.
+
+    Se ordena solo por `id` (crece con el orden de inserción): `creado_en` tiene
+    resolución de segundos y no sirve como clave de keyset.
+    """
+    stmt = select(ReservaDB.id, *LIST_COLUMNS).where(ReservaDB.cliente_id == cliente_id)
+    if estado:
+        stmt = stmt.where(ReservaDB.estado == estado)
+    if after is not None:
+        stmt = stmt.where(ReservaDB.id < after)
+    return list(db.execute(stmt.order_by(ReservaDB.id.desc()).limit(limit)))
+
+
+# Columnas del manifiesto diario (llegadas / salidas)
+MANIFEST_COLUMNS = (
+    ReservaDB.reserva_id,
+    ReservaDB.cliente_id,
+    ReservaDB.hotel_id,
+    ReservaDB.habitacion_id,
+    ReservaDB.fecha_inicio,
+    ReservaDB.fecha_fin,
+    ReservaDB.estado,
+)
+
+
+def list_manifest_rows(
+    db: Session,
+    desde: date,
+    hasta: date,
+    excluded_states: Sequence[str],
+    hotel_id: Optional[str] = None,
+) -> List[Row]:
+    """Reservas que llegan o salen en [desde, hasta] (usa los índices hotel+fecha si se filtra por hotel)."""
+    stmt = select(*MANIFEST_COLUMNS).where(
+        ReservaDB.estado.not_in(excluded_states),
+        or_(ReservaDB.fecha_inicio.between(desde, hasta), ReservaDB.fecha_fin.between(desde, hasta)),
+    )
+    if hotel_id:
+        stmt = stmt.where(ReservaDB.hotel_id == hotel_id)
+    return list(db.execute(stmt))
+
+
+def archive_old_reservations(db: Session, cutoff: date, batch_size: int, pause_seconds: float = 0.0) -> int:
+    """Archiva las reservas terminadas (CHECKOUT) o canceladas cuya estancia acabó antes de `cutoff`."""
+    table = ReservaDB.__table__
+    return archive_in_batches(
+        db,
+        table,
+        reservas_archivo,
+        and_(table.c.estado.in_(("CHECKOUT", "CANCELADA")), table.c.fecha_fin < cutoff),
+        batch_size,
+        pause_seconds,
+    )
+
+
 def update_reservation_status(db: Session, reserva: ReservaDB, estado: str) -> ReservaDB:
     reserva.estado = estado
     db.add(reserva)
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict
+import logging
+from typing import Callable, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
+from shared.database import settings
 from shared.http_client import ServiceClient
 from shared.exceptions import NotFoundError, BadRequestError
+from shared.pagination import decode_cursor, encode_cursor
+from services.reservations.manifest import EXCLUDED_STATES, daily_manifest, manifest_entry, manifest_window
 from services.reservations.repository import (
+    archive_old_reservations,
     create_reservation,
     get_reservation,
+    list_manifest_rows,
+    list_reservations_by_hotel,
+    list_reservations_page_by_customer,
     update_reservation_fields,
     update_reservation_status,
 )
 
+logger = logging.getLogger(__name__)
+
 
 async def create_reservation_flow(db: Session, payload: Dict, token: str):
     client = ServiceClient()
@@ -33,6 +44,7 @@ async def create_reservation_flow(db: Session, payload: Dict, token: str):
     )
     await client.availability_confirm({"bloqueo_id": bloqueo_id, "reserva_id": reserva.reserva_id}, token)
     update_reservation_status(db, reserva, "CONFIRMADA")
+    daily_manifest.apply([reserva])
     await client.publish_notification(
         "reserva.creada",
         {
@@ -51,7 +63,9 @@ def modify_reservation(db: Session, reserva_id: str, data: Dict):
         raise NotFoundError("Reserva no encontrada")
     if reserva.estado not in ("CREADA", "CONFIRMADA"):
         raise BadRequestError("Reserva no modificable en el estado actual")
-    return update_reservation_fields(db, reserva, data)
+    reserva = update_reservation_fields(db, reserva, data)
+    daily_manifest.apply([reserva])
+    return reserva
 
 
 async def cancel_reservation(db: Session, reserva_id: str, token: str):
@@ -66,6 +80,7 @@ async def cancel_reservation(db: Session, reserva_id: str, token: str):
         last = cargos[-1]
         await client.refund_payment(last["transaccion_id"], str(reserva.monto_total), token=token)
     update_reservation_status(db, reserva, "CANCELADA")
+    daily_manifest.apply([reserva])
     await client.publish_notification("reserva.cancelada", {"reserva_id": reserva_id, "cliente_id": reserva.cliente_id})
     return reserva
 
@@ -74,11 +89,124 @@ def checkin_reservation(db: Session, reserva_id: str):
     reserva = get_reservation(db, reserva_id)
     if not reserva:
         raise NotFoundError("Reserva no encontrada")
-    return update_reservation_status(db, reserva, "CHECKIN")
+    reserva = update_reservation_status(db, reserva, "CHECKIN")
+    daily_manifest.apply([reserva])
+    return reserva
 
 
 def checkout_reservation(db: Session, reserva_id: str):
     reserva = get_reservation(db, reserva_id)
     if not reserva:
         raise NotFoundError("Reserva no encontrada")
-    return update_reservation_status(db, reserva, "CHECKOUT")
+    reserva = update_reservation_status(db, reserva, "CHECKOUT")
+    daily_manifest.apply([reserva])
+    return reserva
+
+
+def _parse_cursor(cursor: Optional[str], parse: Callable) -> Optional[tuple]:
+    if not cursor:
+        return None
+    value, last_id = decode_cursor(cursor, 2)
+    try:
+        return parse(value), int(last_id)
+    except (TypeError, ValueError):
+        raise BadRequestError("Cursor inválido")
+
+
+def _page(rows: List, limite: int, cursor_values: Callable) -> Dict:
+    # Se pide una fila de más para saber si hay página siguiente
+    has_more = len(rows) > limite
+    rows = rows[:limite]
+    siguiente = encode_cursor(cursor_values(rows[-1])) if has_more else None
+    return {
+        "reservas": [
+            {
+                "reserva_id": r.reserva_id,
+                "cliente_id": r.cliente_id,
+                "hotel_id": r.hotel_id,
+                "habitacion_id": r.habitacion_id,
+                "fecha_inicio": str(r.fecha_inicio),
+                "fecha_fin": str(r.fecha_fin),
+                "estado": r.estado,
+                "monto_total": str(r.monto_total),
+                "creado_en": str(r.creado_en),
+            }
+            for r in rows
+        ],
+        "siguiente_cursor": siguiente,
+    }
+
+
+def list_hotel_reservations(
+    db: Session,
+    hotel_id: str,
+    campo_fecha: str,
+    desde: Optional[date],
+    hasta: Optional[date],
+    estado: Optional[str],
+    cursor: Optional[str],
+    limite: int,
+) -> Dict:
+    after = _parse_cursor(cursor, date.fromisoformat)
+    rows = list_reservations_by_hotel(db, hotel_id, campo_fecha, desde, hasta, estado, after, limite + 1)
+    return _page(rows, limite, lambda r: [getattr(r, campo_fecha), r.id])
+
+
+def list_customer_reservations(db: Session, cliente_id: str, estado: Optional[str], cursor: Optional[str], limite: int) -> Dict:
+    after = None
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise BadRequestError("Cursor inválido")
+        after = last_id
+    rows = list_reservations_page_by_customer(db, cliente_id, estado, after, limite + 1)
+    return _page(rows, limite, lambda r: [r.id])
+
+
+def rebuild_manifest(db: Session) -> int:
+    desde, hasta = manifest_window()
+    drift = daily_manifest.rebuild(list_manifest_rows(db, desde, hasta, EXCLUDED_STATES), desde, hasta)
+    if drift:
+        logger.warning(f"Manifiesto diario: {drift} reservas desactualizadas corregidas al reconstruir")
+    return drift
+
+
+def _manifest_from_db(db: Session, hotel_id: str, fecha: date) -> Dict[str, List[Dict[str, str]]]:
+    rows = list_manifest_rows(db, fecha, fecha, EXCLUDED_STATES, hotel_id)
+    return {
+        "llegadas": sorted((manifest_entry(r) for r in rows if r.fecha_inicio == fecha), key=lambda e: e["habitacion_id"]),
+        "salidas": sorted((manifest_entry(r) for r in rows if r.fecha_fin == fecha), key=lambda e: e["habitacion_id"]),
+    }
+
+
+def get_daily_manifest(db: Session, hotel_id: str, fecha: date) -> Dict:
+    manifest = daily_manifest.get(hotel_id, fecha)
+    origen = "memoria"
+    if manifest is None:
+        # Fuera de la ventana materializada (o aún sin construir): consulta directa
+        manifest, origen = _manifest_from_db(db, hotel_id, fecha), "db"
+    return {"hotel_id": hotel_id, "fecha": str(fecha), "origen": origen, **manifest}
+
+
+def check_daily_manifest(db: Session, hotel_id: str, fecha: date) -> Dict:
+    """Compara el manifiesto en memoria con ReservaDB para un hotel y día."""
+    manifest = daily_manifest.get(hotel_id, fecha)
+    if manifest is None:
+        raise BadRequestError("El día no está en la ventana del manifiesto")
+    expected = _manifest_from_db(db, hotel_id, fecha)
+    diferencias = {}
+    for lista in ("llegadas", "salidas"):
+        actual = {e["reserva_id"]: e for e in manifest[lista]}
+        esperado = {e["reserva_id"]: e for e in expected[lista]}
+        diferencias[lista] = {
+            "faltantes": sorted(esperado.keys() - actual.keys()),
+            "sobrantes": sorted(actual.keys() - esperado.keys()),
+            "distintas": sorted(k for k in actual.keys() & esperado.keys() if actual[k] != esperado[k]),
+        }
+    consistente = not any(v for d in diferencias.values() for v in d.values())
+    return {"hotel_id": hotel_id, "fecha": str(fecha), "consistente": consistente, **diferencias}
+
+
+def archive_history(db: Session) -> int:
+    cutoff = date.today() - timedelta(days=settings.ARCHIVE_HORIZON_DAYS)
+    return archive_old_reservations(db, cutoff, settings.ARCHIVE_BATCH_SIZE, settings.ARCHIVE_PAUSE_SECONDS)
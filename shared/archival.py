@@ -0,0 +1,83 @@
+"""
+Archivado de filas históricas: se mueven por lotes a tablas `<tabla>_archivo` con la
+misma estructura, cada lote en su propia transacción corta para no retener bloqueos.
+"""
+from __future__ import annotations
+
+import time
+from datetime import date
+from typing import Callable, List, Optional
+
+from sqlalchemy import DDL, Column, DateTime, Table, delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+
+# Particiones anuales desde este año hasta dentro de PARTITION_YEARS_AHEAD (más una MAXVALUE)
+PARTITION_FIRST_YEAR = 2020
+PARTITION_YEARS_AHEAD = 5
+
+
+def partition_ddl(table: str, column: str, first_year: int, last_year: int) -> str:
+    """Particionado por rango de fechas (MySQL) con una partición por año."""
+    parts = [
+        f"PARTITION p{year} VALUES LESS THAN (TO_DAYS('{year + 1}-01-01'))"
+        for year in range(first_year, last_year + 1)
+    ]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS({column})) ({', '.join(parts)})"
+
+
+def archive_table(source: Table, name: str, partition_column: str) -> Table:
+    """
+    Copia de `source` sin índices ni restricciones únicas. La clave primaria es
+    (id, partition_column) porque MySQL exige que la columna de partición forme
+    parte de todas las claves únicas; en MySQL se particiona por año al crearla.
+    """
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key or c.name == partition_column, autoincrement=False)
+        for c in source.columns
+    ]
+    columns.append(Column("archivado_en", DateTime, server_default=func.now()))
+    table = Table(name, source.metadata, *columns)
+    last_year = date.today().year + PARTITION_YEARS_AHEAD
+    event.listen(
+        table,
+        "after_create",
+        DDL(partition_ddl(name, partition_column, PARTITION_FIRST_YEAR, last_year)).execute_if(dialect="mysql"),
+    )
+    return table
+
+
+def archive_in_batches(
+    db: Session,
+    source: Table,
+    archive: Table,
+    where: ColumnElement,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    on_batch: Optional[Callable[[Session, List[int]], None]] = None,
+) -> int:
+    """
+    Mueve a `archive` las filas de `source` que cumplen `where`, `batch_size` por
+    transacción (INSERT ... SELECT + DELETE por id). `on_batch` se ejecuta dentro de
+    la transacción de cada lote. Devuelve cuántas filas se archivaron.
+    """
+    names = [c.name for c in source.columns]
+    total = 0
+    while True:
+        ids = list(db.scalars(select(source.c.id).where(where).order_by(source.c.id).limit(batch_size)))
+        if not ids:
+            break
+        db.execute(insert(archive).from_select(names, select(*(source.c[n] for n in names)).where(source.c.id.in_(ids))))
+        if on_batch:
+            on_batch(db, ids)
+        db.execute(delete(source).where(source.c.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+        if pause_seconds:
+            # Deja paso a las escrituras del servicio entre lotes
+            time.sleep(pause_seconds)
+    return total
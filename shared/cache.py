@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+from shared.config import settings
+
+
+# Nombres de las caches de clientes: la del servicio Customers y la de ServiceClient
+CUSTOMER_CACHE = "customers"
+CUSTOMER_HTTP_CACHE = "http.customers"
+
+_MISSING = object()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class LRUCacheBackend:
+    """LRU en memoria del proceso con expiración por entrada."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """
+    Backend local compartido entre workers del mismo host (fichero SQLite).
+
+    Los valores se guardan como JSON (fechas y decimales pasan a texto), nunca con pickle.
+    """
+
+    def __init__(self, path: str, namespace: str):
+        self.path = path
+        self.namespace = namespace
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "ns TEXT NOT NULL, k TEXT NOT NULL, expires_at REAL NOT NULL, v TEXT NOT NULL, "
+                "PRIMARY KEY (ns, k))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = self._conn().execute(
+            "SELECT expires_at, v FROM cache_entries WHERE ns = ? AND k = ?", (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        # Las expiraciones de SQLite usan reloj de pared porque se comparten entre procesos
+        if row[0] <= time.time():
+            self.delete(key)
+            return _MISSING
+        return json.loads(row[1])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (ns, k, expires_at, v) VALUES (?, ?, ?, ?)",
+            (self.namespace, key, time.time() + ttl, json.dumps(value, default=str)),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE ns = ? AND k = ?", (self.namespace, key))
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM cache_entries WHERE ns = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries WHERE ns = ?", (self.namespace,)).fetchone()[0]
+
+
+class ReadThroughCache:
+    """
+    Cache read-through: en un miss invoca al loader, guarda el resultado y lo devuelve.
+    Los resultados None no se guardan (un recurso inexistente puede crearse después).
+    """
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._stats_lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Any:
+        value = self.backend.get(key)
+        self._count(value is not _MISSING)
+        return None if value is _MISSING else value
+
+    def set(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.backend.set(key, value, self.ttl)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        value = self.backend.get(key)
+        self._count(value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        self.set(key, value)
+        return value
+
+    async def aget_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.backend.get(key)
+        self._count(value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        # Single-flight: los misses concurrentes de una misma clave esperan a la primera carga
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Evita el aviso "exception was never retrieved" si nadie más esperaba
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key: str) -> None:
+        with self._stats_lock:
+            self.invalidations += 1
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "invalidations": invalidations,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "size": len(self.backend),
+        }
+
+
+_registry: Dict[str, Any] = {}
+
+
+def make_backend(name: str, maxsize: int, backend: Optional[str] = None) -> CacheBackend:
+    kind = (backend or settings.CACHE_BACKEND).lower()
+    if kind == "sqlite":
+        return SQLiteCacheBackend(settings.CACHE_SQLITE_PATH, namespace=name)
+    if kind == "memory":
+        return LRUCacheBackend(maxsize=maxsize)
+    raise ValueError(f"CACHE_BACKEND desconocido: {kind}")
+
+
+def get_cache(name: str, ttl: float, maxsize: int = 1024, backend: Optional[str] = None) -> ReadThroughCache:
+    """Devuelve (creándola si no existe) la cache registrada con ese nombre."""
+    cache = _registry.get(name)
+    if cache is None:
+        cache = ReadThroughCache(name, make_backend(name, maxsize, backend), ttl)
+        _registry[name] = cache
+    return cache
+
+
+def register_cache(cache: Any) -> Any:
+    """Registra una cache propia (con `name` y `stats()`) para cache_stats y las métricas."""
+    _registry[cache.name] = cache
+    return cache
+
+
+def customer_cache(name: str = CUSTOMER_CACHE) -> ReadThroughCache:
+    return get_cache(name, ttl=settings.CUSTOMER_CACHE_TTL_SECONDS, maxsize=settings.CUSTOMER_CACHE_MAXSIZE)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
+
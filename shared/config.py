@@ -0,0 +1,122 @@
+"""
+Configuración única de todos los servicios: `.env` y el entorno se leen una sola vez
+al importar este módulo. No importa nada pesado para que cualquier módulo pueda usarla.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from pydantic_settings import BaseSettings
+
+
+class Settings(BaseSettings):
+    MYSQL_HOST: str = "localhost"
+    MYSQL_PORT: int = 3306
+    MYSQL_DB: str = "hotel_reservations"
+    MYSQL_USER: str = "hotel_user"
+    MYSQL_PASSWORD: str = "hotel_pass"
+    DATABASE_URL: Optional[str] = None
+
+    # JWT (shared/security.py y services/auth/security.py)
+    JWT_SECRET_KEY: str = "changeme"
+    JWT_ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+
+    # URLs de los demás servicios (shared/http_client.py)
+    AUTH_SERVICE_URL: str = "http://localhost:8000"
+    CUSTOMERS_SERVICE_URL: str = "http://localhost:8001"
+    AVAILABILITY_SERVICE_URL: str = "http://localhost:8002"
+    PRICING_SERVICE_URL: str = "http://localhost:8003"
+    PAYMENTS_SERVICE_URL: str = "http://localhost:8004"
+    RESERVATIONS_SERVICE_URL: str = "http://localhost:8005"
+    NOTIFICATIONS_SERVICE_URL: str = "http://localhost:8006"
+
+    # Migraciones (shared/migrations.py): en producción se aplican con un paso dedicado;
+    # con True cada servicio migra al arrancar si su esquema va por detrás
+    MIGRATE_ON_STARTUP: bool = False
+
+    # Cache (memory | sqlite; sqlite comparte entradas entre workers del mismo host)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "./cache.db"
+    CUSTOMER_CACHE_TTL_SECONDS: float = 60.0
+    CUSTOMER_CACHE_MAXSIZE: int = 10000
+    # Resultados de búsqueda de Availability: se invalidan por eventos de bloqueo; el TTL
+    # solo acota cambios que no pasan por este proceso. Las claves muy pedidas se sirven
+    # caducadas (hasta SEARCH_CACHE_STALE_SECONDS) mientras se recalculan en segundo plano.
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0
+    SEARCH_CACHE_STALE_SECONDS: float = 30.0
+    SEARCH_CACHE_HOT_HITS: int = 3
+    SEARCH_CACHE_MAXSIZE: int = 5000
+
+    # Archivado de bloqueos y reservas antiguos (shared/archival.py)
+    ARCHIVE_HORIZON_DAYS: int = 365
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_PAUSE_SECONDS: float = 0.05
+    ARCHIVE_INTERVAL_SECONDS: float = 3600.0
+
+    # Trazas (shared/tracing.py): buffer en memoria por proceso (GET /traces) y, si se
+    # indica un fichero, exportación en JSON lines compartible entre servicios
+    TRACING_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 1.0
+    TRACE_BUFFER_SIZE: int = 10000
+    TRACE_EXPORT_PATH: Optional[str] = None
+
+    # Métricas (/metrics en formato Prometheus)
+    METRICS_ENABLED: bool = True
+
+    # /ready: cada comprobación se reutiliza READY_CACHE_SECONDS; el servicio deja de estar
+    # listo si el pool lleva READY_POOL_EXHAUSTED_SECONDS sin conexiones libres
+    READY_CACHE_SECONDS: float = 5.0
+    READY_DEPENDENCY_TIMEOUT_SECONDS: float = 1.0
+    READY_POOL_EXHAUSTED_SECONDS: float = 10.0
+
+    # ServiceClient: circuit breaker por servicio destino, espera entre reintentos (con
+    # jitter) y hedging de lecturas (get_customer, check_availability). Los timeouts y
+    # reintentos de cada llamada están en shared/http_client.py (POLICIES)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    HTTP_RETRY_BACKOFF_BASE_SECONDS: float = 0.05
+    HTTP_RETRY_BACKOFF_MAX_SECONDS: float = 1.0
+    HTTP_HEDGE_ENABLED: bool = False
+    # Bulkhead por servicio destino: llamadas simultáneas, cola y espera máxima en ella.
+    # BULKHEAD_LIMITS fija límites propios, p. ej. BULKHEAD_LIMITS='{"payments": 10}'
+    BULKHEAD_MAX_CONCURRENT: int = 20
+    BULKHEAD_LIMITS: Dict[str, int] = {}
+    BULKHEAD_MAX_QUEUE: int = 50
+    BULKHEAD_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    # Admisión en Reservations: crear/cancelar en curso a la vez, cola y espera máxima;
+    # por encima se responde 503 con Retry-After
+    ADMISSION_MAX_IN_FLIGHT: int = 32
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 0.5
+
+    # Límite de peticiones por usuario (shared/rate_limit.py): "MÉTODO /prefijo" -> "tasa:ráfaga"
+    # en peticiones por segundo; la tasa se multiplica según el rol del token
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_ROUTES: Dict[str, str] = {"POST /api/v1/availability/search": "20:100"}
+    RATE_LIMIT_ROLE_MULTIPLIERS: Dict[str, float] = {"cliente": 1.0, "staff": 5.0, "admin": 10.0}
+    RATE_LIMIT_BACKEND: str = "memory"  # memory | sqlite (compartido por los workers del host)
+    RATE_LIMIT_SQLITE_PATH: str = "./ratelimit.db"
+
+    # Compresión de respuestas (gzip, o brotli si está instalado) desde este tamaño en bytes
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Profiler de SQL (GET /admin/sql-profile); desactivado por defecto
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_PROFILER_TOP_N: int = 20
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 10
+
+    # Reconciliación de los contadores de inventario de Availability con noches_habitacion
+    INVENTORY_RECONCILE_SECONDS: float = 3600.0
+
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+
+
+settings = Settings()
@@ -1,27 +1,20 @@
 from __future__ import annotations
 
+import contextvars
+import heapq
+import logging
 import os
-from typing import Optional
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
-from pydantic_settings import BaseSettings
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
-
-class Settings(BaseSettings):
-    MYSQL_HOST: str = "localhost"
-    MYSQL_PORT: int = 3306
-    MYSQL_DB: str = "hotel_reservations"
-    MYSQL_USER: str = "hotel_user"
-    MYSQL_PASSWORD: str = "hotel_pass"
-    DATABASE_URL: Optional[str] = None
-
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
-
-settings = Settings()
+from shared.config import Settings, settings  # noqa: F401  (reexportado)
 
 
 class Base(DeclarativeBase):
@@ -60,3 +53,186 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ---------------------------------------------------------------------------
+# Profiler de SQL (opcional, SQL_PROFILER_ENABLED)
+#
+# Cada sentencia se agrupa por su texto normalizado (parámetros y listas IN colapsados) y
+# se atribuye a la función de repositorio que la lanzó. Se conservan las N ejecuciones más
+# lentas, las N sentencias más frecuentes y, por petición HTTP, las consultas que se
+# repiten desde la misma función (patrón N+1). Se consulta en GET /admin/sql-profile.
+# ---------------------------------------------------------------------------
+
+profiler_logger = logging.getLogger("sql-profiler")
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+# Consultas de la petición en curso: {(sentencia, origen): veces}
+_request_queries: contextvars.ContextVar[Optional[Dict[Tuple[str, str], int]]] = contextvars.ContextVar(
+    "request_queries", default=None
+)
+
+
+def normalize_statement(statement: str) -> str:
+    text = " ".join(statement.split())
+    text = _IN_LIST.sub("(?, ...)", text)
+    return _LITERAL.sub("?", text)
+
+
+def _origin() -> str:
+    """Función de repositorio (o, si no la hay, de servicio) que lanzó la sentencia."""
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("services."):
+            name = f"{module}.{frame.f_code.co_name}"
+            if module.endswith(".repository"):
+                return name
+            fallback = fallback or name
+        frame = frame.f_back
+    return fallback or "?"
+
+
+class QueryProfiler:
+    def __init__(self, top_n: int, slow_ms: float, n_plus_one: int):
+        self.top_n = top_n
+        self.slow_ms = slow_ms
+        self.n_plus_one = n_plus_one
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            # {sentencia: [veces, ms totales, ms máx, filas, {orígenes}]}
+            self._stats: Dict[str, List[Any]] = {}
+            # Montículo de mínimos con las top_n ejecuciones más lentas
+            self._slowest: List[Tuple[float, int, Dict[str, Any]]] = []
+            self._seq = 0
+            self._n_plus_one: Deque[Dict[str, Any]] = deque(maxlen=self.top_n)
+
+    def record(self, statement: str, duration_ms: float, rows: Optional[int], origin: str) -> None:
+        normalized = normalize_statement(statement)
+        with self._lock:
+            stats = self._stats.get(normalized)
+            if stats is None:
+                stats = self._stats[normalized] = [0, 0.0, 0.0, 0, set()]
+            stats[0] += 1
+            stats[1] += duration_ms
+            stats[2] = max(stats[2], duration_ms)
+            stats[3] += rows if rows and rows > 0 else 0
+            if len(stats[4]) < 10:
+                stats[4].add(origin)
+            if len(self._slowest) < self.top_n or duration_ms > self._slowest[0][0]:
+                self._seq += 1
+                entry = {"statement": normalized, "duration_ms": round(duration_ms, 3), "rows": rows, "origin": origin, "at": time.time()}
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, (duration_ms, self._seq, entry))
+                else:
+                    heapq.heapreplace(self._slowest, (duration_ms, self._seq, entry))
+        queries = _request_queries.get()
+        if queries is not None and normalized.startswith("SELECT"):
+            key = (normalized, origin)
+            queries[key] = queries.get(key, 0) + 1
+        if duration_ms >= self.slow_ms:
+            profiler_logger.warning(f"Consulta lenta ({duration_ms:.1f} ms) desde {origin}: {normalized[:300]}")
+
+    def finish_request(self, path: str, queries: Dict[Tuple[str, str], int]) -> None:
+        for (statement, origin), count in queries.items():
+            if count >= self.n_plus_one:
+                profiler_logger.warning(f"Posible N+1 en {path}: {count} veces desde {origin}: {statement[:200]}")
+                with self._lock:
+                    self._n_plus_one.append({"path": path, "origin": origin, "statement": statement, "count": count, "at": time.time()})
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = [
+                {
+                    "statement": statement,
+                    "count": count,
+                    "total_ms": round(total, 3),
+                    "avg_ms": round(total / count, 3),
+                    "max_ms": round(max_ms, 3),
+                    "rows": rows,
+                    "origins": sorted(origins),
+                }
+                for statement, (count, total, max_ms, rows, origins) in self._stats.items()
+            ]
+            slowest = [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+            n_plus_one = list(self._n_plus_one)
+        return {
+            "enabled": True,
+            "slowest": slowest,
+            "most_frequent": sorted(stats, key=lambda s: s["count"], reverse=True)[: self.top_n],
+            "most_time": sorted(stats, key=lambda s: s["total_ms"], reverse=True)[: self.top_n],
+            "n_plus_one": n_plus_one,
+        }
+
+
+profiler = QueryProfiler(settings.SQL_PROFILER_TOP_N, settings.SQL_SLOW_QUERY_MS, settings.SQL_N_PLUS_ONE_THRESHOLD)
+
+
+def _profile_before(conn, cursor, statement, parameters, context, executemany):
+    context._profile_t0 = time.perf_counter()
+    context._profile_origin = _origin()
+
+
+def _profile_after(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_t0", None)
+    if started is None:
+        return
+    rows = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount >= 0 else None
+    profiler.record(statement, (time.perf_counter() - started) * 1000, rows, context._profile_origin)
+
+
+def enable_profiling(target_engine=None) -> None:
+    from sqlalchemy import event
+
+    target_engine = target_engine if target_engine is not None else engine
+    if not event.contains(target_engine, "before_cursor_execute", _profile_before):
+        event.listen(target_engine, "before_cursor_execute", _profile_before)
+        event.listen(target_engine, "after_cursor_execute", _profile_after)
+
+
+class QueryProfilerMiddleware:
+    """Middleware ASGI: agrupa las consultas de cada petición para detectar N+1."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries: Dict[Tuple[str, str], int] = {}
+        token = _request_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            if queries:
+                profiler.finish_request(f"{scope['method']} {scope['path']}", queries)
+
+
+def setup_sql_profiler(app, target_engine=None) -> None:
+    """Con SQL_PROFILER_ENABLED instrumenta el engine; `/admin/sql-profile` existe siempre."""
+    from fastapi import Depends
+
+    from shared.security import require_admin
+
+    if settings.SQL_PROFILER_ENABLED:
+        enable_profiling(target_engine)
+        app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get("/admin/sql-profile", include_in_schema=False)
+    def sql_profile(current_user: dict = Depends(require_admin)) -> Dict[str, Any]:
+        if not settings.SQL_PROFILER_ENABLED:
+            return {"enabled": False}
+        return profiler.report()
+
+    @app.delete("/admin/sql-profile", include_in_schema=False)
+    def reset_sql_profile(current_user: dict = Depends(require_admin)) -> Dict[str, Any]:
+        profiler.reset()
+        return {"status": "ok"}
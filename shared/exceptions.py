@@ -1,3 +1,5 @@
+import math
+
 from fastapi import HTTPException, status
 
 
@@ -16,6 +18,20 @@ class UnauthorizedError(HTTPException):
         super().__init__(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
 
 
+class ForbiddenError(HTTPException):
+    def __init__(self, detail: str = "Permisos insuficientes"):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
 class ConflictError(HTTPException):
     def __init__(self, detail: str = "Conflicto de datos"):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+
+class ServiceUnavailableError(HTTPException):
+    def __init__(self, detail: str = "Servicio no disponible", retry_after: float = 1.0):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
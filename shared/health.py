@@ -0,0 +1,154 @@
+"""
+Comprobación de disponibilidad (`GET /ready`) para el balanceador.
+
+A diferencia de `/health`, que solo dice que el proceso responde, `/ready` comprueba la
+base de datos (`SELECT 1`) y que los servicios de los que depende respondan a su
+`/health`, e informa de la latencia de cada uno. Los resultados se guardan
+READY_CACHE_SECONDS y las sondas concurrentes esperan a la misma comprobación, así que
+un balanceador que sondea a menudo no añade carga.
+
+El pool de conexiones se vigila en cada checkout: si lleva READY_POOL_EXHAUSTED_SECONDS
+sin que se vea una conexión libre el servicio pasa a no-listo, aunque un `SELECT 1`
+puntual pudiera salir bien (con peticiones esperando, cada conexión devuelta la toma
+otra en el acto y el pool sigue lleno).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from shared.config import settings
+
+
+@dataclass
+class CheckResult:
+    ok: bool
+    latency_ms: float
+    detail: Optional[str] = None
+    checked_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"status": "ok" if self.ok else "error", "latency_ms": self.latency_ms}
+        if self.detail:
+            data["detail"] = self.detail
+        return data
+
+
+class PoolWatch:
+    """Desde cuándo el pool del engine no tiene conexiones libres (None si las tiene)."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.engine = engine
+        self.exhausted_since: Optional[float] = None
+        event.listen(engine, "checkout", self._on_checkout)
+
+    def capacity(self) -> Optional[int]:
+        pool = self.engine.pool
+        size, max_overflow = getattr(pool, "size", None), getattr(pool, "_max_overflow", None)
+        if size is None or max_overflow is None or max_overflow < 0:
+            return None  # pool sin límite (o sin pooling): nunca se agota
+        return size() + max_overflow
+
+    def exhausted(self) -> bool:
+        capacity = self.capacity()
+        return capacity is not None and self.engine.pool.checkedout() >= capacity
+
+    def _on_checkout(self, *args) -> None:
+        if not self.exhausted():
+            self.exhausted_since = None
+        elif self.exhausted_since is None:
+            self.exhausted_since = time.monotonic()
+
+    def exhausted_for(self) -> float:
+        if not self.exhausted():
+            self.exhausted_since = None
+        since = self.exhausted_since
+        return 0.0 if since is None else time.monotonic() - since
+
+
+class Readiness:
+    def __init__(self, service: str, engine=None, dependencies: Sequence[str] = ()):
+        self.service = service
+        self.engine = engine
+        self.dependencies = list(dependencies)
+        self.pool = PoolWatch(engine) if engine is not None else None
+        self._results: Dict[str, CheckResult] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _check_db(self) -> None:
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def _check_dependency(self, name: str) -> None:
+        import httpx
+
+        # Una sonda cada READY_CACHE_SECONDS como mucho: no compensa mantener un pool
+        url = getattr(settings, f"{name.upper()}_SERVICE_URL")
+        async with httpx.AsyncClient(timeout=settings.READY_DEPENDENCY_TIMEOUT_SECONDS) as client:
+            resp = await client.get(f"{url}/health")
+        resp.raise_for_status()
+
+    async def _run(self, name: str) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            if name == "database":
+                if self.pool is not None and self.pool.exhausted():
+                    # Pedir otra conexión esperaría pool_timeout: se informa sin bloquear
+                    raise RuntimeError("pool de conexiones agotado")
+                await asyncio.wait_for(run_in_threadpool(self._check_db), settings.READY_DEPENDENCY_TIMEOUT_SECONDS)
+            else:
+                await self._check_dependency(name)
+        except Exception as e:
+            return CheckResult(False, round((time.perf_counter() - started) * 1000, 3), str(e) or type(e).__name__)
+        return CheckResult(True, round((time.perf_counter() - started) * 1000, 3))
+
+    async def check(self, name: str) -> CheckResult:
+        cached = self._results.get(name)
+        if cached is not None and time.monotonic() - cached.checked_at < settings.READY_CACHE_SECONDS:
+            return cached
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            cached = self._results.get(name)
+            if cached is not None and time.monotonic() - cached.checked_at < settings.READY_CACHE_SECONDS:
+                return cached
+            result = self._results[name] = await self._run(name)
+            return result
+
+    async def report(self) -> Dict[str, Any]:
+        names: List[str] = (["database"] if self.engine is not None else []) + self.dependencies
+        results = await asyncio.gather(*(self.check(n) for n in names))
+        checks = {n: r.to_dict() for n, r in zip(names, results)}
+        ready = all(r.ok for r in results)
+        if self.pool is not None:
+            pool = self.engine.pool
+            exhausted_for = self.pool.exhausted_for()
+            checks["pool"] = {
+                "status": "error" if exhausted_for >= settings.READY_POOL_EXHAUSTED_SECONDS else "ok",
+                "checked_out": pool.checkedout(),
+                "capacity": self.pool.capacity(),
+                "exhausted_seconds": round(exhausted_for, 3),
+            }
+            ready = ready and checks["pool"]["status"] == "ok"
+        return {"status": "ready" if ready else "not_ready", "service": self.service, "checks": checks}
+
+
+def setup_readiness(app, service: str, engine=None, dependencies: Sequence[str] = ()) -> Readiness:
+    """`GET /ready`: 200 si la BD y las dependencias responden, 503 si no."""
+    from fastapi.responses import JSONResponse
+
+    readiness = Readiness(service, engine, dependencies)
+
+    @app.get("/ready", include_in_schema=False)
+    async def ready():
+        report = await readiness.report()
+        return JSONResponse(report, status_code=200 if report["status"] == "ready" else 503)
+
+    return readiness
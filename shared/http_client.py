@@ -1,96 +1,272 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
 from datetime import date, datetime
 from decimal import Decimal
+from urllib.parse import urlsplit
 
-import httpx
-from pydantic_settings import BaseSettings
+from shared.cache import CUSTOMER_HTTP_CACHE, customer_cache as get_customer_cache
+from shared.config import settings
+from shared.metrics import registry
+from shared.resilience import STATE_VALUES, backoff_delay, breaker_for, breaker_states, bulkhead_for, bulkheads
+from shared.tracing import TRACEPARENT, start_span, traceparent
 
 
-class Settings(BaseSettings):
-    AUTH_SERVICE_URL: str = "http://localhost:8000"
-    CUSTOMERS_SERVICE_URL: str = "http://localhost:8001"
-    AVAILABILITY_SERVICE_URL: str = "http://localhost:8002"
-    PRICING_SERVICE_URL: str = "http://localhost:8003"
-    PAYMENTS_SERVICE_URL: str = "http://localhost:8004"
-    RESERVATIONS_SERVICE_URL: str = "http://localhost:8005"
-    NOTIFICATIONS_SERVICE_URL: str = "http://localhost:8006"
+# Compartida entre instancias de ServiceClient. Customers la invalida en cada
+# actualización, pero solo llega aquí con CACHE_BACKEND=sqlite (mismo fichero);
+# con memory la frescura queda acotada por el TTL.
+customer_cache = get_customer_cache(CUSTOMER_HTTP_CACHE)
 
-    class Config:
-        env_file = ".env"
+client_requests = registry.counter("http_client_requests_total", "Llamadas salientes por servicio destino y estado", ("target", "status"))
+client_latency = registry.histogram("http_client_request_duration_seconds", "Latencia de las llamadas salientes", ("target",))
+client_in_flight = registry.gauge("http_client_requests_in_flight", "Llamadas salientes en curso", ("target",))
 
+client_retries = registry.counter("http_client_retries_total", "Reintentos de llamadas salientes", ("target",))
+client_hedges = registry.counter("http_client_hedges_total", "Peticiones duplicadas (hedging) y cuál respondió antes", ("target", "winner"))
+client_rejections = registry.counter("http_client_circuit_rejections_total", "Llamadas rechazadas con el circuito abierto", ("target",))
+registry.callback(
+    "http_client_circuit_state",
+    "Estado del circuit breaker por destino (0 cerrado, 1 half-open, 2 abierto)",
+    lambda: (({"target": t}, STATE_VALUES[s]) for t, s in breaker_states().items()),
+)
 
-settings = Settings()
+
+
+def _bulkhead_samples():
+    for target, bulkhead in bulkheads().items():
+        yield {"target": target, "state": "active"}, bulkhead.active
+        yield {"target": target, "state": "queued"}, bulkhead.queued
+
+
+registry.callback("http_client_bulkhead_calls", "Llamadas en curso y en cola en el bulkhead de cada destino", _bulkhead_samples)
+registry.callback(
+    "http_client_bulkhead_rejections_total",
+    "Llamadas rechazadas por bulkhead lleno",
+    lambda: (({"target": t}, b.rejected) for t, b in bulkheads().items()),
+    "counter",
+)
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    timeout: float
+    # Solo en llamadas idempotentes: reintentar un bloqueo o un cobro podría duplicarlo
+    retries: int = 0
+    # Lanza una segunda petición si la primera no ha respondido en hedge_after segundos
+    hedge_after: Optional[float] = None
+
+
+POLICIES: Dict[str, EndpointPolicy] = {
+    "get_customer": EndpointPolicy(timeout=2.0, retries=2, hedge_after=0.1),
+    "check_availability": EndpointPolicy(timeout=2.0, retries=2, hedge_after=0.1),
+    # El cálculo de precio no cambia estado: se puede reintentar aunque sea POST
+    "calculate_price": EndpointPolicy(timeout=2.0, retries=2),
+    "availability_block": EndpointPolicy(timeout=3.0),
+    "availability_allocate": EndpointPolicy(timeout=3.0),
+    "availability_confirm": EndpointPolicy(timeout=3.0),
+    "process_payment": EndpointPolicy(timeout=5.0),
+    "payments_by_reservation": EndpointPolicy(timeout=2.0, retries=2),
+    "refund_payment": EndpointPolicy(timeout=5.0),
+    "publish_notification": EndpointPolicy(timeout=1.0),
+}
+DEFAULT_POLICY = EndpointPolicy(timeout=10.0)
+
+
+class _RetryableStatus(Exception):
+    """Respuesta 5xx: cuenta como fallo del destino y se puede reintentar."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+# Clientes vivos, para leer el uso de sus pools de conexiones en /metrics
+_live_clients: "weakref.WeakSet[ServiceClient]" = weakref.WeakSet()
+_targets: Dict[str, str] = {}
+
+
+def _target(url: str) -> str:
+    """Nombre del servicio destino (customers, payments...) a partir de la URL."""
+    if not _targets:
+        for name in ("auth", "customers", "availability", "pricing", "payments", "reservations", "notifications"):
+            _targets[urlsplit(getattr(settings, f"{name.upper()}_SERVICE_URL")).netloc] = name
+    netloc = urlsplit(url).netloc
+    return _targets.get(netloc, netloc)
+
+
+def pool_usage() -> Dict[str, int]:
+    """Conexiones abiertas de todos los ServiceClient vivos: en uso y ociosas."""
+    active = idle = 0
+    for client in list(_live_clients):
+        pool = getattr(getattr(client._client, "_transport", None), "_pool", None)
+        for conn in list(getattr(pool, "connections", ())):
+            if conn.is_idle():
+                idle += 1
+            else:
+                active += 1
+    return {"active": active, "idle": idle}
 
 
 class ServiceClient:
     """Cliente HTTP para comunicarse con otros servicios"""
 
     def __init__(self):
+        # httpx (~80 ms de importación) solo se carga cuando se crea el primer cliente
+        import httpx
+
         self._client = httpx.AsyncClient(timeout=10.0)
+        _live_clients.add(self)
+
+    async def _request(self, method: str, url: str, operation: str, **kwargs) -> Any:
+        """Llamada con la política de `operation`: timeout, reintentos, hedging y breaker."""
+        import httpx
+
+        policy = POLICIES.get(operation, DEFAULT_POLICY)
+        target = _target(url)
+        breaker = breaker_for(target)
+        hedge_after = policy.hedge_after if settings.HTTP_HEDGE_ENABLED else None
+        for attempt in range(policy.retries + 1):
+            try:
+                breaker.before_call()
+            except Exception:
+                client_rejections.labels(target).inc()
+                raise
+            try:
+                if hedge_after is not None:
+                    resp = await self._hedged(method, url, target, policy.timeout, hedge_after, **kwargs)
+                else:
+                    resp = await self._send(method, url, target, policy.timeout, **kwargs)
+            except (httpx.TransportError, _RetryableStatus) as e:
+                breaker.record_failure()
+                if attempt < policy.retries:
+                    client_retries.labels(target).inc()
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                if isinstance(e, _RetryableStatus):
+                    e.response.raise_for_status()
+                raise
+            except BaseException:
+                # Cancelación u otro error local: no dice nada del destino
+                breaker.release()
+                raise
+            breaker.record_success()
+            resp.raise_for_status()
+            return resp.json()
+
+    async def _hedged(self, method: str, url: str, target: str, timeout: float, hedge_after: float, **kwargs):
+        """Si la primera petición tarda más de hedge_after, lanza otra y usa la que llegue antes."""
+        first = asyncio.ensure_future(self._send(method, url, target, timeout, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+        second = asyncio.ensure_future(self._send(method, url, target, timeout, **kwargs))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        client_hedges.labels(target, "hedge" if task is second else "primary").inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(self, method: str, url: str, target: str, timeout: float, **kwargs):
+        # Span de cliente hijo del de la petición en curso; el siguiente servicio lo
+        # continúa gracias a traceparent
+        child = start_span(f"{method} {url}", "client", url=url)
+        if child is not None:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), TRACEPARENT: traceparent(child)}
+        bulkhead = bulkhead_for(target)
+        try:
+            await bulkhead.acquire()
+        except BaseException:
+            if child is not None:
+                child.finish("error")
+            raise
+        in_flight = client_in_flight.labels(target)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            resp = await self._client.request(method, url, timeout=timeout, **kwargs)
+        except BaseException as e:
+            # La petición que pierde un hedge se cancela: no es un error del destino
+            outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+            client_requests.labels(target, outcome).inc()
+            if child is not None:
+                child.finish(outcome)
+            raise
+        finally:
+            in_flight.dec()
+            bulkhead.release()
+        client_latency.labels(target).observe(time.perf_counter() - started)
+        client_requests.labels(target, resp.status_code).inc()
+        if child is not None:
+            child.attributes["status_code"] = resp.status_code
+            child.finish("error" if resp.status_code >= 500 else "ok")
+        if resp.status_code >= 500:
+            raise _RetryableStatus(resp)
+        return resp
 
     async def get_customer(self, cliente_id: str, token: str) -> Dict[str, Any]:
-        url = f"{settings.CUSTOMERS_SERVICE_URL}/api/v1/customers/{cliente_id}"
-        headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.get(url, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        async def load() -> Dict[str, Any]:
+            url = f"{settings.CUSTOMERS_SERVICE_URL}/api/v1/customers/{cliente_id}"
+            headers = {"Authorization": f"Bearer {token}"}
+            return await self._request("GET", url, "get_customer", headers=headers)
+
+        return await customer_cache.aget_or_load(cliente_id, load)
 
     async def check_availability(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
         url = f"{settings.AVAILABILITY_SERVICE_URL}/api/v1/availability/search"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json=_to_jsonable(params), headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "check_availability", json=_to_jsonable(params), headers=headers)
 
     async def calculate_price(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
         url = f"{settings.PRICING_SERVICE_URL}/api/v1/pricing/calculate"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json=_to_jsonable(params), headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "calculate_price", json=_to_jsonable(params), headers=headers)
 
     async def process_payment(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
         url = f"{settings.PAYMENTS_SERVICE_URL}/api/v1/payments/process"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json=_to_jsonable(params), headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "process_payment", json=_to_jsonable(params), headers=headers)
 
     async def availability_block(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
         url = f"{settings.AVAILABILITY_SERVICE_URL}/api/v1/availability/block"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json=_to_jsonable(params), headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "availability_block", json=_to_jsonable(params), headers=headers)
+
+    async def availability_allocate(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
+        url = f"{settings.AVAILABILITY_SERVICE_URL}/api/v1/availability/block/allocate"
+        headers = {"Authorization": f"Bearer {token}"}
+        return await self._request("POST", url, "availability_allocate", json=_to_jsonable(params), headers=headers)
 
     async def availability_confirm(self, params: Dict[str, Any], token: str) -> Dict[str, Any]:
         url = f"{settings.AVAILABILITY_SERVICE_URL}/api/v1/availability/confirm"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json=_to_jsonable(params), headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "availability_confirm", json=_to_jsonable(params), headers=headers)
 
     async def publish_notification(self, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
         url = f"{settings.NOTIFICATIONS_SERVICE_URL}/api/v1/notifications/publish"
-        resp = await self._client.post(url, json={"evento": event, "datos": data})
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "publish_notification", json={"evento": event, "datos": data})
 
     async def payments_by_reservation(self, reserva_id: str, token: str) -> Dict[str, Any]:
         url = f"{settings.PAYMENTS_SERVICE_URL}/api/v1/payments/by-reservation/{reserva_id}"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.get(url, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("GET", url, "payments_by_reservation", headers=headers)
 
     async def refund_payment(self, transaccion_id: str, monto: str, token: str) -> Dict[str, Any]:
         url = f"{settings.PAYMENTS_SERVICE_URL}/api/v1/payments/refund"
         headers = {"Authorization": f"Bearer {token}"}
-        resp = await self._client.post(url, json={"transaccion_id": transaccion_id, "monto": monto}, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._request("POST", url, "refund_payment", json={"transaccion_id": transaccion_id, "monto": monto}, headers=headers)
 
 
 def _to_jsonable(value: Any) -> Any:
@@ -0,0 +1,391 @@
+"""
+Métricas en formato de exposición de Prometheus, sin dependencias externas.
+
+Pensadas para el camino caliente:
+  - cada combinación de etiquetas se resuelve una vez a un hijo (`labels()` lo cachea) y
+    el middleware guarda sus hijos por (método, ruta, estado);
+  - los incrementos no toman locks: cada hilo acumula en su propia fila (solo ese hilo la
+    escribe) y `/metrics` suma las filas al leer;
+  - lo que ya existe en otro sitio (pool de conexiones, caches, EventBus, clientes HTTP)
+    no se cuenta dos veces: se lee con callbacks en el momento del scrape.
+
+setup_metrics(app, servicio, engine) añade el middleware, `GET /metrics` y los tiempos
+de las sentencias SQL; con METRICS_ENABLED=false solo queda `/metrics` con lo leído por
+callbacks.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _fmt_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Sharded:
+    """Una fila por hilo: la escribe solo su hilo, así que no hace falta lock."""
+
+    def __init__(self, width: int):
+        self._width = width
+        self._rows: Dict[int, List[float]] = {}
+
+    def _row(self) -> List[float]:
+        tid = threading.get_ident()
+        row = self._rows.get(tid)
+        if row is None:
+            row = self._rows[tid] = [0.0] * self._width
+        return row
+
+    def totals(self) -> List[float]:
+        result = [0.0] * self._width
+        for row in list(self._rows.values()):
+            for i, v in enumerate(row):
+                result[i] += v
+        return result
+
+
+class CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._row()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self.totals()[0]
+
+
+class GaugeChild(_Sharded):
+    """Gauge de sumas y restas (p. ej. peticiones en curso)."""
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._row()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._row()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self.totals()[0]
+
+
+class HistogramChild(_Sharded):
+    # Fila: un contador por cubo (no acumulado), +Inf, suma
+    def __init__(self, buckets: Sequence[float]):
+        super().__init__(len(buckets) + 2)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float) -> None:
+        row = self._row()
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(acumulados por cubo incluido +Inf, count, sum)."""
+        totals = self.totals()
+        cumulative, running = [], 0.0
+        for n in totals[:-1]:
+            running += n
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Hijo para esos valores de etiqueta; se crea una sola vez y conviene guardarlo."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def _items(self):
+        return [(tuple(zip(self.labelnames, key)), child) for key, child in list(self._children.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def samples(self):
+        for labels, child in self._items():
+            yield f"{self.name}{_fmt_labels(labels)} {_fmt_value(child.value)}"
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def samples(self):
+        for labels, child in self._items():
+            yield f"{self.name}{_fmt_labels(labels)} {_fmt_value(child.value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def samples(self):
+        bounds = ['le="%r"' % b for b in self.buckets] + ['le="+Inf"']
+        for labels, child in self._items():
+            cumulative, count, total = child.snapshot()
+            for bound, n in zip(bounds, cumulative):
+                yield f"{self.name}_bucket{_fmt_labels(labels, bound)} {_fmt_value(n)}"
+            yield f"{self.name}_count{_fmt_labels(labels)} {_fmt_value(count)}"
+            yield f"{self.name}_sum{_fmt_labels(labels)} {_fmt_value(total)}"
+
+
+class CallbackMetric:
+    """Métrica leída en el scrape: fn() devuelve [(etiquetas, valor)]."""
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], Iterable[Tuple[Dict[str, str], float]]], kind: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.kind = kind
+
+    def samples(self):
+        for labels, value in self.fn():
+            yield f"{self.name}{_fmt_labels(tuple(labels.items()))} {_fmt_value(value)}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, fn, kind: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, fn, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                samples = list(metric.samples())
+            except Exception as e:  # una fuente rota no debe tumbar el scrape entero
+                lines.append(f"# {metric.name} no disponible: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter("http_requests_total", "Peticiones HTTP atendidas", ("service", "method", "route", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "Latencia de las peticiones HTTP", ("service", "method", "route"))
+http_in_flight = registry.gauge("http_requests_in_flight", "Peticiones HTTP en curso", ("service",))
+db_latency = registry.histogram("db_query_duration_seconds", "Duración de las sentencias SQL", ("operation",), DB_BUCKETS)
+
+UNMATCHED_ROUTE = "<sin ruta>"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: cuenta y mide cada petición por plantilla de ruta (no por URL)."""
+
+    def __init__(self, app, service: str, routes_app=None):
+        self.app = app
+        self.service = service
+        self.routes_app = routes_app
+        self._paths: Dict[object, str] = {}
+        self._children: Dict[Tuple[str, str, int], Tuple[CounterChild, HistogramChild]] = {}
+        self._in_flight = http_in_flight.labels(service)
+
+    def _route(self, endpoint) -> str:
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._paths.get(endpoint)
+        if path is None and self.routes_app is not None:
+            self._paths = {getattr(r, "endpoint", None): r.path for r in self.routes_app.routes}
+            path = self._paths.get(endpoint)
+        return path or UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self._in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight.dec()
+            key = (scope["method"], self._route(scope.get("endpoint")), status_code)
+            children = self._children.get(key)
+            if children is None:
+                children = self._children[key] = (
+                    http_requests.labels(self.service, key[0], key[1], key[2]),
+                    http_latency.labels(self.service, key[0], key[1]),
+                )
+            children[0].inc()
+            children[1].observe(elapsed)
+
+
+_db_children: Dict[str, HistogramChild] = {}
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_t0 = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_t0", None)
+    if started is None:
+        return
+    operation = statement.lstrip()[:6].upper()
+    child = _db_children.get(operation)
+    if child is None:
+        child = _db_children[operation] = db_latency.labels(operation)
+    child.observe(time.perf_counter() - started)
+
+
+def instrument_engine(engine) -> None:
+    """Tiempos de cada sentencia SQL y estado del pool de conexiones del engine."""
+    from sqlalchemy import event
+
+    if event.contains(engine, "before_cursor_execute", _before_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+
+    def pool_state():
+        pool = engine.pool
+        for state, attr in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+            fn = getattr(pool, attr, None)
+            if fn is not None:
+                yield {"state": state}, fn()
+
+    registry.callback("db_pool_connections", "Conexiones del pool de SQLAlchemy por estado", pool_state)
+
+
+def _cache_samples(field: str):
+    def fn():
+        from shared.cache import cache_stats
+
+        for name, stats in cache_stats().items():
+            if field in stats:
+                yield {"cache": name}, stats[field]
+    return fn
+
+
+def _eventbus_samples(kind: str):
+    def fn():
+        from shared.events import event_bus
+
+        if kind == "history":
+            yield {}, len(event_bus.obtener_historial())
+        else:
+            for tipo, callbacks in list(event_bus._suscriptores.items()):
+                yield {"event": tipo}, len(callbacks)
+    return fn
+
+
+def _register_shared_sources() -> None:
+    for field, kind, doc in (
+        ("hits", "counter", "Aciertos de cache"),
+        ("stale_hits", "counter", "Aciertos servidos caducados mientras se recalculan"),
+        ("misses", "counter", "Fallos de cache"),
+        ("invalidations", "counter", "Entradas invalidadas"),
+        ("size", "gauge", "Entradas en cache"),
+        ("hit_rate", "gauge", "Fracción de aciertos"),
+    ):
+        name = f"cache_{field}_total" if kind == "counter" else f"cache_{field}"
+        registry.callback(name, doc, _cache_samples(field), kind)
+    # El EventBus entrega de forma síncrona: no hay cola, la profundidad es el historial
+    registry.callback("eventbus_events", "Eventos publicados en este proceso (historial del EventBus)", _eventbus_samples("history"))
+    registry.callback("eventbus_subscribers", "Suscriptores por tipo de evento", _eventbus_samples("subscribers"))
+
+    def http_client_pool():
+        from shared.http_client import pool_usage
+
+        for state, value in pool_usage().items():
+            yield {"state": state}, value
+
+    registry.callback("http_client_connections", "Conexiones de los clientes ServiceClient vivos por estado", http_client_pool)
+
+
+_register_shared_sources()
+
+
+def setup_metrics(app, service: str, engine=None) -> None:
+    """Middleware, `GET /metrics` y, si hay BD, tiempos SQL y estado del pool."""
+    from fastapi.responses import PlainTextResponse
+
+    from shared.config import settings
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, service=service, routes_app=app)
+        if engine is not None:
+            instrument_engine(engine)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics() -> str:
+        return registry.render()
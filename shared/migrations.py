@@ -0,0 +1,207 @@
+"""
+Migraciones de esquema versionadas por servicio.
+
+Cada servicio declara su lista ordenada de migraciones en `services/<servicio>/migrations.py`
+y la versión aplicada se registra en la tabla `schema_migrations`. Las migraciones se
+aplican una sola vez con un paso dedicado:
+
+    python -m shared.migrations [servicio ...] [--status]
+
+Al arrancar, cada servicio solo comprueba su versión con una consulta (sin reflexión ni
+create_all); en SQLite (desarrollo y pruebas) o con MIGRATE_ON_STARTUP las aplica él mismo.
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from shared.database import Base, settings
+
+
+logger = logging.getLogger("migrations")
+
+SERVICES = ("auth", "customers", "availability", "payments", "reservations")
+LOCK_TIMEOUT_SECONDS = 60
+
+# Metadata propia: la tabla de control no debe crearse con el create_all de los modelos
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("servicio", String(50), primary_key=True),
+    Column("version", Integer, primary_key=True),
+    Column("descripcion", String(255), nullable=False),
+    Column("aplicada_en", DateTime, server_default=func.now()),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    descripcion: str
+    upgrade: Callable[[Connection], None]
+
+
+def create_tables(*tables: Table) -> Callable[[Connection], None]:
+    """Crea las tablas que falten (idempotente sobre BDs creadas con el antiguo create_all)."""
+    def upgrade(conn: Connection) -> None:
+        Base.metadata.create_all(conn, tables=list(tables), checkfirst=True)
+    return upgrade
+
+
+def sync_indexes(table: Table, drop: Sequence[str] = ()) -> Callable[[Connection], None]:
+    """
+    Crea los índices declarados en el modelo que falten, recrea los que existen con otras
+    columnas y elimina los índices obsoletos de `drop` si siguen presentes.
+    """
+    def upgrade(conn: Connection) -> None:
+        existing = {ix["name"]: ix["column_names"] for ix in inspect(conn).get_indexes(table.name)}
+        for name in drop:
+            if name in existing:
+                conn.execute(text(_drop_index_sql(conn, table.name, name)))
+        for index in table.indexes:
+            columns = [c.name for c in index.columns]
+            if index.name in existing and existing[index.name] != columns:
+                conn.execute(text(_drop_index_sql(conn, table.name, index.name)))
+                index.create(conn)
+            elif index.name not in existing:
+                index.create(conn)
+    return upgrade
+
+
+def _drop_index_sql(conn: Connection, table: str, name: str) -> str:
+    if conn.dialect.name == "mysql":
+        return f"DROP INDEX {name} ON {table}"
+    return f"DROP INDEX {name}"
+
+
+def latest_version(migrations: Sequence[Migration]) -> int:
+    return max((m.version for m in migrations), default=0)
+
+
+def current_version(engine: Engine, servicio: str) -> int:
+    """Versión aplicada (0 si la tabla de control aún no existe). Una sola consulta."""
+    try:
+        with engine.connect() as conn:
+            version = conn.scalar(
+                select(func.max(schema_migrations.c.version)).where(schema_migrations.c.servicio == servicio)
+            )
+    except (OperationalError, ProgrammingError):
+        return 0
+    return version or 0
+
+
+_local_lock = threading.Lock()
+
+
+@contextmanager
+def _migration_lock(engine: Engine, servicio: str) -> Iterator[None]:
+    """Evita que dos réplicas migren a la vez: GET_LOCK en MySQL, lock del proceso en SQLite."""
+    if engine.dialect.name != "mysql":
+        with _local_lock:
+            yield
+        return
+    name = f"schema_migrations.{servicio}"
+    with engine.connect() as conn:
+        acquired = conn.scalar(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": LOCK_TIMEOUT_SECONDS})
+        if acquired != 1:
+            raise RuntimeError(f"No se pudo obtener el lock de migraciones de {servicio}")
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+
+def upgrade(engine: Engine, servicio: str, migrations: Sequence[Migration]) -> int:
+    """Aplica en orden las migraciones pendientes; devuelve la versión final."""
+    with engine.begin() as conn:
+        schema_migrations.create(conn, checkfirst=True)
+    with _migration_lock(engine, servicio):
+        # Releer bajo el lock: otra réplica puede haber migrado mientras esperábamos
+        applied = current_version(engine, servicio)
+        for migration in sorted(migrations, key=lambda m: m.version):
+            if migration.version <= applied:
+                continue
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                conn.execute(
+                    insert(schema_migrations).values(
+                        servicio=servicio, version=migration.version, descripcion=migration.descripcion
+                    )
+                )
+            applied = migration.version
+            logger.info(f"{servicio}: migración v{migration.version} aplicada ({migration.descripcion})")
+    return applied
+
+
+def ensure_schema(
+    engine: Engine, servicio: str, migrations: Sequence[Migration], auto: Optional[bool] = None
+) -> int:
+    """
+    Camino rápido de arranque: si el esquema está al día no se hace nada más que leer la
+    versión. Si va por detrás se migra (SQLite o MIGRATE_ON_STARTUP) o se falla al arrancar.
+    """
+    latest = latest_version(migrations)
+    version = current_version(engine, servicio)
+    if version >= latest:
+        return version
+    if auto is None:
+        auto = settings.MIGRATE_ON_STARTUP or engine.dialect.name == "sqlite"
+    if not auto:
+        raise RuntimeError(
+            f"Esquema de {servicio} en v{version}, se esperaba v{latest}: "
+            f"ejecutar `python -m shared.migrations {servicio}`"
+        )
+    return upgrade(engine, servicio, migrations)
+
+
+def load_migrations(servicio: str) -> List[Migration]:
+    return list(importlib.import_module(f"services.{servicio}.migrations").MIGRATIONS)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from shared.database import engine
+
+    parser = argparse.ArgumentParser(description="Migraciones de esquema por servicio")
+    parser.add_argument("servicios", nargs="*", help=f"por defecto, los presentes de: {', '.join(SERVICES)}")
+    parser.add_argument("--status", action="store_true", help="solo mostrar versión actual y última")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for servicio in args.servicios or SERVICES:
+        try:
+            migrations = load_migrations(servicio)
+        except ModuleNotFoundError as e:
+            # La imagen de cada servicio solo incluye su propio código
+            if args.servicios or e.name not in (f"services.{servicio}", f"services.{servicio}.migrations"):
+                raise
+            continue
+        if args.status:
+            print(f"{servicio}: v{current_version(engine, servicio)} (última v{latest_version(migrations)})")
+        else:
+            version = upgrade(engine, servicio, migrations)
+            print(f"{servicio}: esquema en v{version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List
+
+from shared.exceptions import BadRequestError
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Cursor opaco para paginación por keyset: los valores de orden de la última fila."""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise BadRequestError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise BadRequestError("Cursor inválido")
+    return values
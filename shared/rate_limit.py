@@ -0,0 +1,241 @@
+"""
+Limitación de peticiones por usuario en el borde de cada servicio (token bucket).
+
+Cada regla (`RATE_LIMIT_ROUTES`, "MÉTODO /prefijo" -> "tasa:ráfaga") da a cada usuario un
+cubo de `ráfaga` fichas que se rellena a `tasa` fichas por segundo; la petición sin
+ficha recibe 429 con Retry-After. La tasa se multiplica según el rol del token
+(`RATE_LIMIT_ROLE_MULTIPLIERS`); sin token válido el cubo es el de la IP.
+
+El middleware no llama a jose: comprueba la firma HS* del JWT con hmac y recuerda el
+resultado por token, así que el coste por petición es de pocos microsegundos (ver
+benchmarks/rate_limit_overhead.py). La verificación completa sigue siendo la de
+verify_token en cada endpoint.
+
+Backends: "memory" (por proceso) o "sqlite" (fichero local compartido por los workers
+del host, más lento: una transacción por petición limitada).
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import math
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from shared.config import settings
+from shared.metrics import registry
+
+_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+@dataclass(frozen=True)
+class RateRule:
+    name: str
+    method: str
+    prefix: str
+    rate: float
+    burst: float
+
+
+def parse_rules(routes: Dict[str, str]) -> List[RateRule]:
+    """{"POST /api/v1/availability/search": "20:100"} -> reglas, las más específicas primero."""
+    rules = []
+    for route, limit in routes.items():
+        method, prefix = route.split(" ", 1)
+        rate, _, burst = limit.partition(":")
+        rules.append(RateRule(route, method.upper(), prefix, float(rate), float(burst or rate)))
+    return sorted(rules, key=lambda r: len(r.prefix), reverse=True)
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class TokenIdentity:
+    """(usuario_id, rol) de un JWT firmado con la clave compartida; None si no es válido."""
+
+    def __init__(self, secret: str, algorithm: str, maxsize: int = 10000):
+        self.secret = secret.encode()
+        self.digest = _DIGESTS.get(algorithm)
+        self.maxsize = maxsize
+        self._seen: Dict[str, Tuple[Optional[Tuple[str, str]], float]] = {}
+
+    def __call__(self, token: str) -> Optional[Tuple[str, str]]:
+        now = time.time()
+        cached = self._seen.get(token)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        identity, expires = self._verify(token, now)
+        if len(self._seen) >= self.maxsize:
+            self._seen.clear()
+        self._seen[token] = (identity, expires)
+        return identity
+
+    def _verify(self, token: str, now: float) -> Tuple[Optional[Tuple[str, str]], float]:
+        # Un token inválido se recuerda un minuto: no se vuelve a comprobar en cada petición
+        invalid = (None, now + 60)
+        if self.digest is None:
+            return invalid
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            expected = hmac.new(self.secret, signing_input.encode(), self.digest).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                return invalid
+            payload = json.loads(_b64decode(signing_input.split(".", 1)[1]))
+            exp = float(payload.get("exp", now + 60))
+        except (ValueError, IndexError, AttributeError, TypeError):
+            return invalid
+        usuario_id = payload.get("usuario_id")
+        if usuario_id is None or exp <= now:
+            return invalid
+        return (str(usuario_id), str(payload.get("rol", "cliente"))), exp
+
+
+class MemoryBuckets:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # {clave: [fichas, último relleno]}
+        self._buckets: Dict[str, List[float]] = {}
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        """0 si hay ficha (y la consume); si no, segundos hasta la siguiente."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            bucket = self._buckets[key] = [burst, now]
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+    def _prune(self, now: float) -> None:
+        # Un cubo sin uso durante un minuto está lleno: olvidarlo no cambia nada
+        self._buckets = {k: b for k, b in self._buckets.items() if now - b[1] < 60}
+
+
+class SQLiteBuckets:
+    """Cubos en un fichero SQLite local, compartidos por los workers del mismo host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets (k TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, burst: float) -> float:
+        # Reloj de pared: el fichero se comparte entre procesos
+        now = time.time()
+        conn = self._conn()
+        # BEGIN IMMEDIATE serializa a los workers que leen y actualizan el mismo cubo
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, ts FROM rate_buckets WHERE k = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if tokens >= 1:
+                tokens -= 1
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (k, tokens, ts) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def make_buckets():
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBuckets(settings.RATE_LIMIT_SQLITE_PATH)
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryBuckets()
+    raise ValueError(f"RATE_LIMIT_BACKEND desconocido: {settings.RATE_LIMIT_BACKEND}")
+
+
+rejections = registry.counter("rate_limit_rejections_total", "Peticiones rechazadas con 429 por regla", ("rule",))
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI: 429 con Retry-After cuando el cubo del usuario para la ruta está vacío."""
+
+    def __init__(self, app, rules: List[RateRule], buckets=None, identity: Optional[TokenIdentity] = None,
+                 role_multipliers: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.rules = rules
+        self.buckets = buckets if buckets is not None else make_buckets()
+        self.identity = identity or TokenIdentity(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+        self.role_multipliers = role_multipliers if role_multipliers is not None else settings.RATE_LIMIT_ROLE_MULTIPLIERS
+
+    def _rule(self, method: str, path: str) -> Optional[RateRule]:
+        for rule in self.rules:
+            if rule.method == method and path.startswith(rule.prefix):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        rule = self._rule(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        identity = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth = value.decode("latin-1")
+                if auth[:7].lower() == "bearer ":
+                    identity = self.identity(auth[7:])
+                break
+        if identity is not None:
+            key = f"{rule.name}|u:{identity[0]}"
+            multiplier = self.role_multipliers.get(identity[1], 1.0)
+        else:
+            client = scope.get("client")
+            key = f"{rule.name}|ip:{client[0] if client else '?'}"
+            multiplier = 1.0
+
+        wait = self.buckets.take(key, rule.rate * multiplier, rule.burst * multiplier)
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+        rejections.labels(rule.name).inc()
+        body = b'{"detail":"Demasiadas peticiones"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def setup_rate_limit(app) -> None:
+    """Añade el limitador si RATE_LIMIT_ENABLED y hay reglas configuradas."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    rules = parse_rules(settings.RATE_LIMIT_ROUTES)
+    if rules:
+        app.add_middleware(RateLimitMiddleware, rules=rules)
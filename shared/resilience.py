@@ -0,0 +1,194 @@
+"""
+Piezas de resiliencia para las llamadas entre servicios (usadas por ServiceClient).
+
+- CircuitBreaker: tras CIRCUIT_FAILURE_THRESHOLD fallos seguidos (error de red, timeout
+  o 5xx) se abre y rechaza las llamadas sin esperar durante CIRCUIT_OPEN_SECONDS; después
+  deja pasar una llamada de prueba (half-open) que lo cierra o lo vuelve a abrir.
+- backoff_delay: espera entre reintentos con jitter completo, para que los clientes que
+  fallaron a la vez no reintenten a la vez.
+- Bulkhead: límite de llamadas simultáneas por servicio destino con una cola acotada,
+  para que un destino lento (Payments) no acapare toda la concurrencia del servicio.
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from shared.config import settings
+from shared.exceptions import ServiceUnavailableError
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(ServiceUnavailableError):
+    def __init__(self, target: str, retry_after: float):
+        super().__init__(f"Servicio {target} no disponible temporalmente", retry_after=retry_after)
+        self.target = target
+
+
+class CircuitBreaker:
+    def __init__(self, target: str, failure_threshold: int, open_seconds: float):
+        self.target = target
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Lanza CircuitOpenError si la llamada no debe salir."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(self.target, remaining)
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            # half-open: una sola llamada de prueba a la vez
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.target, self.open_seconds)
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """La llamada terminó sin resultado sobre el destino (p. ej. cancelada)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(target: str) -> CircuitBreaker:
+    """Breaker del servicio destino, compartido por todas las instancias de ServiceClient."""
+    breaker = _breakers.get(target)
+    if breaker is None:
+        breaker = _breakers.setdefault(
+            target, CircuitBreaker(target, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_OPEN_SECONDS)
+        )
+    return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    return {target: b.state for target, b in list(_breakers.items())}
+
+
+def reset_breakers() -> None:
+    _breakers.clear()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Espera antes del reintento `attempt` (0, 1, ...): uniforme en [0, base * 2^attempt]."""
+    return random.uniform(0, min(settings.HTTP_RETRY_BACKOFF_MAX_SECONDS, settings.HTTP_RETRY_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class BulkheadFullError(ServiceUnavailableError):
+    def __init__(self, target: str):
+        super().__init__(f"Demasiadas llamadas en curso a {target}", retry_after=1.0)
+        self.target = target
+
+
+class Bulkhead:
+    """
+    Como mucho `max_concurrent` llamadas a la vez al destino; hasta `max_queue` más
+    esperan turno (como mucho `queue_timeout` segundos) y el resto se rechaza al momento.
+    No usa asyncio.Semaphore para no quedar ligado a un bucle de eventos concreto.
+    """
+
+    def __init__(self, target: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.target = target
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise BulkheadFullError(self.target)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._give_up(waiter):
+                self.rejected += 1
+                raise BulkheadFullError(self.target)
+            # El turno llegó justo al vencer la espera: se aprovecha
+        except BaseException:
+            if not self._give_up(waiter):
+                self.release()
+            raise
+
+    def _give_up(self, waiter: asyncio.Future) -> bool:
+        """Saca de la cola al que deja de esperar; False si ya tenía el turno asignado."""
+        if waiter.done() and not waiter.cancelled():
+            return False
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        return True
+
+    def release(self) -> None:
+        # El hueco pasa directamente al primero de la cola que siga esperando
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+_bulkheads: Dict[str, Bulkhead] = {}
+
+
+def bulkhead_for(target: str) -> Bulkhead:
+    """Bulkhead del servicio destino (BULKHEAD_LIMITS fija límites propios por destino)."""
+    bulkhead = _bulkheads.get(target)
+    if bulkhead is None:
+        limit = settings.BULKHEAD_LIMITS.get(target, settings.BULKHEAD_MAX_CONCURRENT)
+        bulkhead = _bulkheads.setdefault(
+            target, Bulkhead(target, limit, settings.BULKHEAD_MAX_QUEUE, settings.BULKHEAD_QUEUE_TIMEOUT_SECONDS)
+        )
+    return bulkhead
+
+
+def bulkheads() -> Dict[str, Bulkhead]:
+    return dict(_bulkheads)
+
+
+def reset_bulkheads() -> None:
+    _bulkheads.clear()
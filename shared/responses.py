@@ -0,0 +1,155 @@
+"""
+Camino de respuesta: JSON con orjson y compresión negociada.
+
+- ORJSONResponse es la clase de respuesta por defecto de todos los servicios
+  (`FastAPI(default_response_class=ORJSONResponse)`); serializa Decimal como texto, igual
+  que Pydantic en modo JSON, para que el contenido no cambie.
+- json_response() sirve a los handlers que ya tienen el cuerpo como dict JSON-compatible
+  y no necesitan pasar por un modelo (p. ej. la búsqueda de disponibilidad).
+- CompressionMiddleware comprime con brotli (si está instalado) o gzip, según
+  Accept-Encoding, las respuestas de al menos COMPRESSION_MIN_SIZE bytes.
+"""
+from __future__ import annotations
+
+import zlib
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from starlette.datastructures import MutableHeaders
+
+from shared.config import settings
+
+try:  # brotli es opcional: sin él solo se negocia gzip
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+_COMPRESSIBLE = (b"application/json", b"text/", b"application/javascript", b"application/xml")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(_ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200) -> ORJSONResponse:
+    return ORJSONResponse(content, status_code=status_code)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """"br" o "gzip" según Accept-Encoding (se ignoran los de q=0); None si ninguno."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: formato gzip (cabecera y CRC)
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data)
+            return out + self._brotli.finish() if final else out + self._brotli.flush()
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión; las respuestas por partes se comprimen según llegan."""
+
+    def __init__(self, app, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"))
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(scope=start)
+                content_type = headers.get("content-type", "").encode("latin-1")
+                if (
+                    "content-encoding" in headers
+                    or not content_type.startswith(_COMPRESSIBLE)
+                    or (not more_body and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                body = encoder.compress(body, final=not more_body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+            await send({"type": "http.response.body", "body": encoder.compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def setup_compression(app) -> None:
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
@@ -1,31 +1,22 @@
 from __future__ import annotations
 
-import os
 from typing import Any, Dict
 
 from fastapi import Depends, HTTPException, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from pydantic_settings import BaseSettings
 
+from shared.config import settings
+from shared.exceptions import ForbiddenError
 
-class Settings(BaseSettings):
-    JWT_SECRET_KEY: str = "changeme"
-    JWT_ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
-
-settings = Settings()
 security = HTTPBearer()
 
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> Dict[str, Any]:
+    # jose (y su backend criptográfico) se importa en la primera petición, no al arrancar
+    from jose import JWTError, jwt
+
     token = credentials.credentials
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
@@ -37,7 +28,15 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
 
 
+async def require_admin(current_user: Dict[str, Any] = Depends(verify_token)) -> Dict[str, Any]:
+    if current_user.get("rol") != "admin":
+        raise ForbiddenError("Solo administradores")
+    return current_user
+
+
 def create_access_token(payload: Dict[str, Any]) -> str:
+    from jose import jwt
+
     to_encode = payload.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "iat": datetime.utcnow()})
@@ -45,6 +44,8 @@ def create_access_token(payload: Dict[str, Any]) -> str:
 
 
 def create_refresh_token(payload: Dict[str, Any]) -> str:
+    from jose import jwt
+
     to_encode = payload.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "refresh"})
@@ -0,0 +1,254 @@
+"""
+Trazas distribuidas sin servicios externos.
+
+Cada petición HTTP abre un span de servidor (TracingMiddleware) que continúa la traza de
+la cabecera W3C `traceparent` si viene; dentro de él se registran como hijos las
+sentencias SQL (instrument_engine) y las llamadas salientes de ServiceClient, que
+propagan `traceparent` al siguiente servicio.
+
+Los spans terminados se guardan en un buffer en memoria por proceso (`GET /traces`) y,
+con TRACE_EXPORT_PATH, en un fichero JSON lines que pueden compartir todos los servicios
+del host. `python -m shared.tracing <fichero> [trace_id]` muestra la traza como árbol con
+la duración de cada salto.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from shared.config import settings
+
+TRACEPARENT = "traceparent"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    service: str
+    kind: str  # server | client | db | internal
+    start: float = field(default_factory=time.time)
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self, status: Optional[str] = None) -> None:
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        if status is not None:
+            self.status = status
+        tracer.record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["_t0"]
+        return data
+
+
+# Span activo de la petición en curso; el contexto se copia a los hilos del threadpool
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, span padre, sampled) o None si la cabecera falta o no es válida."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or parts[1] == "0" * 32:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+class Tracer:
+    def __init__(self, buffer_size: int, export_path: Optional[str]):
+        self.spans: Deque[Span] = deque(maxlen=buffer_size)
+        self.export_path = export_path
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        self.spans.append(span)
+        if self.export_path:
+            line = json.dumps(span.to_dict(), default=str)
+            with self._lock, open(self.export_path, "a") as f:
+                f.write(line + "\n")
+
+    def find(self, trace_id: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        spans = [s for s in list(self.spans) if trace_id is None or s.trace_id == trace_id]
+        return [s.to_dict() for s in spans[-limit:]]
+
+
+tracer = Tracer(settings.TRACE_BUFFER_SIZE, settings.TRACE_EXPORT_PATH)
+
+
+def start_span(name: str, kind: str = "internal", service: Optional[str] = None, **attributes) -> Optional[Span]:
+    """Hijo del span activo; None si no hay traza en curso (tareas de fondo, tests sin middleware)."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(parent.trace_id, _new_id(8), parent.span_id, name, service or parent.service, kind, attributes=attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """Span hijo que además pasa a ser el activo mientras dura el bloque."""
+    child = start_span(name, kind, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException:
+        child.finish("error")
+        raise
+    else:
+        child.finish()
+    finally:
+        _current.reset(token)
+
+
+class TracingMiddleware:
+    """Middleware ASGI: un span de servidor por petición HTTP."""
+
+    def __init__(self, app, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id, sampled = _new_id(16), None, random.random() < settings.TRACE_SAMPLE_RATE
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        server = Span(trace_id, _new_id(8), parent_id, f"{scope['method']} {scope['path']}", self.service, "server")
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current.set(server)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            endpoint = scope.get("endpoint")
+            if endpoint is not None:
+                server.attributes["endpoint"] = endpoint.__name__
+            server.attributes["status_code"] = status_code
+            server.finish("error" if status_code >= 500 else "ok")
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    child = start_span("db", "db", statement=" ".join(statement[:300].split())[:200])
+    if child is not None:
+        context._trace_span = child
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    child = getattr(context, "_trace_span", None)
+    if child is not None:
+        child.attributes["rows"] = cursor.rowcount
+        child.finish()
+
+
+def _on_error(exception_context):
+    child = getattr(exception_context.execution_context, "_trace_span", None)
+    if child is not None:
+        child.finish("error")
+
+
+def instrument_engine(engine) -> None:
+    """Spans de cada sentencia SQL ejecutada dentro de una petición trazada."""
+    from sqlalchemy import event
+
+    if not event.contains(engine, "before_cursor_execute", _before_execute):
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        event.listen(engine, "after_cursor_execute", _after_execute)
+        event.listen(engine, "handle_error", _on_error)
+
+
+def setup_tracing(app, service: str, engine=None) -> None:
+    """Middleware, spans de BD y `GET /traces` para la app de un servicio."""
+    app.add_middleware(TracingMiddleware, service=service)
+    if engine is not None:
+        instrument_engine(engine)
+
+    @app.get("/traces", include_in_schema=False)
+    def traces(trace_id: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        return tracer.find(trace_id, limit)
+
+
+def render_tree(spans: List[Dict[str, Any]]) -> List[str]:
+    """Líneas de un árbol de spans (hijos ordenados por inicio) con su duración."""
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s["span_id"] for s in spans}
+    for s in sorted(spans, key=lambda s: s["start"]):
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    lines: List[str] = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for s in children.get(parent, []):
+            detail = s["attributes"].get("statement", "")
+            lines.append(f"{'  ' * depth}{s['duration_ms']:>9.1f} ms  [{s['service']}] {s['name']} {detail}".rstrip())
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    if not args:
+        print("Uso: python -m shared.tracing <fichero.jsonl> [trace_id]")
+        raise SystemExit(2)
+    with open(args[0]) as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    trace_id = args[1] if len(args) > 1 else next((s["trace_id"] for s in reversed(spans) if s["parent_id"] is None), None)
+    print(f"traza {trace_id}")
+    print("\n".join(render_tree([s for s in spans if s["trace_id"] == trace_id])))
+
+
+if __name__ == "__main__":
+    main()
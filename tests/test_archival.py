@@ -0,0 +1,80 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from sqlalchemy import func, select
+
+from shared.archival import partition_ddl
+from shared.database import Base, SessionLocal, engine
+from services.availability.models import BloqueoHabitacionDB, NocheHabitacionDB, bloqueos_habitacion_archivo
+from services.availability.repository import archive_old_blocks, confirm_block, create_block, expire_block
+from services.reservations.models import ReservaDB, reservas_archivo
+from services.reservations.repository import archive_old_reservations, create_reservation
+
+SUFIJO = uuid.uuid4().hex[:6]
+CORTE = date(2020, 1, 1)
+VIEJO = date(2019, 6, 1)
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _count(db, table, column, prefix):
+    return db.scalar(select(func.count()).select_from(table).where(column.like(f"{prefix}%")))
+
+
+def test_old_blocks_and_reservations_move_to_archive_in_batches():
+    hab = f"HAB_ARC_{SUFIJO}"
+    db = SessionLocal()
+    try:
+        for i in range(5):
+            b = create_block(db, f"{hab}_{i}", VIEJO, VIEJO + timedelta(days=2), None)
+            if i % 2:
+                expire_block(db, b)
+            else:
+                confirm_block(db, b, f"R{i}")
+        # Activo y antiguo: se queda (aún reclama días); reciente: se queda
+        create_block(db, f"{hab}_activo", VIEJO, VIEJO, None)
+        create_block(db, f"{hab}_reciente", date.today(), date.today(), None)
+        for i, estado in enumerate(["CHECKOUT", "CANCELADA", "CHECKOUT", "CONFIRMADA"]):
+            create_reservation(
+                db,
+                {
+                    "cliente_id": "C_ARC",
+                    "hotel_id": f"HOTEL_ARC_{SUFIJO}",
+                    "habitacion_id": f"{hab}_{i}",
+                    "fecha_inicio": VIEJO,
+                    "fecha_fin": VIEJO + timedelta(days=1),
+                    "estado": estado,
+                    "monto_total": Decimal("50.00"),
+                },
+            )
+
+        assert archive_old_blocks(db, CORTE, batch_size=2) >= 5
+        assert archive_old_reservations(db, CORTE, batch_size=2) >= 3
+
+        bloqueos = BloqueoHabitacionDB.__table__.c
+        assert _count(db, BloqueoHabitacionDB.__table__, bloqueos.habitacion_id, hab) == 2
+        assert _count(db, bloqueos_habitacion_archivo, bloqueos_habitacion_archivo.c.habitacion_id, hab) == 5
+        # Los días de los confirmados archivados se liberan; los del activo siguen reclamados
+        assert {n.habitacion_id for n in db.scalars(select(NocheHabitacionDB).where(NocheHabitacionDB.habitacion_id.like(f"{hab}%")))} == {
+            f"{hab}_activo",
+            f"{hab}_reciente",
+        }
+        hotel = f"HOTEL_ARC_{SUFIJO}"
+        assert [r.estado for r in db.scalars(select(ReservaDB).where(ReservaDB.hotel_id == hotel))] == ["CONFIRMADA"]
+        archivadas = list(db.execute(select(reservas_archivo).where(reservas_archivo.c.hotel_id == hotel)))
+        assert len(archivadas) == 3
+        assert all(isinstance(r.archivado_en, datetime) for r in archivadas)
+    finally:
+        db.close()
+
+
+def test_partition_ddl_uses_yearly_ranges():
+    ddl = partition_ddl("reservas_archivo", "fecha_fin", 2024, 2025)
+    assert "PARTITION BY RANGE (TO_DAYS(fecha_fin))" in ddl
+    assert "PARTITION p2025 VALUES LESS THAN (TO_DAYS('2026-01-01'))" in ddl
+    assert ddl.endswith("PARTITION pmax VALUES LESS THAN MAXVALUE)")
@@ -0,0 +1,68 @@
+import os
+import uuid
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.availability.allocation import ALLOCATION_HORIZON_DAYS, free_gaps, rank_rooms
+from services.availability.main import app as availability_app
+from services.availability.models import HabitacionDB
+
+HOTEL = f"HOTEL_ALLOC_{uuid.uuid4().hex[:6]}"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for numero in ("101", "102", "103"):
+            db.add(
+                HabitacionDB(
+                    habitacion_id=f"{HOTEL}_{numero}",
+                    hotel_id=HOTEL,
+                    numero=numero,
+                    tipo="standard",
+                    piso=1,
+                    capacidad_maxima=2,
+                    precio_base=100.00,
+                    caracteristicas=[],
+                    activa=True,
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "asignacion", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_rank_rooms_prefers_tightest_adjacent_gap():
+    inicio, fin = date(2035, 5, 10), date(2035, 5, 12)
+    assert free_gaps(inicio, fin, None, None) == (ALLOCATION_HORIZON_DAYS, ALLOCATION_HORIZON_DAYS)
+    assert free_gaps(inicio, fin, date(2035, 5, 9), date(2035, 5, 15)) == (0, 2)
+    candidates = {
+        "vacia": (None, None),
+        "pegada": (date(2035, 5, 9), None),          # continúa una estancia existente
+        "hueco_1": (date(2035, 5, 8), date(2035, 5, 14)),  # dejaría una noche suelta a cada lado
+        "encaja": (date(2035, 5, 9), date(2035, 5, 13)),  # rellena exactamente el hueco
+    }
+    assert rank_rooms(candidates, inicio, fin) == ["encaja", "pegada", "hueco_1", "vacia"]
+
+
+def test_allocate_fills_next_to_existing_stay():
+    client = TestClient(availability_app)
+    # Una estancia previa en la 102: la siguiente debe ir a continuación en la misma habitación
+    previa = {"habitacion_id": f"{HOTEL}_102", "fecha_inicio": "2035-06-01", "fecha_fin": "2035-06-03"}
+    r = client.post("/api/v1/availability/block", json=previa, headers=_headers())
+    assert r.status_code == 200, r.text
+
+    payload = {"hotel_id": HOTEL, "tipo_habitacion": "standard", "fecha_inicio": "2035-06-04", "fecha_fin": "2035-06-05"}
+    r = client.post("/api/v1/availability/block/allocate", json=payload, headers=_headers())
+    assert r.status_code == 200, r.text
+    assert r.json()["habitacion_id"] == f"{HOTEL}_102"
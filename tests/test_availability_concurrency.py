@@ -0,0 +1,65 @@
+import os
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from sqlalchemy import select
+
+from shared.database import Base, SessionLocal, engine
+from shared.exceptions import BadRequestError
+from services.availability.models import BloqueoHabitacionDB
+from services.availability.service import block_room
+
+REQUESTS = int(os.environ.get("STRESS_BLOCK_REQUESTS", "2000"))
+WORKERS = 32
+ROOMS = [f"HAB_CC_{uuid.uuid4().hex[:6]}_{i}" for i in range(20)]
+BASE = date(2031, 1, 1)
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _attempt(seed: int) -> str:
+    rnd = random.Random(seed)
+    inicio = BASE + timedelta(days=rnd.randrange(30))
+    fin = inicio + timedelta(days=rnd.randrange(1, 4))
+    db = SessionLocal()
+    try:
+        block_room(db, rnd.choice(ROOMS), inicio, fin, 15)
+        return "ok"
+    except BadRequestError:
+        return "ocupada"
+    finally:
+        db.close()
+
+
+def test_parallel_blocks_never_overlap():
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = list(pool.map(_attempt, range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    print(f"{REQUESTS} bloqueos en {elapsed:.2f}s ({REQUESTS / elapsed:.0f}/s), {results.count('ok')} concedidos")
+
+    db = SessionLocal()
+    try:
+        blocks = list(
+            db.execute(
+                select(BloqueoHabitacionDB.habitacion_id, BloqueoHabitacionDB.fecha_inicio, BloqueoHabitacionDB.fecha_fin).where(
+                    BloqueoHabitacionDB.habitacion_id.in_(ROOMS), BloqueoHabitacionDB.estado == "activo"
+                )
+            )
+        )
+    finally:
+        db.close()
+    assert len(blocks) == results.count("ok") > 0
+    by_room = {}
+    for hab, inicio, fin in blocks:
+        by_room.setdefault(hab, []).append((inicio, fin))
+    for ranges in by_room.values():
+        ranges.sort()
+        for (_, fin_a), (inicio_b, _) in zip(ranges, ranges[1:]):
+            assert fin_a < inicio_b
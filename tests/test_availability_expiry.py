@@ -0,0 +1,48 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from services.availability.expiry import ExpiryScheduler
+from services.availability.repository import create_block, get_block
+from services.availability.service import block_room, cleanup_expired_blocks, expire_due_blocks
+
+INICIO = date(2032, 5, 1)
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def test_scheduler_pops_only_due_entries():
+    scheduler = ExpiryScheduler()
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    scheduler.schedule("b", now + timedelta(seconds=30))
+    scheduler.schedule("a", now - timedelta(seconds=1))
+    scheduler.schedule("c", None)
+    assert scheduler.next_expiry() == now - timedelta(seconds=1)
+    calls = []
+    assert scheduler.run_due(now, lambda t: calls.append(t) or 1) == 1
+    assert scheduler.run_due(now, lambda t: calls.append(t) or 1) == 0
+    assert calls == [now] and len(scheduler) == 1
+
+
+def test_due_blocks_are_released_in_bulk():
+    hab = f"HAB_EXP_{uuid.uuid4().hex[:6]}"
+    db = SessionLocal()
+    try:
+        # Bloqueo que caduca al instante: el heap lo ve vencido en el siguiente tick
+        bloqueo_id = block_room(db, hab, INICIO, INICIO + timedelta(days=2), 0)["bloqueo_id"]
+        assert expire_due_blocks(db) >= 1
+        assert get_block(db, bloqueo_id).estado == "expirado"
+        # Sus días vuelven al inventario
+        assert block_room(db, hab, INICIO, INICIO + timedelta(days=2), 15)["estado"] == "activo"
+
+        pasado = datetime.utcnow() - timedelta(minutes=1)
+        viejos = [create_block(db, f"{hab}_{i}", INICIO, INICIO, pasado) for i in range(5)]
+        assert cleanup_expired_blocks(db) >= 5
+        db.expire_all()
+        assert {get_block(db, b.bloqueo_id).estado for b in viejos} == {"expirado"}
+    finally:
+        db.close()
@@ -0,0 +1,81 @@
+import os
+import uuid
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+from services.availability.models import HabitacionDB
+
+HOTEL = f"HOTEL_GRP_{uuid.uuid4().hex[:6]}"
+INICIO, FIN = date(2033, 6, 1), date(2033, 6, 3)
+# Piso 1 con un hueco en la numeración; piso 2 con cuatro habitaciones seguidas
+NUMEROS = {1: ["101", "102", "104", "105"], 2: ["201", "202", "203", "204"]}
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for piso, numeros in NUMEROS.items():
+            for numero in numeros:
+                db.add(
+                    HabitacionDB(
+                        habitacion_id=f"{HOTEL}_{numero}",
+                        hotel_id=HOTEL,
+                        numero=numero,
+                        tipo="standard",
+                        piso=piso,
+                        capacidad_maxima=2,
+                        precio_base=100.00,
+                        caracteristicas=[],
+                        activa=True,
+                    )
+                )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "grupos", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _group(client, **body):
+    payload = {"hotel_id": HOTEL, "fecha_inicio": str(INICIO), "fecha_fin": str(FIN), **body}
+    return client.post("/api/v1/availability/block/group", json=payload, headers=_headers())
+
+
+def test_group_block_is_all_or_nothing_and_confirmed_atomically():
+    client = TestClient(availability_app)
+
+    r = _group(client, cantidad=3, contiguas=True)
+    assert r.status_code == 200, r.text
+    grupo = r.json()
+    assert grupo["habitaciones"] == [f"{HOTEL}_201", f"{HOTEL}_202", f"{HOTEL}_203"]
+    assert len(grupo["bloqueos"]) == 3
+
+    # Una habitación ocupada hace fallar todo el grupo sin dejar bloqueos huérfanos
+    r = _group(client, habitacion_ids=[f"{HOTEL}_101", f"{HOTEL}_203"])
+    assert r.status_code == 400
+    assert f"{HOTEL}_203" in r.json()["detail"]
+    r = _group(client, habitacion_ids=[f"{HOTEL}_101", f"{HOTEL}_102"])
+    assert r.status_code == 200, r.text
+    pareja = r.json()
+
+    assert _group(client, cantidad=4).status_code == 400
+    assert _group(client, cantidad=1, habitacion_ids=[f"{HOTEL}_104"]).status_code == 422
+
+    confirm = client.post(f"/api/v1/availability/block/group/{grupo['grupo_id']}/confirm", json={"reserva_id": "R_GRP"}, headers=_headers())
+    assert confirm.status_code == 200
+    assert confirm.json()["estado"] == "confirmado"
+
+    assert client.delete(f"/api/v1/availability/block/group/{pareja['grupo_id']}", headers=_headers()).status_code == 200
+    r = _group(client, cantidad=3, piso=1)
+    assert r.status_code == 200
+    assert r.json()["habitaciones"] == [f"{HOTEL}_101", f"{HOTEL}_102", f"{HOTEL}_104"]
+    assert client.post(f"/api/v1/availability/block/group/{pareja['grupo_id']}/confirm", json={"reserva_id": "X"}, headers=_headers()).status_code == 400
@@ -0,0 +1,103 @@
+import os
+import uuid
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+from services.availability.models import HabitacionDB, InventarioTipoDB
+from services.availability.repository import expire_blocks_before, rebuild_inventory
+
+HOTEL = f"HOTEL_INV_{uuid.uuid4().hex[:6]}"
+INICIO, FIN = date(2034, 3, 1), date(2034, 3, 3)
+TIPOS = {"101": "standard", "102": "standard", "103": "standard", "201": "suite"}
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for numero, tipo in TIPOS.items():
+            db.add(
+                HabitacionDB(
+                    habitacion_id=f"{HOTEL}_{numero}",
+                    hotel_id=HOTEL,
+                    numero=numero,
+                    tipo=tipo,
+                    piso=int(numero[0]),
+                    capacidad_maxima=2,
+                    precio_base=100.00,
+                    caracteristicas=[],
+                    activa=True,
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "inventario", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _inventory(client, tipo="standard"):
+    params = {"hotel_id": HOTEL, "tipo": tipo, "fecha_inicio": str(INICIO), "fecha_fin": str(FIN)}
+    r = client.get("/api/v1/availability/inventory", params=params, headers=_headers())
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _allocate(client, tipo="standard"):
+    payload = {"hotel_id": HOTEL, "tipo_habitacion": tipo, "fecha_inicio": str(INICIO), "fecha_fin": str(FIN)}
+    return client.post("/api/v1/availability/block/allocate", json=payload, headers=_headers())
+
+
+def test_counters_follow_block_lifecycle_and_allocator_assigns_rooms():
+    client = TestClient(availability_app)
+    inv = _inventory(client)
+    assert inv["disponibles"] == 3
+    assert [n["total"] for n in inv["noches"]] == [3, 3, 3]
+
+    bloqueos = [_allocate(client).json() for _ in range(3)]
+    assert len({b["habitacion_id"] for b in bloqueos}) == 3
+    agotado = _allocate(client)
+    assert agotado.status_code == 400
+    assert _inventory(client)["disponibles"] == 0
+    assert _inventory(client, "suite")["disponibles"] == 1
+
+    r = client.post("/api/v1/availability/confirm", json={"bloqueo_id": bloqueos[0]["bloqueo_id"], "reserva_id": "R1"}, headers=_headers())
+    assert r.status_code == 200, r.text
+    client.delete(f"/api/v1/availability/block/{bloqueos[1]['bloqueo_id']}", headers=_headers())
+    noche = _inventory(client)["noches"][0]
+    assert (noche["vendidas"], noche["retenidas"], noche["disponibles"]) == (1, 1, 1)
+
+    db = SessionLocal()
+    try:
+        # Expirar el bloqueo restante devuelve su noche a disponibles
+        expire_blocks_before(db, datetime(2100, 1, 1))
+        assert rebuild_inventory(db, INICIO) == 0
+    finally:
+        db.close()
+    inv = _inventory(client)
+    assert inv["disponibles"] == 2
+    assert all((n["vendidas"], n["retenidas"]) == (1, 0) for n in inv["noches"])
+
+
+def test_reconcile_fixes_drifted_counters():
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(InventarioTipoDB)
+            .where(InventarioTipoDB.hotel_id == HOTEL, InventarioTipoDB.fecha == INICIO, InventarioTipoDB.tipo == "standard")
+            .values(retenidas=InventarioTipoDB.retenidas + 5)
+        )
+        db.commit()
+        assert rebuild_inventory(db, INICIO) == 1
+        assert rebuild_inventory(db, INICIO) == 0
+    finally:
+        db.close()
@@ -0,0 +1,108 @@
+import os
+import time
+import uuid
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+from services.availability.models import HabitacionDB
+from services.availability.search_cache import SearchCache, search_cache
+
+HOTEL = f"HOTEL_SC_{uuid.uuid4().hex[:6]}"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for numero in ("101", "102"):
+            db.add(
+                HabitacionDB(
+                    habitacion_id=f"{HOTEL}_{numero}",
+                    hotel_id=HOTEL,
+                    numero=numero,
+                    tipo="standard",
+                    piso=1,
+                    capacidad_maxima=2,
+                    precio_base=100.00,
+                    caracteristicas=[],
+                    activa=True,
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "busquedas", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _search(client, inicio, fin):
+    payload = {"hotel_id": HOTEL, "fecha_inicio": inicio, "fecha_fin": fin, "numero_huespedes": 2}
+    r = client.post("/api/v1/availability/search", json=payload, headers=_headers())
+    assert r.status_code == 200, r.text
+    return {h["habitacion_id"] for h in r.json()["habitaciones"]}
+
+
+def test_block_events_invalidate_only_overlapping_searches():
+    client = TestClient(availability_app)
+    assert _search(client, "2036-01-10", "2036-01-12") == {f"{HOTEL}_101", f"{HOTEL}_102"}
+    assert _search(client, "2036-02-10", "2036-02-12") == {f"{HOTEL}_101", f"{HOTEL}_102"}
+    before = search_cache.stats()
+
+    block = {"habitacion_id": f"{HOTEL}_101", "fecha_inicio": "2036-01-11", "fecha_fin": "2036-01-11"}
+    r = client.post("/api/v1/availability/block", json=block, headers=_headers())
+    assert r.status_code == 200, r.text
+    assert search_cache.stats()["invalidations"] == before["invalidations"] + 1
+
+    # La consulta solapada se recalcula; la de febrero sigue en cache
+    assert _search(client, "2036-01-10", "2036-01-12") == {f"{HOTEL}_102"}
+    assert _search(client, "2036-02-10", "2036-02-12") == {f"{HOTEL}_101", f"{HOTEL}_102"}
+    after = search_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+
+    client.delete(f"/api/v1/availability/block/{r.json()['bloqueo_id']}", headers=_headers())
+    assert _search(client, "2036-01-10", "2036-01-12") == {f"{HOTEL}_101", f"{HOTEL}_102"}
+
+    metrics = client.get("/metrics").text
+    assert 'cache_hits_total{cache="availability.search"}' in metrics
+
+
+def test_hot_keys_are_served_stale_while_revalidating():
+    loads = []
+
+    def loader(db):
+        loads.append(1)
+        return len(loads)
+
+    cache = SearchCache("test.search", ttl=0.05, stale_ttl=60, hot_hits=1, maxsize=10, session_factory=SessionLocal)
+    args = (None, "H", date(2036, 3, 1), date(2036, 3, 2), "k")
+    assert cache.get_or_load(*args, loader) == 1
+    assert cache.get_or_load(*args, loader) == 1  # acierto: ya es caliente
+    time.sleep(0.06)
+    assert cache.get_or_load(*args, loader) == 1  # caducada: se sirve y se recalcula aparte
+    deadline = time.monotonic() + 2
+    while cache.stats()["refreshes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get_or_load(*args, loader) == 2
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = SearchCache("test.race", ttl=60, stale_ttl=0, hot_hits=1, maxsize=10)
+    inicio, fin = date(2036, 4, 1), date(2036, 4, 3)
+
+    def loader(db):
+        # Un bloqueo se confirma mientras se calculaba el resultado
+        cache.invalidate("H", inicio, fin)
+        return "viejo"
+
+    assert cache.get_or_load(None, "H", inicio, fin, "k", loader) == "viejo"
+    assert cache.get_or_load(None, "H", inicio, fin, "k", lambda db: "nuevo") == "nuevo"
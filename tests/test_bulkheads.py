@@ -0,0 +1,106 @@
+import asyncio
+import os
+import re
+import time
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from shared.config import settings
+from shared.http_client import ServiceClient
+from shared.resilience import Bulkhead, BulkheadFullError, reset_breakers, reset_bulkheads
+from services.reservations.admission import AdmissionController, AdmissionRule
+
+
+def test_bulkhead_queues_then_rejects():
+    async def scenario():
+        bulkhead = Bulkhead("prueba", max_concurrent=1, max_queue=1, queue_timeout=0.5)
+        await bulkhead.acquire()
+        waiting = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+        assert bulkhead.queued == 1
+        with pytest.raises(BulkheadFullError):
+            await bulkhead.acquire()
+        bulkhead.release()
+        await waiting  # el hueco pasa al que esperaba
+        assert bulkhead.active == 1 and bulkhead.queued == 0
+
+        # Quien agota su espera en la cola también se rechaza
+        bulkhead.queue_timeout = 0.01
+        with pytest.raises(BulkheadFullError):
+            await bulkhead.acquire()
+        assert bulkhead.queued == 0
+        bulkhead.release()
+        assert bulkhead.active == 0
+        assert bulkhead.rejected == 2
+
+    asyncio.run(scenario())
+
+
+def test_slow_dependency_only_exhausts_its_own_bulkhead(monkeypatch):
+    monkeypatch.setattr(settings, "BULKHEAD_LIMITS", {"payments": 1})
+    monkeypatch.setattr(settings, "BULKHEAD_MAX_QUEUE", 0)
+    reset_bulkheads()
+    reset_breakers()
+    app = FastAPI()
+
+    @app.post("/api/v1/payments/process")
+    async def pay():
+        await asyncio.sleep(0.2)
+        return {"estado": "aprobado"}
+
+    @app.post("/api/v1/pricing/calculate")
+    async def price():
+        return {"total": "10.00"}
+
+    async def scenario():
+        sc = ServiceClient()
+        sc._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+        try:
+            slow = asyncio.ensure_future(sc.process_payment({}, "token"))
+            await asyncio.sleep(0.05)
+            with pytest.raises(BulkheadFullError):
+                await sc.process_payment({}, "token")
+            assert (await sc.calculate_price({}, "token"))["total"] == "10.00"
+            assert (await slow)["estado"] == "aprobado"
+        finally:
+            await sc._client.aclose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        reset_bulkheads()
+
+
+def test_admission_sheds_expensive_requests_and_keeps_reads_fast():
+    app = FastAPI()
+
+    @app.post("/api/v1/reservations")
+    async def create():
+        await asyncio.sleep(0.3)
+        return {"estado": "CONFIRMADA"}
+
+    @app.get("/api/v1/reservations/{reserva_id}")
+    async def read(reserva_id: str):
+        return {"reserva_id": reserva_id}
+
+    limiter = Bulkhead("reservations.saga", max_concurrent=1, max_queue=1, queue_timeout=1.0)
+    app.add_middleware(AdmissionController, rules=[AdmissionRule("crear", "POST", re.compile(r"/api/v1/reservations"), limiter)])
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://reservations") as client:
+            creates = [asyncio.ensure_future(client.post("/api/v1/reservations")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            started = time.perf_counter()
+            read = await client.get("/api/v1/reservations/R1")
+            read_ms = (time.perf_counter() - started) * 1000
+            return [await c for c in creates], read, read_ms
+
+    responses, read, read_ms = asyncio.run(scenario())
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 200, 503]
+    shed = next(r for r in responses if r.status_code == 503)
+    assert int(shed.headers["retry-after"]) >= 1
+    assert read.status_code == 200 and read_ms < 100
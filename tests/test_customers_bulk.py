@@ -0,0 +1,79 @@
+import json
+import os
+import uuid
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, engine
+from shared.security import create_access_token
+from services.customers.main import app as customers_app
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "bulk", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_import_csv_reports_row_errors_and_export_streams_rows():
+    client = TestClient(customers_app)
+    run = uuid.uuid4().hex[:8]
+    csv_body = (
+        "nombre_completo,email,telefono,ciudad\n"
+        f'Bulk Uno,bulk1.{run}@example.com,+573000000001,"Bogotá, DC"\n'
+        "Bulk Dos,no-es-email,+573000000002,Cali\n"
+        f"Bulk Tres,bulk3.{run}@example.com,+573000000003,\n"
+        f"Bulk Repetido,bulk1.{run}@example.com,+573000000004,Cali\n"
+    )
+    r = client.post("/api/v1/customers/import?formato=csv", content=csv_body.encode(), headers=_headers())
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["procesados"] == 4
+    assert data["importados"] == 2
+    assert [e["linea"] for e in data["errores"]] == [3, 5]
+
+    ndjson_body = "\n".join(
+        json.dumps({"nombre_completo": f"Bulk N{i}", "email": f"bulkn{i}.{run}@example.com", "telefono": f"+57300000010{i}"})
+        for i in range(3)
+    ) + "\n{roto\n"
+    r = client.post("/api/v1/customers/import?formato=ndjson", content=ndjson_body.encode(), headers=_headers())
+    assert r.json()["importados"] == 3
+    assert r.json()["total_errores"] == 1
+
+    exp = client.get("/api/v1/customers/export?formato=ndjson", headers=_headers())
+    assert exp.status_code == 200
+    emails = {json.loads(line)["email"] for line in exp.text.splitlines()}
+    assert {f"bulk1.{run}@example.com", f"bulk3.{run}@example.com", f"bulkn2.{run}@example.com"} <= emails
+
+    exp_csv = client.get("/api/v1/customers/export", headers=_headers())
+    assert exp_csv.text.splitlines()[0].startswith("cliente_id,")
+    assert '"Bogotá, DC"' in exp_csv.text
+
+
+def test_import_csv_keeps_bare_quotes_and_multiline_fields():
+    client = TestClient(customers_app)
+    run = uuid.uuid4().hex[:8]
+    csv_body = (
+        "nombre_completo,email,telefono,direccion\n"
+        f'Juan O"Brien,juan.{run}@example.com,+573000000011,Calle 1\n'
+        f'Ana Multi,ana.{run}@example.com,+573000000012,"Calle 2\nApto ""B"""\n'
+        f"Luis Normal,luis.{run}@example.com,+573000000013,Calle 3\n"
+    )
+    r = client.post("/api/v1/customers/import?formato=csv", content=csv_body.encode(), headers=_headers())
+    assert r.status_code == 200, r.text
+    assert r.json() == {"procesados": 3, "importados": 3, "total_errores": 0, "errores": []}
+
+    exp = client.get("/api/v1/customers/export?formato=ndjson", headers=_headers())
+    rows = {d["email"]: d for d in map(json.loads, exp.text.splitlines())}
+    assert rows[f"juan.{run}@example.com"]["nombre_completo"] == 'Juan O"Brien'
+    assert rows[f"ana.{run}@example.com"]["direccion"] == 'Calle 2\nApto "B"'
+
+
+def test_import_rejects_unknown_format():
+    client = TestClient(customers_app)
+    r = client.post("/api/v1/customers/import?formato=xml", content=b"<x/>", headers=_headers())
+    assert r.status_code == 400
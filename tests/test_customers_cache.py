@@ -0,0 +1,80 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.cache import LRUCacheBackend, ReadThroughCache, SQLiteCacheBackend
+from shared.database import Base, engine
+from shared.security import create_access_token
+from services.customers.main import app as customers_app
+from services.customers.service import customer_cache
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def test_lru_backend_evicts_and_expires():
+    cache = ReadThroughCache("test.lru", LRUCacheBackend(maxsize=2), ttl=0.05)
+    assert cache.get_or_load("a", lambda: 1) == 1
+    assert cache.get_or_load("b", lambda: 2) == 2
+    assert cache.get_or_load("a", lambda: -1) == 1
+    cache.get_or_load("c", lambda: 3)  # expulsa "b", el menos usado
+    assert cache.get_or_load("b", lambda: 20) == 20
+    time.sleep(0.06)
+    assert cache.get_or_load("a", lambda: 10) == 10
+    assert cache.stats()["hits"] == 1
+
+
+def test_async_misses_share_a_single_load():
+    cache = ReadThroughCache("t", LRUCacheBackend(maxsize=10), ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    async def run():
+        return await asyncio.gather(*(cache.aget_or_load("k", load) for _ in range(20)))
+
+    assert asyncio.run(run()) == [{"id": 1}] * 20
+    assert calls == 1
+
+
+def test_sqlite_backend_stores_json(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), namespace="t")
+    backend.set("k", {"nombre": "Ana", "creado_en": datetime(2030, 1, 1)}, ttl=60)
+    assert backend.get("k") == {"nombre": "Ana", "creado_en": "2030-01-01 00:00:00"}
+    backend.delete("k")
+    assert len(backend) == 0
+
+
+def test_customer_lookup_is_cached_and_invalidated_on_update():
+    client = TestClient(customers_app)
+    token = create_access_token({"usuario_id": "U1", "username": "cache", "rol": "staff"})
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {"nombre_completo": "Ana Cache", "email": f"ana.cache.{uuid.uuid4().hex[:8]}@example.com", "telefono": "+573001234567"}
+
+    created = client.post("/api/v1/customers", json=payload, headers=headers)
+    assert created.status_code == 201, created.text
+    cliente_id = created.json()["cliente_id"]
+
+    before = customer_cache.stats()["hits"]
+    assert client.get(f"/api/v1/customers/{cliente_id}", headers=headers).status_code == 200
+    r = client.get(f"/api/v1/customers/{cliente_id}", headers=headers)
+    assert r.json()["nombre_completo"] == "Ana Cache"
+    assert customer_cache.stats()["hits"] == before + 1
+
+    upd = client.put(f"/api/v1/customers/{cliente_id}", json={**payload, "nombre_completo": "Ana Actualizada"}, headers=headers)
+    assert upd.status_code == 200
+    r = client.get(f"/api/v1/customers/{cliente_id}", headers=headers)
+    assert r.json()["nombre_completo"] == "Ana Actualizada"
+
+    stats = client.get("/cache/stats").json()
+    assert stats["customers"]["invalidations"] >= 1
@@ -0,0 +1,97 @@
+import os
+import threading
+import uuid
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, engine
+from shared.security import create_access_token
+from services.customers.main import app as customers_app
+from services.customers.search import CustomerSearchIndex, search_index, start_index_build
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def test_index_ranks_exact_matches_first_and_requires_all_terms():
+    index = CustomerSearchIndex()
+    index.build([
+        (1, None, "maria@example.com", "+573001112233", "María Gómez"),
+        (2, None, "mar@example.com", "+573004445566", "Mar Pérez"),
+        (3, "CC998877", "jose@example.com", "+573007778899", "José Gómez"),
+    ])
+    total, ranked = index.search("mar", limit=10)
+    assert total == 2
+    assert ranked[0][0] == 2  # "mar" exacto puntúa más que el prefijo de "maria"
+    assert index.search("gomez maria", limit=10)[1][0][0] == 1
+    assert index.search("+57 300 777", limit=10)[1][0][0] == 3
+    assert index.search("cc998", limit=10)[1][0][0] == 3
+
+    index.add([(2, None, "mar@example.com", "+573004445566", "Marta Ruiz")])
+    assert index.search("perez", limit=10) == (0, [])
+    index.remove(1)
+    assert [d for d, _ in index.search("mar", limit=10)[1]] == [2]
+
+
+def test_writes_during_build_are_not_lost():
+    index = CustomerSearchIndex()
+    reading = threading.Event()
+    resume = threading.Event()
+
+    def rows():
+        yield (1, None, "ana@example.com", None, "Ana Vieja")
+        reading.set()
+        resume.wait(5)
+
+    builder = threading.Thread(target=index.build, args=(rows(),))
+    builder.start()
+    reading.wait(5)
+    index.add([(1, None, "ana@example.com", None, "Ana Nueva"), (2, None, "beto@example.com", None, "Beto")])
+    resume.set()
+    builder.join(5)
+
+    assert index.built
+    assert [d for d, _ in index.search("nueva", limit=10)[1]] == [1]
+    assert index.search("vieja", limit=10) == (0, [])
+    assert index.search("beto", limit=10)[0] == 1
+
+
+def test_search_endpoint_is_paginated_and_tracks_new_customers():
+    client = TestClient(customers_app)
+    token = create_access_token({"usuario_id": "U1", "username": "search", "rol": "staff"})
+    headers = {"Authorization": f"Bearer {token}"}
+    run = uuid.uuid4().hex[:8]
+    for i in range(3):
+        r = client.post(
+            "/api/v1/customers",
+            json={"nombre_completo": f"Zoilo{run} Búsqueda {i}", "email": f"zoilo{i}.{run}@example.com", "telefono": f"+57311000000{i}"},
+            headers=headers,
+        )
+        assert r.status_code == 201
+
+    # Mientras el índice no está construido se responde con LIKE (sin ranking)
+    if not search_index.built:
+        r = client.get("/api/v1/customers/search", params={"q": f"zoilo{run}"}, headers=headers)
+        assert r.status_code == 200, r.text
+        assert r.json()["total"] == 3
+    start_index_build().join(10)
+    assert search_index.built
+
+    r = client.get("/api/v1/customers/search", params={"q": f"zoilo{run} busq", "tamano": 2}, headers=headers)
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["total"] == 3
+    assert len(data["resultados"]) == 2
+    page2 = client.get("/api/v1/customers/search", params={"q": f"zoilo{run}", "pagina": 2, "tamano": 2}, headers=headers).json()
+    assert len(page2["resultados"]) == 1
+
+    # Alta posterior a la construcción del índice
+    client.post(
+        "/api/v1/customers",
+        json={"nombre_completo": f"Zoilo{run} Nuevo", "email": f"zoilo.nuevo.{run}@example.com", "telefono": "+573110000099"},
+        headers=headers,
+    )
+    r = client.get("/api/v1/customers/search", params={"q": f"zoilo{run} nuevo"}, headers=headers)
+    assert [c["email"] for c in r.json()["resultados"]][0] == f"zoilo.nuevo.{run}@example.com"
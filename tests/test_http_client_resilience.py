@@ -0,0 +1,105 @@
+import asyncio
+import os
+import time
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from shared.config import settings
+from shared.http_client import ServiceClient
+from shared.metrics import registry
+from shared.resilience import CircuitOpenError, breaker_for, reset_breakers
+
+
+@pytest.fixture(autouse=True)
+def fast_policies(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_RETRY_BACKOFF_BASE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 3)
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def _flaky_app(failures: int, delays=()):
+    """Responde 503 las `failures` primeras veces; la llamada i espera delays[i] segundos."""
+    app = FastAPI()
+    app.state.calls = 0
+
+    async def handler():
+        call = app.state.calls
+        app.state.calls += 1
+        if call < len(delays):
+            await asyncio.sleep(delays[call])
+        if call < failures:
+            return JSONResponse({"detail": "caído"}, status_code=503)
+        return {"total": "100.00", "habitaciones": [], "llamada": call}
+
+    for path in ("/api/v1/pricing/calculate", "/api/v1/payments/process", "/api/v1/availability/search"):
+        app.post(path)(handler)
+    return app
+
+
+def _run(app, call):
+    async def go():
+        sc = ServiceClient()
+        sc._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+        try:
+            return await call(sc)
+        finally:
+            await sc._client.aclose()
+
+    return asyncio.run(go())
+
+
+def _metric(prefix: str) -> float:
+    return sum(float(l.rsplit(" ", 1)[1]) for l in registry.render().splitlines() if l.startswith(prefix))
+
+
+def test_idempotent_calls_are_retried_with_backoff():
+    app = _flaky_app(failures=2)
+    before = _metric('http_client_retries_total{target="pricing"}')
+    result = _run(app, lambda sc: sc.calculate_price({}, "token"))
+    assert result["llamada"] == 2
+    assert _metric('http_client_retries_total{target="pricing"}') == before + 2
+    assert breaker_for("pricing").state == "closed"
+
+
+def test_payments_are_not_retried():
+    app = _flaky_app(failures=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(app, lambda sc: sc.process_payment({}, "token"))
+    assert app.state.calls == 1
+
+
+def test_circuit_opens_and_fails_fast():
+    app = _flaky_app(failures=100)
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(app, lambda sc: sc.calculate_price({}, "token"))
+    assert app.state.calls == 3
+    assert breaker_for("pricing").state == "open"
+
+    with pytest.raises(CircuitOpenError) as exc:
+        _run(app, lambda sc: sc.calculate_price({}, "token"))
+    assert app.state.calls == 3
+    assert exc.value.status_code == 503 and int(exc.value.headers["Retry-After"]) >= 1
+    assert 'http_client_circuit_state{target="pricing"} 2' in registry.render()
+
+    # Pasado el tiempo de apertura, una llamada de prueba que sale bien lo cierra
+    breaker_for("pricing").opened_at -= settings.CIRCUIT_OPEN_SECONDS
+    app.state.calls = 100
+    assert _run(app, lambda sc: sc.calculate_price({}, "token"))["llamada"] == 100
+    assert breaker_for("pricing").state == "closed"
+
+
+def test_slow_reads_are_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_HEDGE_ENABLED", True)
+    app = _flaky_app(failures=0, delays=(1.0,))
+    before = _metric('http_client_hedges_total{target="availability",winner="hedge"}')
+    started = time.perf_counter()
+    result = _run(app, lambda sc: sc.check_availability({}, "token"))
+    assert time.perf_counter() - started < 0.8
+    assert result["llamada"] == 1
+    assert _metric('http_client_hedges_total{target="availability",winner="hedge"}') == before + 1
@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Dependencias que solo se cargan en la primera petición que las usa
+DEFERRED = ("jose", "passlib", "bcrypt", "httpx")
+SERVICES = ("auth", "customers", "availability", "pricing", "payments", "reservations", "notifications")
+
+_PROBE = """
+import json, sys
+import services.{servicio}.main
+from pydantic_settings import BaseSettings
+print(json.dumps({{
+    "deferred": [m for m in {deferred!r} if m in sys.modules],
+    "settings_classes": [c.__module__ for c in BaseSettings.__subclasses__()],
+}}))
+"""
+
+
+@pytest.mark.parametrize("servicio", SERVICES)
+def test_entry_point_defers_heavy_imports_and_loads_settings_once(servicio):
+    env = {**os.environ, "USE_SQLITE_FOR_TESTS": "1"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(servicio=servicio, deferred=DEFERRED)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    probe = json.loads(out.strip().splitlines()[-1])
+    assert probe["deferred"] == []
+    # Una sola clase Settings (notifications no necesita configuración)
+    assert probe["settings_classes"] in ([], ["shared.config"])
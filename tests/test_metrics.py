@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import httpx
+from fastapi.testclient import TestClient
+
+from shared.database import Base, engine
+from shared.http_client import ServiceClient
+from shared.metrics import Registry, registry
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _token():
+    return create_access_token({"usuario_id": "U1", "username": "metricas", "rol": "staff"})
+
+
+def _sample(text: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+
+def test_counters_and_histograms_sum_per_thread_shards():
+    reg = Registry()
+    counter = reg.counter("pruebas_total", "Pruebas", ("tipo",)).labels("a")
+    histogram = reg.histogram("prueba_seconds", "Prueba", (), buckets=(0.1, 1.0)).labels()
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    text = reg.render()
+    assert 'pruebas_total{tipo="a"} 4000' in text
+    assert 'prueba_seconds_bucket{le="0.1"} 0' in text
+    assert 'prueba_seconds_bucket{le="1.0"} 4000' in text
+    assert 'prueba_seconds_bucket{le="+Inf"} 4000' in text
+    assert "prueba_seconds_count 4000" in text
+
+
+def test_requests_are_labelled_by_route_template_with_db_and_pool_metrics():
+    client = TestClient(availability_app)
+    for i in range(3):
+        r = client.get("/api/v1/availability/rooms", params={"hotel_id": f"HOTEL_METRICAS_{i}"}, headers={"Authorization": f"Bearer {_token()}"})
+        assert r.status_code == 200
+    client.get("/no-existe")
+
+    text = client.get("/metrics").text
+    route = 'service="availability",method="GET",route="/api/v1/availability/rooms"'
+    assert _sample(text, f'http_requests_total{{{route},status="200"}}') >= 3
+    assert _sample(text, f'http_request_duration_seconds_count{{{route}}}') >= 3
+    assert 'route="<sin ruta>"' in text
+    assert "HOTEL_METRICAS" not in text
+    assert _sample(text, 'db_query_duration_seconds_count{operation="SELECT"}') >= 3
+    assert 'db_pool_connections{state="checked_out"}' in text
+    assert "eventbus_events" in text
+    assert 'cache_hit_rate{cache="availability.search"}' in text
+
+
+def test_service_client_records_outgoing_calls():
+    async def call():
+        sc = ServiceClient()
+        sc._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=availability_app))
+        try:
+            payload = {"hotel_id": "HOTEL_METRICAS", "fecha_inicio": "2037-01-01", "fecha_fin": "2037-01-02", "numero_huespedes": 1}
+            await sc.check_availability(payload, _token())
+        finally:
+            await sc._client.aclose()
+
+    before = _sample(registry.render(), 'http_client_requests_total{target="availability",status="200"}')
+    asyncio.run(call())
+    text = registry.render()
+    assert _sample(text, 'http_client_requests_total{target="availability",status="200"}') == before + 1
+    assert 'http_client_requests_in_flight{target="availability"} 0' in text
+    assert 'http_client_connections{state="active"}' in text
@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import pytest
+from sqlalchemy import Column, MetaData, Table, create_engine, event, inspect, text
+
+from shared.migrations import SERVICES, ensure_schema, latest_version, load_migrations, upgrade
+from services.reservations.migrations import MIGRATIONS as RESERVATIONS_MIGRATIONS
+from services.reservations.models import ReservaDB
+
+
+@pytest.fixture
+def fresh_engine():
+    # BD propia: las migraciones parten de un esquema vacío (o legado), no de test.db
+    tmp = tempfile.TemporaryDirectory()
+    eng = create_engine(f"sqlite+pysqlite:///{tmp.name}/migrations.db")
+    yield eng
+    eng.dispose()
+    tmp.cleanup()
+
+
+def _indexes(eng, table):
+    return {ix["name"]: ix["column_names"] for ix in inspect(eng).get_indexes(table)}
+
+
+def test_upgrade_once_then_startup_only_reads_version(fresh_engine):
+    for servicio in SERVICES:
+        migrations = load_migrations(servicio)
+        assert ensure_schema(fresh_engine, servicio, migrations) == latest_version(migrations)
+    tables = set(inspect(fresh_engine).get_table_names())
+    assert {"usuarios", "clientes", "habitaciones", "noches_habitacion", "reservas_archivo", "transacciones"} <= tables
+
+    statements = []
+    event.listen(fresh_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    for servicio in SERVICES:
+        ensure_schema(fresh_engine, servicio, load_migrations(servicio))
+    # Camino rápido: una consulta de versión por servicio, sin reflexión ni DDL
+    assert len(statements) == len(SERVICES)
+    assert all("schema_migrations" in s and s.lstrip().upper().startswith("SELECT") for s in statements)
+
+
+def test_legacy_schema_is_brought_up_to_date(fresh_engine):
+    # Esquema como lo dejaba el antiguo create_all: índices simples por columna
+    legacy = Table("reservas", MetaData(), *[Column(c.name, c.type, primary_key=c.primary_key) for c in ReservaDB.__table__.columns])
+    with fresh_engine.begin() as conn:
+        legacy.create(conn)
+        conn.execute(text("CREATE INDEX ix_reservas_cliente_id ON reservas (cliente_id)"))
+        conn.execute(text("CREATE INDEX ix_reservas_hotel_id ON reservas (hotel_id)"))
+
+    assert upgrade(fresh_engine, "reservations", RESERVATIONS_MIGRATIONS) == latest_version(RESERVATIONS_MIGRATIONS)
+    indexes = _indexes(fresh_engine, "reservas")
+    assert indexes["ix_reservas_cliente_id"] == ["cliente_id", "id"]
+    assert indexes["ix_reservas_hotel_inicio"] == ["hotel_id", "fecha_inicio"]
+    assert "ix_reservas_hotel_id" not in indexes
+    assert "reservas_archivo" in inspect(fresh_engine).get_table_names()
+
+
+def test_outdated_schema_fails_fast_without_auto_migrate(fresh_engine):
+    with pytest.raises(RuntimeError, match="python -m shared.migrations reservations"):
+        ensure_schema(fresh_engine, "reservations", RESERVATIONS_MIGRATIONS, auto=False)
+    assert "reservas" not in inspect(fresh_engine).get_table_names()
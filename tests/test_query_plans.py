@@ -0,0 +1,113 @@
+import os
+import re
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.availability import repository as availability_repo
+from services.payments.main import app as payments_app
+from services.reservations import repository as reservations_repo
+from services.reservations.manifest import EXCLUDED_STATES
+
+# Tablas calientes: cualquier recorrido completo sobre ellas es una regresión
+HOT_TABLES = {"habitaciones", "bloqueos_habitacion", "noches_habitacion", "inventario_tipo", "reservas", "transacciones"}
+INICIO, FIN = date(2030, 1, 1), date(2030, 1, 5)
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def plan_problems(statement, parameters, sorted_by_index):
+    """
+    Tablas calientes que el plan recorre enteras (SQLite: SCAN sin índice; MySQL: type=ALL)
+    y, en los listados paginados, ordenaciones en memoria en lugar de seguir el índice.
+    """
+    problems = []
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+            for r in rows:
+                if r["type"] == "ALL" and r["table"] in HOT_TABLES:
+                    problems.append(f"full scan {r['table']}")
+                if sorted_by_index and "filesort" in (r["Extra"] or ""):
+                    problems.append(f"filesort {r['table']}")
+            return problems
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    for row in rows:
+        detail = row[-1]
+        m = re.match(r"SCAN (?:TABLE )?(\w+)(.*)", detail)
+        if m and m.group(1) in HOT_TABLES and "USING" not in m.group(2):
+            problems.append(f"full scan {m.group(1)}")
+        if sorted_by_index and detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            problems.append("temp b-tree for order by")
+    return problems
+
+
+def assert_indexed(run, sorted_by_index=False):
+    with captured_statements() as statements:
+        run()
+    assert statements
+    regressions = {sql: found for sql, params in statements if (found := plan_problems(sql, params, sorted_by_index))}
+    assert not regressions, regressions
+
+
+def test_availability_hot_queries_use_indexes():
+    db = SessionLocal()
+    try:
+        assert_indexed(lambda: availability_repo.list_rooms_by_hotel(db, "HOTEL1", "standard"))
+        assert_indexed(lambda: availability_repo.overlapping_blocks(db, "HAB001", INICIO, FIN))
+        assert_indexed(lambda: availability_repo.list_active_blocks_in_range(db, "HOTEL1", INICIO, FIN))
+        assert_indexed(lambda: availability_repo.occupied_rooms(db, ["HAB001", "HAB002"], INICIO, FIN))
+        assert_indexed(lambda: availability_repo.list_pending_expirations(db))
+        assert_indexed(lambda: availability_repo.expire_blocks_before(db, datetime(2000, 1, 1)))
+        assert_indexed(lambda: availability_repo.get_block(db, "B1"))
+        assert_indexed(lambda: availability_repo.inventory_nights(db, "HOTEL1", "standard", INICIO, FIN))
+        assert_indexed(lambda: availability_repo.list_room_ids(db, "HOTEL1", "standard"))
+        assert_indexed(lambda: availability_repo.room_neighbours(db, ["HAB1", "HAB2"], INICIO, FIN, 60))
+    finally:
+        db.close()
+
+
+def test_reservations_hot_queries_use_indexes():
+    db = SessionLocal()
+    try:
+        for campo in ("fecha_inicio", "fecha_fin"):
+            assert_indexed(
+                lambda: reservations_repo.list_reservations_by_hotel(db, "HOTEL1", campo, INICIO, FIN, "CONFIRMADA", (INICIO, 10), 50),
+                sorted_by_index=True,
+            )
+        assert_indexed(lambda: reservations_repo.list_reservations_page_by_customer(db, "C1", None, 100, 50), sorted_by_index=True)
+        assert_indexed(lambda: reservations_repo.list_manifest_rows(db, INICIO, FIN, EXCLUDED_STATES))
+        assert_indexed(lambda: reservations_repo.list_manifest_rows(db, INICIO, INICIO, EXCLUDED_STATES, "HOTEL1"))
+        assert_indexed(lambda: reservations_repo.get_reservation(db, "R1"))
+    finally:
+        db.close()
+
+
+def test_payments_by_reservation_uses_index():
+    client = TestClient(payments_app)
+    token = create_access_token({"usuario_id": "U1", "username": "planes", "rol": "staff"})
+    assert_indexed(
+        lambda: client.get("/api/v1/payments/by-reservation/R1", headers={"Authorization": f"Bearer {token}"})
+    )
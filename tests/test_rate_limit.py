@@ -0,0 +1,92 @@
+import os
+import statistics
+import time
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from shared.config import settings
+from shared.rate_limit import MemoryBuckets, RateLimitMiddleware, SQLiteBuckets, TokenIdentity, parse_rules
+from shared.security import create_access_token
+
+SEARCH = "/api/v1/availability/search"
+
+
+def _app(buckets=None, rules=None):
+    app = FastAPI()
+
+    @app.post(SEARCH)
+    def search():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=rules or parse_rules({f"POST {SEARCH}": "1:3"}),
+        buckets=buckets or MemoryBuckets(),
+        role_multipliers={"cliente": 1.0, "staff": 2.0},
+    )
+    return TestClient(app)
+
+
+def _auth(usuario_id, rol="cliente"):
+    token = create_access_token({"usuario_id": usuario_id, "username": usuario_id, "rol": rol})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_token_identity_checks_signature():
+    identity = TokenIdentity(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+    token = _auth("U1", "staff")["Authorization"][7:]
+    assert identity(token) == ("U1", "staff")
+    header, payload, signature = token.split(".")
+    # Se cambia un carácter intermedio: los últimos llevan bits de relleno de base64
+    tampered = signature[:10] + ("B" if signature[10] == "A" else "A") + signature[11:]
+    assert identity(f"{header}.{payload}.{tampered}") is None
+    assert identity("basura") is None
+
+
+def test_bucket_per_user_with_role_multiplier():
+    client = _app()
+    codes = [client.post(SEARCH, headers=_auth("OTA")).status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+    r = client.post(SEARCH, headers=_auth("OTA"))
+    assert r.status_code == 429 and int(r.headers["retry-after"]) >= 1
+
+    # Otro usuario tiene su propio cubo; staff tiene el doble de ráfaga
+    assert client.post(SEARCH, headers=_auth("OTRO")).status_code == 200
+    staff = [client.post(SEARCH, headers=_auth("RECEPCION", "staff")).status_code for _ in range(7)]
+    assert staff.count(200) == 6
+    # Las rutas sin regla no se limitan
+    assert all(client.get("/health").status_code == 200 for _ in range(10))
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "rl.db")
+    first, second = _app(SQLiteBuckets(path)), _app(SQLiteBuckets(path))
+    codes = [c.post(SEARCH, headers=_auth("OTA")).status_code for c in (first, second, first, second)]
+    assert codes == [200, 200, 200, 429]
+
+
+def test_overhead_is_well_under_50_microseconds():
+    async def empty(scope, receive, send):
+        pass
+
+    middleware = RateLimitMiddleware(empty, parse_rules({f"POST {SEARCH}": "1000000000:1000000000"}), buckets=MemoryBuckets())
+    headers = [(b"authorization", _auth("BENCH")["Authorization"].encode())]
+    scope = {"type": "http", "method": "POST", "path": SEARCH, "headers": headers, "client": ("127.0.0.1", 1)}
+
+    async def run():
+        samples = []
+        for _ in range(2000):
+            t0 = time.perf_counter()
+            await middleware(scope, None, None)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        return statistics.median(samples)
+
+    assert asyncio.run(run()) < 50
@@ -0,0 +1,72 @@
+import os
+import time
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from shared.config import settings
+from shared.health import Readiness, setup_readiness
+from services.availability.main import app as availability_app
+
+
+def test_ready_reports_database_latency():
+    r = TestClient(availability_app).get("/ready")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["status"] == "ok"
+    assert body["checks"]["database"]["latency_ms"] >= 0
+    assert body["checks"]["pool"]["status"] == "ok"
+
+
+def test_unreachable_dependency_is_not_ready_and_results_are_cached(monkeypatch):
+    monkeypatch.setattr(settings, "PRICING_SERVICE_URL", "http://127.0.0.1:9")
+    calls = []
+
+    class CountingReadiness(Readiness):
+        async def _run(self, name):
+            calls.append(name)
+            return await super()._run(name)
+
+    app = FastAPI()
+    readiness = CountingReadiness("prueba", dependencies=("pricing",))
+
+    @app.get("/ready")
+    async def ready():
+        return await readiness.report()
+
+    client = TestClient(app)
+    body = client.get("/ready").json()
+    assert body["status"] == "not_ready"
+    assert body["checks"]["pricing"]["status"] == "error"
+    assert "latency_ms" in body["checks"]["pricing"]
+    client.get("/ready")
+    assert calls == ["pricing"]
+
+
+def test_sustained_pool_exhaustion_flips_to_not_ready(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/ready.db", pool_size=1, max_overflow=0, pool_timeout=0.1)
+    app = FastAPI()
+    readiness = setup_readiness(app, "prueba", engine)
+    client = TestClient(app)
+    assert client.get("/ready").status_code == 200
+
+    monkeypatch.setattr(settings, "READY_CACHE_SECONDS", 0)
+    conn = engine.connect()
+    try:
+        assert readiness.pool.exhausted_since is not None
+        r = client.get("/ready")
+        assert r.json()["checks"]["database"]["detail"] == "pool de conexiones agotado"
+        monkeypatch.setattr(settings, "READY_POOL_EXHAUSTED_SECONDS", 0.01)
+        time.sleep(0.02)
+        r = client.get("/ready")
+        assert r.status_code == 503
+        assert r.json()["checks"]["pool"]["status"] == "error"
+    finally:
+        conn.close()
+    r = client.get("/ready")
+    assert r.status_code == 200, r.text
+    assert r.json()["checks"]["pool"]["exhausted_seconds"] == 0
+    engine.dispose()
@@ -34,8 +34,8 @@ def _stub_methods(monkeypatch):
     async def _calculate_price(self, params, token: str):
         return {"total": "120.00", "detalles": {"base": "100.00", "impuestos": "20.00"}}
 
-    async def _check_availability(self, params, token: str):
-        return {"total_disponibles": 1, "habitaciones": [{"habitacion_id": "HAB001"}]}
+    async def _availability_allocate(self, params, token: str):
+        return {"bloqueo_id": "BLK001", "habitacion_id": "HAB001", "estado": "activo"}
 
     async def _availability_block(self, params, token: str):
         return {"bloqueo_id": "BLK001", "estado": "bloqueada"}
@@ -53,7 +53,7 @@ def _stub_methods(monkeypatch):
 
     monkeypatch.setattr(ServiceClient, "get_customer", _get_customer, raising=True)
     monkeypatch.setattr(ServiceClient, "calculate_price", _calculate_price, raising=True)
-    monkeypatch.setattr(ServiceClient, "check_availability", _check_availability, raising=True)
+    monkeypatch.setattr(ServiceClient, "availability_allocate", _availability_allocate, raising=True)
     monkeypatch.setattr(ServiceClient, "availability_block", _availability_block, raising=True)
     monkeypatch.setattr(ServiceClient, "process_payment", _process_payment, raising=True)
     monkeypatch.setattr(ServiceClient, "availability_confirm", _availability_confirm, raising=True)
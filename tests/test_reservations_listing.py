@@ -0,0 +1,93 @@
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.reservations.main import app as reservations_app
+from services.reservations.repository import create_reservation
+
+HOY = date(2030, 3, 10)
+SUFIJO = uuid.uuid4().hex[:6]
+HOTEL = f"HOTEL_LIST_{SUFIJO}"
+CLIENTE = f"C_LIST_{SUFIJO}"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for i in range(7):
+            create_reservation(
+                db,
+                {
+                    "cliente_id": CLIENTE,
+                    "hotel_id": HOTEL,
+                    "habitacion_id": f"HAB{i:03d}",
+                    "fecha_inicio": HOY + timedelta(days=i % 3),
+                    "fecha_fin": HOY + timedelta(days=i % 3 + 2),
+                    "estado": "CANCELADA" if i == 6 else "CONFIRMADA",
+                    "monto_total": Decimal("100.00"),
+                    "creado_en": datetime(2030, 1, 1, 12, 0, 0),
+                },
+            )
+    finally:
+        db.close()
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "staff", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _all_pages(client, url, params):
+    seen, cursor = [], None
+    while True:
+        r = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=_headers())
+        assert r.status_code == 200, r.text
+        body = r.json()
+        seen += body["reservas"]
+        cursor = body["siguiente_cursor"]
+        if not cursor:
+            return seen
+
+
+def test_hotel_listing_walks_keyset_pages_in_date_order():
+    client = TestClient(reservations_app)
+    rows = _all_pages(client, "/api/v1/reservations", {"hotel_id": HOTEL, "limite": 2})
+    assert len(rows) == 7
+    assert len({r["reserva_id"] for r in rows}) == 7
+    assert [r["fecha_inicio"] for r in rows] == sorted(r["fecha_inicio"] for r in rows)
+
+    llegadas = _all_pages(client, "/api/v1/reservations", {"hotel_id": HOTEL, "desde": str(HOY), "hasta": str(HOY), "limite": 2})
+    assert {r["fecha_inicio"] for r in llegadas} == {str(HOY)}
+
+    salidas = client.get(
+        "/api/v1/reservations",
+        params={"hotel_id": HOTEL, "campo_fecha": "fecha_fin", "desde": str(HOY + timedelta(days=4)), "estado": "CONFIRMADA"},
+        headers=_headers(),
+    ).json()["reservas"]
+    # i=2 e i=5 salen en HOY+4 (i=6 está cancelada y no sale en HOY+4)
+    assert len(salidas) == 2
+
+
+def test_customer_listing_pages_through_rows_sharing_creado_en():
+    # Las 7 filas del fixture se insertan en el mismo segundo (mismo creado_en)
+    client = TestClient(reservations_app)
+    for limite in (1, 3, 7):
+        rows = _all_pages(client, f"/api/v1/reservations/customer/{CLIENTE}", {"limite": limite})
+        assert len(rows) == 7
+        assert len({r["reserva_id"] for r in rows}) == 7
+    assert len({r["creado_en"] for r in rows}) == 1
+
+
+def test_invalid_cursor_is_rejected():
+    client = TestClient(reservations_app)
+    r = client.get("/api/v1/reservations", params={"hotel_id": HOTEL, "cursor": "no-es-un-cursor"}, headers=_headers())
+    assert r.status_code == 400
+    r = client.get(f"/api/v1/reservations/customer/{CLIENTE}", params={"cursor": "no-es-un-cursor"}, headers=_headers())
+    assert r.status_code == 400
@@ -0,0 +1,78 @@
+import os
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from shared.database import Base, SessionLocal, engine
+from shared.security import create_access_token
+from services.reservations.main import app as reservations_app
+from services.reservations.repository import create_reservation
+from services.reservations.service import modify_reservation, rebuild_manifest
+
+HOY = date.today()
+HOTEL = f"HOTEL_MAN_{uuid.uuid4().hex[:6]}"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _headers():
+    token = create_access_token({"usuario_id": "U1", "username": "recepcion", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _reserva(db, habitacion_id, inicio, fin, estado="CONFIRMADA"):
+    return create_reservation(
+        db,
+        {
+            "cliente_id": "C_MAN",
+            "hotel_id": HOTEL,
+            "habitacion_id": habitacion_id,
+            "fecha_inicio": inicio,
+            "fecha_fin": fin,
+            "estado": estado,
+            "monto_total": Decimal("100.00"),
+        },
+    )
+
+
+def test_manifest_is_served_from_memory_and_tracks_changes():
+    client = TestClient(reservations_app)
+    db = SessionLocal()
+    try:
+        llega = _reserva(db, "HAB001", HOY, HOY + timedelta(days=2))
+        otra = _reserva(db, "HAB002", HOY, HOY + timedelta(days=1))
+        _reserva(db, "HAB003", HOY - timedelta(days=3), HOY)
+        _reserva(db, "HAB004", HOY, HOY + timedelta(days=1), estado="CANCELADA")
+        rebuild_manifest(db)
+
+        url = f"/api/v1/reservations/manifest/{HOTEL}"
+        r = client.get(url, headers=_headers())
+        assert r.status_code == 200, r.text
+        data = r.json()
+        assert data["origen"] == "memoria"
+        assert [e["habitacion_id"] for e in data["llegadas"]] == ["HAB001", "HAB002"]
+        assert [e["habitacion_id"] for e in data["salidas"]] == ["HAB003"]
+
+        assert client.post(f"/api/v1/reservations/{llega.reserva_id}/checkin", headers=_headers()).status_code == 200
+        modify_reservation(db, otra.reserva_id, {"fecha_inicio": HOY + timedelta(days=1), "fecha_fin": HOY + timedelta(days=3)})
+        data = client.get(url, headers=_headers()).json()
+        assert [(e["habitacion_id"], e["estado"]) for e in data["llegadas"]] == [("HAB001", "CHECKIN")]
+        assert client.get(f"{url}/check", headers=_headers()).json()["consistente"] is True
+
+        # Alta que no pasa por el servicio: el chequeo la detecta y la reconstrucción la corrige
+        directa = _reserva(db, "HAB005", HOY, HOY + timedelta(days=1))
+        check = client.get(f"{url}/check", headers=_headers()).json()
+        assert check["consistente"] is False
+        assert check["llegadas"]["faltantes"] == [directa.reserva_id]
+        assert rebuild_manifest(db) >= 1
+        assert client.get(f"{url}/check", headers=_headers()).json()["consistente"] is True
+
+        lejos = client.get(url, params={"fecha": str(HOY + timedelta(days=60))}, headers=_headers()).json()
+        assert lejos["origen"] == "db"
+    finally:
+        db.close()
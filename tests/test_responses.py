@@ -0,0 +1,90 @@
+import gzip
+import os
+import uuid
+from datetime import date
+from decimal import Decimal
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from shared.database import Base, SessionLocal, engine
+from shared.responses import CompressionMiddleware, dumps, negotiate
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+from services.availability.models import HabitacionDB
+from services.availability.schemas import DisponibilidadResponse
+
+HOTEL = f"HOTEL_RESP_{uuid.uuid4().hex[:6]}"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for i in range(40):
+            db.add(HabitacionDB(
+                habitacion_id=f"{HOTEL}_{i}", hotel_id=HOTEL, numero=str(100 + i), tipo="standard", piso=1 + i // 10,
+                capacidad_maxima=2, precio_base=120.50, caracteristicas=["wifi", "vista_mar"], activa=True,
+            ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _headers(**extra):
+    token = create_access_token({"usuario_id": "U1", "username": "respuestas", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}", **extra}
+
+
+def test_negotiate():
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("deflate, gzip;q=0") is None
+    assert negotiate("identity") is None
+    assert negotiate("*") in ("br", "gzip")
+
+
+def test_dumps_serializes_decimals_and_dates_like_pydantic():
+    assert dumps({"precio": Decimal("10.50"), "fecha": date(2036, 1, 2)}) == b'{"precio":"10.50","fecha":"2036-01-02"}'
+
+
+def test_search_body_matches_model_and_is_gzipped():
+    client = TestClient(availability_app)
+    payload = {"hotel_id": HOTEL, "fecha_inicio": "2036-05-01", "fecha_fin": "2036-05-03", "numero_huespedes": 2}
+    r = client.post("/api/v1/availability/search", json=payload, headers=_headers())
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["content-type"] == "application/json"
+    body = r.json()
+    # Mismo documento que el que producía el modelo de respuesta
+    assert DisponibilidadResponse.model_validate(body).model_dump(mode="json") == body
+    assert body["total_disponibles"] == 40 and body["habitaciones"][0]["precio_total"] == "241.00"
+
+    plain = client.post("/api/v1/availability/search", json=payload, headers=_headers(**{"Accept-Encoding": "identity"}))
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == body
+
+
+def test_small_and_streamed_responses():
+    app = FastAPI()
+
+    @app.get("/poco")
+    def poco():
+        return {"ok": True}
+
+    @app.get("/texto", response_class=PlainTextResponse)
+    def texto():
+        return "x" * 5000
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    client = TestClient(app)
+    assert "content-encoding" not in client.get("/poco").headers
+    r = client.get("/texto")
+    assert r.headers["content-encoding"] == "gzip" and r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) < 100 and r.text == "x" * 5000
+
+    # Sin decodificar en el cliente: el cuerpo es gzip válido
+    with client.stream("GET", "/texto") as raw:
+        data = b"".join(raw.iter_raw())
+    assert gzip.decompress(data) == b"x" * 5000
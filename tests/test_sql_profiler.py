@@ -0,0 +1,59 @@
+import os
+import uuid
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from shared import database
+from shared.database import Base, engine, get_db, normalize_statement, profiler, setup_sql_profiler
+from shared.security import create_access_token
+from services.customers.repository import get_customer
+
+
+@pytest.fixture
+def client(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database.settings, "SQL_PROFILER_ENABLED", True)
+    monkeypatch.setattr(profiler, "n_plus_one", 5)
+    profiler.reset()
+    app = FastAPI()
+    setup_sql_profiler(app, engine)
+
+    @app.get("/clientes")
+    def clientes(db=Depends(get_db)):
+        # Una consulta por cliente: el patrón N+1 que debe detectarse
+        return [get_customer(db, f"CLI_{uuid.uuid4().hex[:8]}") is None for _ in range(6)]
+
+    yield TestClient(app)
+    event.remove(engine, "before_cursor_execute", database._profile_before)
+    event.remove(engine, "after_cursor_execute", database._profile_after)
+
+
+def _headers(rol):
+    token = create_access_token({"usuario_id": "U1", "username": "perfil", "rol": rol})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_normalize_statement_collapses_literals_and_in_lists():
+    sql = "SELECT *  FROM t\n WHERE id IN (?, ?, ?) AND nombre = 'ana' AND edad > 30"
+    assert normalize_statement(sql) == "SELECT * FROM t WHERE id IN (?, ...) AND nombre = ? AND edad > ?"
+
+
+def test_profile_reports_origin_and_flags_n_plus_one(client):
+    assert client.get("/clientes").status_code == 200
+
+    assert client.get("/admin/sql-profile", headers=_headers("staff")).status_code == 403
+    report = client.get("/admin/sql-profile", headers=_headers("admin")).json()
+    assert report["enabled"] is True
+    top = report["most_frequent"][0]
+    assert top["count"] == 6 and "FROM clientes" in top["statement"]
+    assert top["origins"] == ["services.customers.repository.get_customer"]
+    assert report["slowest"] and report["slowest"][0]["origin"] == "services.customers.repository.get_customer"
+    flagged = report["n_plus_one"]
+    assert flagged and flagged[0]["path"] == "GET /clientes" and flagged[0]["count"] == 6
+
+    client.delete("/admin/sql-profile", headers=_headers("admin"))
+    assert client.get("/admin/sql-profile", headers=_headers("admin")).json()["most_frequent"] == []
@@ -0,0 +1,72 @@
+import asyncio
+import os
+
+os.environ["USE_SQLITE_FOR_TESTS"] = "1"
+import httpx
+from fastapi.testclient import TestClient
+
+from shared import tracing
+from shared.database import Base, engine
+from shared.http_client import ServiceClient
+from shared.security import create_access_token
+from services.availability.main import app as availability_app
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def setup_module(module):
+    Base.metadata.create_all(bind=engine)
+
+
+def _headers(**extra):
+    token = create_access_token({"usuario_id": "U1", "username": "trazas", "rol": "staff"})
+    return {"Authorization": f"Bearer {token}", **extra}
+
+
+def test_parse_traceparent():
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00")[2] is False
+    assert tracing.parse_traceparent("basura") is None
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+
+
+def test_server_span_continues_incoming_trace_with_db_children():
+    client = TestClient(availability_app)
+    r = client.get(
+        "/api/v1/availability/rooms",
+        params={"hotel_id": "HOTEL_TRAZAS"},
+        headers=_headers(traceparent=f"00-{TRACE_ID}-{PARENT_ID}-01"),
+    )
+    assert r.status_code == 200
+
+    spans = client.get("/traces", params={"trace_id": TRACE_ID}).json()
+    server = next(s for s in spans if s["kind"] == "server")
+    assert server["parent_id"] == PARENT_ID
+    assert server["service"] == "availability"
+    assert server["attributes"]["status_code"] == 200
+    db_spans = [s for s in spans if s["kind"] == "db"]
+    assert db_spans and all(s["parent_id"] == server["span_id"] for s in db_spans)
+    assert any("habitaciones" in s["attributes"]["statement"] for s in db_spans)
+
+
+def test_service_client_propagates_traceparent():
+    async def call():
+        sc = ServiceClient()
+        sc._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=availability_app), base_url="http://availability")
+        root = tracing.Span(TRACE_ID, "aaaaaaaaaaaaaaaa", None, "saga", "reservations", "server")
+        token = tracing._current.set(root)
+        try:
+            payload = {"hotel_id": "HOTEL_TRAZAS", "fecha_inicio": "2037-01-01", "fecha_fin": "2037-01-02", "numero_huespedes": 1}
+            await sc.check_availability(payload, create_access_token({"usuario_id": "U1", "username": "trazas", "rol": "staff"}))
+        finally:
+            tracing._current.reset(token)
+            await sc._client.aclose()
+
+    asyncio.run(call())
+    spans = tracing.tracer.find(TRACE_ID)
+    client_span = next(s for s in spans if s["kind"] == "client")
+    assert client_span["parent_id"] == "aaaaaaaaaaaaaaaa"
+    server = next(s for s in spans if s["kind"] == "server" and s["name"] == "POST /api/v1/availability/search")
+    assert server["parent_id"] == client_span["span_id"]
+    assert tracing.render_tree(spans)